@@ -1,15 +1,20 @@
 # collect_gestures.py
 # Same as before, but captures samples slower (cooldown) so you can vary distance.
 
-import os, sys, json, time
+import os, sys, time
 from pathlib import Path
 from collections import defaultdict, deque
 
 import cv2
 import mediapipe as mp
+import numpy as np
+
+from gesture_dataset import from_samples, write_dataset
+from gesture_features import landmarks_to_array, to_feature_vec, zero_vec
 
 # ================= CONFIG =================
-OUTPUT_JSON = "testing1.json"
+# Columnar .gds dataset (see gesture_dataset.py); train_gesture_model.py reads the same file
+OUTPUT_PATH = os.getenv("GESTURE_DATASET", "testing1.gds")
 
 SAMPLES_PER_LABEL = int(os.getenv("SAMPLES_PER_LABEL", "500"))
 SAMPLES_NONE      = int(os.getenv("SAMPLES_NONE", "2000"))
@@ -28,7 +33,8 @@ if _ENV_MIRROR is not None:
 else:
     MIRROR_INPUT = False
 
-FRAME_WIDTH, FRAME_HEIGHT = 1280, 720
+FRAME_WIDTH  = int(os.getenv("GESTURE_FRAME_WIDTH", "1280"))
+FRAME_HEIGHT = int(os.getenv("GESTURE_FRAME_HEIGHT", "720"))
 
 RIGHT_LABELS = ["play", "pause", "next", "previous"]
 LEFT_LABELS  = ["volume_up", "volume_down", "like", "skip30"]
@@ -74,25 +80,17 @@ def draw_label_bar(img, label, count, target, side_hint=None, color=(0,255,255))
     cv2.putText(img, "Keys: n=next  r=redo  q=quit",
                 (10, FRAME_HEIGHT-20), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200,200,200), 2)
 
-def to_feature_vec(hand_landmarks):
-    base_x = hand_landmarks.landmark[0].x
-    base_y = hand_landmarks.landmark[0].y
-    vec = []
-    for lm in hand_landmarks.landmark:
-        vec.append(round(lm.x - base_x, 4))
-        vec.append(round(lm.y - base_y, 4))
-    return vec
-
-def zero_vec():
-    return [0.0] * 42
+def raw_landmarks(hand_landmarks):
+    """21 [x, y, z] triples kept with each sample so any feature version can be rebuilt"""
+    return np.round(landmarks_to_array(hand_landmarks, dims=3), 5).tolist()
 
 def main():
     print("=== Gesture Collector (slower capture) ===")
-    print(f"Saving to: {OUTPUT_JSON}")
+    print(f"Saving to: {OUTPUT_PATH}")
     print(f"Cooldown: {SAMPLE_COOLDOWN_MS}ms | Stable frames: {REQUIRED_STABLE_FRAMES}")
     print(f"Targets: per-gesture={SAMPLES_PER_LABEL} | none={SAMPLES_NONE}")
 
-    out_path = Path(OUTPUT_JSON)
+    out_path = Path(OUTPUT_PATH)
     if out_path.exists():
         out_path.unlink()
 
@@ -128,12 +126,17 @@ def main():
                 if result.multi_hand_landmarks:
                     hand_lms = result.multi_hand_landmarks[0]
                     draw.draw_landmarks(overlay, hand_lms, mp_hands.HAND_CONNECTIONS)
-                    vec = to_feature_vec(hand_lms)
+                    vec = to_feature_vec(hand_lms, dtype=np.float64)[0].tolist()
+                    points = raw_landmarks(hand_lms)
+                    handed = (result.multi_handedness[0].classification[0].label.lower()
+                              if result.multi_handedness else None)
                 else:
                     vec = zero_vec()
+                    points = None
+                    handed = None
                 stable_q.append("none")
                 if len(stable_q) == REQUIRED_STABLE_FRAMES and (now - last_time) >= SAMPLE_COOLDOWN_MS:
-                    data.append({"X": vec, "y": "none"})
+                    data.append({"X": vec, "y": "none", "landmarks": points, "hand": handed})
                     counts[label] += 1
                     counted = True
                     last_time = now
@@ -143,10 +146,11 @@ def main():
                     handed = result.multi_handedness[0].classification[0].label.lower()
                     if handed == need_side:
                         draw.draw_landmarks(overlay, hand_lms, mp_hands.HAND_CONNECTIONS)
-                        vec = to_feature_vec(hand_lms)
+                        vec = to_feature_vec(hand_lms, dtype=np.float64)[0].tolist()
                         stable_q.append(f"{label}_{handed}")
                         if len(stable_q) == REQUIRED_STABLE_FRAMES and (now - last_time) >= SAMPLE_COOLDOWN_MS:
-                            data.append({"X": vec, "y": f"{label}_{handed}"})
+                            data.append({"X": vec, "y": f"{label}_{handed}",
+                                         "landmarks": raw_landmarks(hand_lms), "hand": handed})
                             counts[label] += 1
                             counted = True
                             last_time = now
@@ -159,12 +163,18 @@ def main():
             if key == ord('q'): sys.exit(0)
             elif key == ord('r'): counts[label] = 0; stable_q.clear()
 
-    with open(OUTPUT_JSON, "w") as f:
-        json.dump(data, f)
+    write_dataset(OUTPUT_PATH, from_samples(data, {
+        "collector": {
+            "samples_per_label": SAMPLES_PER_LABEL, "samples_none": SAMPLES_NONE,
+            "sample_cooldown_ms": SAMPLE_COOLDOWN_MS, "required_stable_frames": REQUIRED_STABLE_FRAMES,
+            "mirror": MIRROR_INPUT, "frame_width": FRAME_WIDTH, "frame_height": FRAME_HEIGHT,
+            "max_hands": 1, "min_detection_confidence": 0.6, "min_tracking_confidence": 0.6,
+        },
+    }))
 
     cap.release()
     cv2.destroyAllWindows()
-    print(f"\n✅ Done. Saved {sum(counts.values())} samples to {OUTPUT_JSON}")
+    print(f"\n✅ Done. Saved {sum(counts.values())} samples to {OUTPUT_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,219 @@
+"""Columnar, memory-mapped gesture dataset (``.gds``).
+
+``testing1.json`` holds one ``{"X": [42 floats], "y": label, ...}`` object
+per sample, so loading it builds a Python float for every value. A ``.gds``
+file stores the same samples as columns instead: a JSON header (metadata,
+label and hand tables, column layout) followed by the raw column arrays,
+each 64-byte aligned, in the same layout as the ``.gmb`` model bundle.
+
+Columns:
+    X          float32 (N, dim)    features of the header's ``feature_version``
+                                   (v1 from the collector, exactly what serving computes)
+    y          uint16  (N,)        index into the header's label table
+    hand       uint8   (N,)        index into HAND_TABLE ("" = not recorded)
+    landmarks  float32 (N, 21, 3)  raw landmarks, NaN rows where none were
+                                   recorded (column omitted when no row has any)
+
+``read_dataset`` maps the file read-only and returns the columns as views of
+the mapping; ``load_dataset`` reads either format, so old JSON datasets keep
+working. Files are replaced with ``os.replace`` and never rewritten in place.
+
+The repository keeps ``testing1.json`` as the source; ``testing1.gds`` is
+built from it by ``load_dataset`` when missing instead of being committed.
+An existing ``.gds`` is never rebuilt implicitly, since the collector appends
+to it; convert again (or delete it) to pick up a changed JSON.
+
+Usage:
+    python gesture_dataset.py testing1.json -o testing1.gds   # convert
+    python gesture_dataset.py testing1.gds --info
+"""
+
+import datetime
+import json
+import os
+import struct
+
+import numpy as np
+
+from gesture_features import FEATURE_DIM, NUM_LANDMARKS, feature_dim
+
+MAGIC = b'GESTDS01'
+ALIGN = 64
+DATASET_SUFFIX = '.gds'
+HAND_TABLE = ("", "left", "right")
+SIDES = HAND_TABLE[1:]
+
+
+def is_dataset(path):
+    return str(path).endswith(DATASET_SUFFIX)
+
+
+class GestureDataset:
+    """Samples as columns; ``y``/``hands`` decode the small integer code columns"""
+
+    def __init__(self, X, codes, labels, hand_codes=None, landmarks=None, meta=None):
+        self.X = X
+        self.codes = codes
+        self.labels = np.asarray(labels)
+        self.hand_codes = np.zeros(len(X), dtype=np.uint8) if hand_codes is None else hand_codes
+        self.landmarks = landmarks
+        self.meta = dict(meta or {})
+
+    def __len__(self):
+        return len(self.X)
+
+    @property
+    def y(self):
+        return self.labels[self.codes]
+
+    @property
+    def hands(self):
+        """Recorded handedness per sample ("" when it was not recorded)"""
+        return np.asarray(HAND_TABLE)[self.hand_codes]
+
+    def sides(self):
+        """Hand side per sample: the recorded handedness, else the label suffix ("" if neither)"""
+        suffix = np.array([label.rsplit('_', 1)[-1] for label in self.labels.tolist()])
+        suffix = np.where(np.isin(suffix, SIDES), suffix, "")[self.codes]
+        hands = self.hands
+        return np.where(hands != "", hands, suffix)
+
+    def has_landmarks(self):
+        if self.landmarks is None:
+            return np.zeros(len(self), dtype=bool)
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+    def counts(self):
+        return {str(label): int(n) for label, n in
+                zip(self.labels, np.bincount(self.codes, minlength=len(self.labels)))}
+
+
+def from_samples(samples, meta=None):
+    """GestureDataset from collector-style dicts (``X``, ``y`` and optional ``hand``/``landmarks``)"""
+    X = np.array([s["X"] for s in samples], dtype=np.float32).reshape(len(samples), FEATURE_DIM)
+    labels, codes = np.unique(np.array([s["y"] for s in samples], dtype=str), return_inverse=True)
+    hand_codes = np.array([HAND_TABLE.index(s.get("hand") or "") for s in samples], dtype=np.uint8)
+    landmarks = None
+    if any(s.get("landmarks") for s in samples):
+        landmarks = np.full((len(samples), NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        for i, s in enumerate(samples):
+            if s.get("landmarks"):
+                landmarks[i] = np.asarray(s["landmarks"], dtype=np.float32)[:, :3]
+    return GestureDataset(X, codes.astype(np.uint16), labels, hand_codes, landmarks, meta)
+
+
+def _padding(offset):
+    return (-offset) % ALIGN
+
+
+def write_dataset(path, dataset, feature_version=None):
+    """Write ``dataset`` atomically to ``path``.
+
+    ``feature_version`` describes the ``X`` column; it defaults to the
+    dataset's own (``meta["feature_version"]``, else 1).
+    """
+    version = int(feature_version or dataset.meta.get("feature_version", 1))
+    if dataset.X.shape[1] != feature_dim(version):
+        raise ValueError(f"X has {dataset.X.shape[1]} columns, v{version} features have {feature_dim(version)}")
+    columns = {
+        "X": np.ascontiguousarray(dataset.X, dtype=np.float32),
+        "y": np.ascontiguousarray(dataset.codes, dtype=np.uint16),
+        "hand": np.ascontiguousarray(dataset.hand_codes, dtype=np.uint8),
+    }
+    if dataset.landmarks is not None:
+        columns["landmarks"] = np.ascontiguousarray(dataset.landmarks, dtype=np.float32)
+    specs, offset = {}, 0
+    for name, array in columns.items():
+        offset += _padding(offset)
+        specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += array.nbytes
+    meta = dict(dataset.meta, feature_version=version, feature_dim=feature_dim(version),
+                samples=len(dataset), counts=dataset.counts())
+    meta.setdefault("created_at", datetime.datetime.now().isoformat(timespec="seconds"))
+    header = json.dumps({"meta": meta, "labels": [str(l) for l in dataset.labels],
+                         "hands": list(HAND_TABLE), "columns": specs}).encode('utf-8')
+    data_start = len(MAGIC) + 8 + len(header)
+    data_start += _padding(data_start)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in columns.items():
+            f.write(b'\0' * (data_start + specs[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+
+
+def read_dataset(path):
+    """GestureDataset whose columns are read-only views of the mapped file"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a gesture dataset")
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    if tuple(header["hands"]) != HAND_TABLE:
+        raise ValueError(f"{path} has an unknown hand table {header['hands']}")
+    data_start = len(MAGIC) + 8 + header_len
+    data_start += _padding(data_start)
+    mapping = np.memmap(path, dtype=np.uint8, mode='r')
+    columns = {}
+    for name, spec in header["columns"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data_start + spec["offset"]
+        if start + count * dtype.itemsize > mapping.size:
+            raise ValueError(f"{path} is truncated")
+        columns[name] = (np.frombuffer(mapping, dtype=dtype, count=count, offset=start)
+                         .reshape(spec["shape"]))
+    return GestureDataset(columns["X"], columns["y"], header["labels"], columns["hand"],
+                          columns.get("landmarks"), header["meta"])
+
+
+def load_dataset(path):
+    """A ``.gds`` file (memory-mapped) or a legacy collector JSON file.
+
+    A missing ``.gds`` path is built from the collector JSON next to it first.
+    An existing one is left alone: it may hold samples the collector added.
+    """
+    if is_dataset(path):
+        source = os.path.splitext(path)[0] + '.json'
+        if not os.path.exists(path) and os.path.exists(source):
+            convert_json(source, path)
+        return read_dataset(path)
+    with open(path) as f:
+        return from_samples(json.load(f), {"source": os.path.basename(path)})
+
+
+def convert_json(json_path, out_path=None, **meta):
+    """Convert a collector JSON dataset to ``.gds``; returns the output path"""
+    out_path = out_path or os.path.splitext(json_path)[0] + DATASET_SUFFIX
+    dataset = load_dataset(json_path)
+    dataset.meta.update(meta)
+    write_dataset(out_path, dataset)
+    return out_path
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert or inspect gesture datasets")
+    parser.add_argument('dataset', help="collector JSON to convert, or a .gds file with --info")
+    parser.add_argument('-o', '--out', default=None, help="output .gds (default: next to the input)")
+    parser.add_argument('--info', action='store_true', help="print a dataset's metadata and label counts")
+    args = parser.parse_args()
+    if args.info:
+        dataset = load_dataset(args.dataset)
+        print(json.dumps(dict(dataset.meta, counts=dataset.counts(),
+                              with_landmarks=int(dataset.has_landmarks().sum()),
+                              with_hand=int(np.count_nonzero(dataset.hand_codes))), indent=2))
+    else:
+        out = convert_json(args.dataset, args.out)
+        source = load_dataset(args.dataset)
+        converted = read_dataset(out)
+        if not (np.array_equal(source.X, converted.X) and np.array_equal(source.y, converted.y)):
+            os.remove(out)
+            raise SystemExit(f"❌ {out} does not match {args.dataset}")
+        print(f"✅ Wrote {out} ({len(converted)} samples, {os.path.getsize(args.dataset) / 1e6:.1f} MB "
+              f"-> {os.path.getsize(out) / 1e6:.1f} MB)")
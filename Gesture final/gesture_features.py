@@ -0,0 +1,181 @@
+"""Hand landmark -> model feature extraction, shared by every stage.
+
+The collector, the controllers and the backend all build the model input
+here, so a feature row is computed the same way at training and serving time.
+Two versioned feature sets exist; a model records the version it was trained
+on in ``<model>.meta.json`` next to the .pkl (see ``read_feature_version``):
+
+v1 (42 values): the 21 MediaPipe landmarks relative to the wrist (landmark 0),
+    flattened as [x0, y0, x1, y1, ..., x20, y20] and rounded to
+    FEATURE_DECIMALS (the precision testing1.json was recorded at).
+v2 (75 values): landmarks 1-20 relative to the wrist with z, rotated so the
+    wrist -> middle-finger-MCP axis points up and divided by that palm length,
+    followed by the 15 finger joint angles (radians / pi). Invariant to hand
+    distance and in-plane roll, so predictions stay confident while the hand
+    moves and fewer stable frames are needed before acting.
+
+Landmarks are read into a NumPy array in one pass and the features are
+computed vectorised, for one hand or a batch of hands.
+"""
+
+import json
+import os
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+FEATURE_DIM = NUM_LANDMARKS * 2
+FEATURE_DECIMALS = 4
+
+WRIST, MIDDLE_MCP = 0, 9
+# Landmark chains wrist -> fingertip; every interior point is a joint angle
+FINGER_CHAINS = np.array([
+    [0, 1, 2, 3, 4],      # thumb
+    [0, 5, 6, 7, 8],      # index
+    [0, 9, 10, 11, 12],   # middle
+    [0, 13, 14, 15, 16],  # ring
+    [0, 17, 18, 19, 20],  # pinky
+])
+FEATURE_DIM_V2 = (NUM_LANDMARKS - 1) * 3 + FINGER_CHAINS.shape[0] * (FINGER_CHAINS.shape[1] - 2)
+FEATURE_DIMS = {1: FEATURE_DIM, 2: FEATURE_DIM_V2}
+DEFAULT_FEATURE_VERSION = 1
+
+
+def landmarks_to_array(hand_landmarks, dims=2):
+    """(21, dims) float64 array of a MediaPipe hand's landmark coordinates.
+
+    Accepts a ``NormalizedLandmarkList`` (anything with ``.landmark``) or a
+    sequence of landmark objects with ``x``/``y``(/``z``) attributes.
+    """
+    points = getattr(hand_landmarks, 'landmark', hand_landmarks)
+    if dims == 3:
+        coords = (c for lm in points for c in (lm.x, lm.y, lm.z))
+    else:
+        coords = (c for lm in points for c in (lm.x, lm.y))
+    return np.fromiter(coords, dtype=np.float64, count=NUM_LANDMARKS * dims).reshape(NUM_LANDMARKS, dims)
+
+
+def _as_batch(points, min_dims):
+    points = np.asarray(points, dtype=np.float64)
+    if points.ndim == 2:
+        points = points[np.newaxis]
+    if points.ndim != 3 or points.shape[1] != NUM_LANDMARKS or points.shape[2] < min_dims:
+        raise ValueError(f"expected (21, {min_dims}+) or (N, 21, {min_dims}+) landmarks, "
+                         f"got shape {points.shape}")
+    return points
+
+
+def features_from_points(points, dtype=np.float32, version=1):
+    """Features of the given version from landmark coordinates.
+
+    ``points`` is (21, k) for one hand or (N, 21, k) for a batch; v1 needs
+    k >= 2 (x/y), v2 needs k == 3 (x/y/z). Returns an (N, dim) array; N is 1
+    for a single hand.
+    """
+    if version == 2:
+        return _features_v2(_as_batch(points, 3)).astype(dtype, copy=False)
+    if version != 1:
+        raise ValueError(f"unknown feature version {version}")
+    points = _as_batch(points, 2)
+    xy = points[:, :, :2]
+    relative = np.round(xy - xy[:, :1, :], FEATURE_DECIMALS)
+    return relative.reshape(len(points), FEATURE_DIM).astype(dtype, copy=False)
+
+
+def _features_v2(points):
+    relative = points[:, :, :3] - points[:, WRIST:WRIST + 1, :3]
+    axis = relative[:, MIDDLE_MCP, :2]
+    palm = np.maximum(np.linalg.norm(axis, axis=1), 1e-6)
+    # Rotate x/y so the palm axis maps onto (0, -1), i.e. fingers pointing up
+    cos = -axis[:, 1] / palm
+    sin = -axis[:, 0] / palm
+    x, y = relative[:, :, 0], relative[:, :, 1]
+    aligned = np.stack([
+        x * cos[:, None] - y * sin[:, None],
+        x * sin[:, None] + y * cos[:, None],
+        relative[:, :, 2],
+    ], axis=2) / palm[:, None, None]
+
+    joints = points[:, FINGER_CHAINS, :3]  # (N, 5, 5, 3)
+    into = joints[:, :, :-2] - joints[:, :, 1:-1]
+    out = joints[:, :, 2:] - joints[:, :, 1:-1]
+    cos_angle = np.sum(into * out, axis=3) / np.maximum(
+        np.linalg.norm(into, axis=3) * np.linalg.norm(out, axis=3), 1e-9)
+    angles = np.arccos(np.clip(cos_angle, -1.0, 1.0)) / np.pi  # (N, 5, 3)
+
+    return np.concatenate([aligned[:, 1:].reshape(len(points), -1),
+                           angles.reshape(len(points), -1)], axis=1)
+
+
+def to_feature_vec(hand_landmarks, dtype=np.float32, version=1):
+    """(1, dim) feature row for one MediaPipe hand"""
+    dims = 3 if version == 2 else 2
+    return features_from_points(landmarks_to_array(hand_landmarks, dims), dtype=dtype, version=version)
+
+
+def to_feature_batch(hands, dtype=np.float32, version=1):
+    """(N, dim) feature rows for a list of MediaPipe hands (e.g. ``multi_hand_landmarks``)"""
+    if not hands:
+        return np.empty((0, feature_dim(version)), dtype=dtype)
+    dims = 3 if version == 2 else 2
+    return features_from_points(np.stack([landmarks_to_array(h, dims) for h in hands]),
+                                dtype=dtype, version=version)
+
+
+def hand_sides(results):
+    """``[(side, score), ...]`` per detected hand from MediaPipe ``multi_handedness``.
+
+    ``side`` is MediaPipe's handedness label lower-cased ("left"/"right"), the
+    same suffix the collector puts on gesture labels; None when missing.
+    """
+    hands = results.multi_hand_landmarks or []
+    handedness = results.multi_handedness or []
+    sides = []
+    for i in range(len(hands)):
+        if i < len(handedness) and handedness[i].classification:
+            top = handedness[i].classification[0]
+            sides.append((top.label.lower(), float(top.score)))
+        else:
+            sides.append((None, 0.0))
+    return sides
+
+
+def feature_dim(version):
+    if version not in FEATURE_DIMS:
+        raise ValueError(f"unknown feature version {version}")
+    return FEATURE_DIMS[version]
+
+
+def metadata_path(model_path):
+    """Sidecar file recording how a model's features were built"""
+    return os.path.splitext(model_path)[0] + '.meta.json'
+
+
+def read_metadata(model_path):
+    """Contents of a model's ``.meta.json``, or {} for models trained without one"""
+    path = metadata_path(model_path)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_feature_version(model_path, scaler=None):
+    """Feature version a model was trained on.
+
+    Read from the model's ``.meta.json``; models trained before versioning
+    have none and are told apart by the scaler's input width.
+    """
+    meta = read_metadata(model_path)
+    if meta:
+        return int(meta.get('feature_version', DEFAULT_FEATURE_VERSION))
+    n_features = getattr(scaler, 'n_features_in_', None)
+    for version, dim in FEATURE_DIMS.items():
+        if dim == n_features:
+            return version
+    return DEFAULT_FEATURE_VERSION
+
+
+def zero_vec(version=1):
+    """Feature row used for "no hand" samples"""
+    return [0.0] * feature_dim(version)
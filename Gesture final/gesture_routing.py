@@ -0,0 +1,79 @@
+"""Handedness-routed gesture classification.
+
+Every gesture label carries its side (``play_right``, ``volume_up_left``), so a
+hand MediaPipe reports as "left" can never be a right-hand gesture.
+``train_gesture_model.py`` therefore fits one ensemble per side, on that
+side's classes plus ``none``, and pickles them together as
+``{"left": model, "right": model}`` in ``gesture_model.pkl``.
+``HandRoutedModel`` wraps that dict behind the usual ``classes_`` /
+``predict_proba`` surface: probabilities are over the union of the side
+classes, and each row is scored only by its own side's (smaller) model.
+Rows without a known side are scored by every side model and the most
+confident answer wins, ``none`` included, so an unknown hand is never pushed
+towards a gesture. The backend, the trainer's evaluation and the live
+controller all classify through this module, so they share one rule.
+"""
+
+import numpy as np
+
+
+class HandRoutedModel:
+    """Per-side classifiers behind one ``predict_proba(X, sides=None)``"""
+
+    def __init__(self, models, none_label='none'):
+        self.routed_sides = sorted(str(side) for side in models)
+        self.models = [models[side] for side in self.routed_sides]
+        self.classes_ = np.asarray(sorted({str(c) for m in self.models for c in m.classes_}))
+        self.columns = [np.searchsorted(self.classes_, np.asarray(m.classes_).astype(str))
+                        for m in self.models]
+        self.none_label = none_label
+
+    def with_models(self, models):
+        """Same routing over replacement side models (e.g. compiled fast-path ones)"""
+        routed = HandRoutedModel.__new__(HandRoutedModel)
+        routed.__dict__.update(self.__dict__, models=list(models))
+        return routed
+
+    def side_classes(self):
+        return {side: self.classes_[cols].tolist() for side, cols in zip(self.routed_sides, self.columns)}
+
+    def predict_proba(self, X, sides=None):
+        X = np.asarray(X)
+        probabilities = np.zeros((len(X), len(self.classes_)), dtype=np.float64)
+        if sides is None:
+            unknown = np.ones(len(X), dtype=bool)
+        else:
+            sides = np.asarray([s if s in self.routed_sides else '' for s in sides])
+            unknown = sides == ''
+            for side, model, cols in zip(self.routed_sides, self.models, self.columns):
+                rows = sides == side
+                if rows.any():
+                    probabilities[np.ix_(rows, cols)] = model.predict_proba(X[rows])
+        if unknown.any():
+            probabilities[unknown] = self._best_side_proba(X[unknown])
+        return probabilities
+
+    def predict(self, X, sides=None):
+        return self.classes_[np.argmax(self.predict_proba(X, sides), axis=1)]
+
+    def _best_side_proba(self, X):
+        """Per row, the probabilities of the side model with the highest top probability"""
+        candidates = np.zeros((len(self.models), len(X), len(self.classes_)), dtype=np.float64)
+        for i, (model, cols) in enumerate(zip(self.models, self.columns)):
+            candidates[i][:, cols] = model.predict_proba(X)
+        best = np.argmax(candidates.max(axis=2), axis=0)
+        return candidates[best, np.arange(len(X))]
+
+
+def as_model(loaded):
+    """The classifier for a loaded ``gesture_model.pkl``: per-side dicts become a HandRoutedModel"""
+    if isinstance(loaded, dict):
+        return HandRoutedModel(loaded)
+    return loaded
+
+
+def predict_proba(model, X, sides=None):
+    """``model.predict_proba``, routing rows by hand side when the model supports it"""
+    if sides is not None and getattr(model, 'routed_sides', None):
+        return model.predict_proba(X, sides)
+    return model.predict_proba(X)
@@ -0,0 +1,140 @@
+"""Record and replay controller sessions as timestamped landmark streams.
+
+A session file is JSON lines: one header object, then one line per camera
+frame, ``{"t": ms since start, "hands": [[side, side_score, [x0, y0, z0, ...
+x20, y20, z20]], ...]}`` with coordinates rounded to COORD_DECIMALS. A
+``.gz`` suffix gzips the stream. With ``video=True`` the raw camera frames go
+to an .mp4 next to it, one video frame per line, so a session can also be
+re-run through MediaPipe.
+
+``read_session`` yields the frames back as (21, 3) landmark arrays, and
+``FakeSpotify`` stands in for the spotipy client during a replay, logging
+every call instead of touching a real player.
+"""
+
+import gzip
+import json
+import os
+import time
+
+import numpy as np
+
+from gesture_features import NUM_LANDMARKS, hand_sides, landmarks_to_array
+
+SESSION_FORMAT = 1
+COORD_DECIMALS = 6
+
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def video_path(path):
+    base = path[:-3] if str(path).endswith('.gz') else path
+    return os.path.splitext(base)[0] + '.mp4'
+
+
+class SessionRecorder:
+    """Appends one landmark line (and optionally one video frame) per camera frame"""
+
+    def __init__(self, path, video=False, fps=30.0, **header):
+        self.path = path
+        self._file = _open(path, 'w')
+        self._started = time.monotonic()
+        self._video = None
+        self._video_args = (video_path(path), fps) if video else None
+        self.frames = 0
+        header = dict(header, session=SESSION_FORMAT,
+                      started_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+                      video=os.path.basename(video_path(path)) if video else None)
+        self._file.write(json.dumps(header) + "\n")
+
+    def write(self, results, frame_bgr=None, now=None):
+        """Record one frame's MediaPipe ``results`` (no hands is a frame too)"""
+        now = time.monotonic() if now is None else now
+        hands = []
+        for hand_lms, (side, score) in zip(results.multi_hand_landmarks or [], hand_sides(results)):
+            points = np.round(landmarks_to_array(hand_lms, 3), COORD_DECIMALS)
+            hands.append([side, round(score, 4), points.ravel().tolist()])
+        line = {"t": round((now - self._started) * 1000.0, 2), "hands": hands}
+        self._file.write(json.dumps(line, separators=(',', ':')) + "\n")
+        if self._video_args is not None and frame_bgr is not None:
+            if self._video is None:
+                import cv2
+                height, width = frame_bgr.shape[:2]
+                self._video = cv2.VideoWriter(self._video_args[0], cv2.VideoWriter_fourcc(*'mp4v'),
+                                              self._video_args[1], (width, height))
+            self._video.write(frame_bgr)
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+        if self._video is not None:
+            self._video.release()
+
+
+def read_session(path):
+    """``(header, frames)``; frames yields ``(t_ms, [(side, score, (21, 3) points), ...])``"""
+    f = _open(path, 'r')
+    header = json.loads(f.readline())
+    if header.get('session') != SESSION_FORMAT:
+        f.close()
+        raise ValueError(f"{path} is not a gesture session (format {header.get('session')})")
+
+    def frames():
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                frame = json.loads(line)
+                yield frame["t"], [
+                    (side, score, np.asarray(coords, dtype=np.float64).reshape(NUM_LANDMARKS, 3))
+                    for side, score, coords in frame["hands"]
+                ]
+
+    return header, frames()
+
+
+class FakeSpotify:
+    """spotipy.Spotify stand-in for replays: one active device, calls are logged"""
+
+    def __init__(self, volume=50, duration_ms=200000):
+        self.calls = []  # (method, args)
+        self.volume_percent = volume
+        self.progress_ms = 0
+        self.duration_ms = duration_ms
+
+    def _log(self, method, *args):
+        self.calls.append((method, args))
+
+    def devices(self):
+        return {"devices": [{"id": "replay-device", "is_active": True, "volume_percent": self.volume_percent}]}
+
+    def current_playback(self):
+        return {"progress_ms": self.progress_ms,
+                "item": {"id": "replay-track", "duration_ms": self.duration_ms}}
+
+    def start_playback(self, device_id=None):
+        self._log("start_playback", device_id)
+
+    def pause_playback(self, device_id=None):
+        self._log("pause_playback", device_id)
+
+    def next_track(self, device_id=None):
+        self._log("next_track", device_id)
+
+    def previous_track(self, device_id=None):
+        self._log("previous_track", device_id)
+
+    def volume(self, volume_percent, device_id=None):
+        self.volume_percent = volume_percent
+        self._log("volume", volume_percent, device_id)
+
+    def seek_track(self, position_ms, device_id=None):
+        self.progress_ms = position_ms
+        self._log("seek_track", position_ms, device_id)
+
+    def current_user_saved_tracks_add(self, tracks):
+        self._log("current_user_saved_tracks_add", list(tracks))
@@ -11,8 +11,16 @@
 #   GESTURE_CAM_INDEX=0|1|2
 #   GESTURE_MIRROR=0|1
 #   GESTURE_CONF_THRESHOLD=0.75
-#   GESTURE_STABLE_FRAMES=5
+#   GESTURE_STABLE_FRAMES=5   (v2-feature models are steadier; 2-3 is usually enough)
+#   GESTURE_MAX_HANDS=2       (both hands are classified in one call and debounced
+#                              separately, e.g. hold volume left while skipping right)
+#   GESTURE_FRAME_WIDTH=640, GESTURE_FRAME_HEIGHT=360
 #   SPOTIFY_CACHE_PATH=.cache-gesture-session
+#   GESTURE_RECORD=session.jsonl.gz  (save the landmark stream of this run, see gesture_session.py)
+#   GESTURE_RECORD_VIDEO=1           (also save the raw camera video next to it)
+#   GESTURE_REPLAY=session.jsonl.gz  (no camera or Spotify: feed a recorded session through the
+#                                     same features, smoothing and ACTIONS against a fake client,
+#                                     then report per-frame time and gesture-to-action latency)
 
 import os, sys, time
 from collections import deque
@@ -24,6 +32,10 @@ import numpy as np
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 
+from gesture_features import features_from_points, hand_sides, landmarks_to_array, read_feature_version
+from gesture_routing import as_model
+from gesture_session import FakeSpotify, SessionRecorder, read_session
+
 # ======== Camera / Platform ========
 IS_MAC = (sys.platform == "darwin")
 CAM_INDEX = int(os.getenv("GESTURE_CAM_INDEX", "0"))
@@ -34,7 +46,13 @@ if env_mirror is not None:
 else:
     MIRROR_FEED = IS_MAC  # default: mirror on macOS only
 
-FRAME_WIDTH, FRAME_HEIGHT = 1280, 720
+# 640x360 keeps the 16:9 aspect (same normalised landmarks) at a quarter of the pixels
+FRAME_WIDTH  = int(os.getenv("GESTURE_FRAME_WIDTH", "640"))
+FRAME_HEIGHT = int(os.getenv("GESTURE_FRAME_HEIGHT", "360"))
+
+RECORD_PATH  = os.getenv("GESTURE_RECORD")
+RECORD_VIDEO = os.getenv("GESTURE_RECORD_VIDEO", "0") in ("1", "true", "True")
+REPLAY_PATH  = os.getenv("GESTURE_REPLAY")
 
 def open_camera(idx: int):
     if IS_MAC:
@@ -52,46 +70,55 @@ MODEL_PATH, SCALER_PATH = "gesture_model.pkl", "scaler.pkl"
 if not (os.path.exists(MODEL_PATH) and os.path.exists(SCALER_PATH)):
     raise FileNotFoundError("Missing gesture_model.pkl or scaler.pkl. Train first.")
 
-model  = joblib.load(MODEL_PATH)
+# A handedness-routed model ({"left": model, "right": model}) is wrapped so each hand
+# uses its side's model, with the backend's rule for hands of unknown side
+model  = as_model(joblib.load(MODEL_PATH))
 scaler = joblib.load(SCALER_PATH)
+FEATURE_VERSION = read_feature_version(MODEL_PATH, scaler)
+ROUTED = bool(getattr(model, "routed_sides", None))
 CLASSES = list(model.classes_) if hasattr(model, "classes_") else None
 
+def _scores(clf, X):
+    labels = np.asarray(clf.classes_) if hasattr(clf, "classes_") else np.array(CLASSES)
+    if hasattr(clf, "predict_proba"):
+        return labels, clf.predict_proba(X)
+    probs = np.zeros((len(X), len(labels)))
+    for i, pred in enumerate(clf.predict(X)):
+        probs[i, labels.tolist().index(pred)] = 1.0
+    return labels, probs
+
+def classify(feat_s, sides):
+    """[(labels, probs)] per hand from one batched call; a routed model scores each hand by side"""
+    if ROUTED:
+        return [(model.classes_, p) for p in model.predict_proba(feat_s, sides)]
+    labels, probs = _scores(model, feat_s)
+    return [(labels, p) for p in probs]
+
 # ======== MediaPipe Hands ========
+# The tracker itself is built in main() for camera runs; replays carry recorded landmarks
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=1,
-    min_detection_confidence=0.6,
-    min_tracking_confidence=0.6
-)
+MAX_HANDS = int(os.getenv("GESTURE_MAX_HANDS", "2"))
 draw = mp.solutions.drawing_utils
 
-def to_feature_vec(hand_landmarks):
-    base_x = hand_landmarks.landmark[0].x
-    base_y = hand_landmarks.landmark[0].y
-    vec = []
-    for lm in hand_landmarks.landmark:
-        vec.append(lm.x - base_x)
-        vec.append(lm.y - base_y)
-    return np.array(vec, dtype=np.float32).reshape(1, -1)  # (1,42)
-
 # ======== Spotify Auth ========
 SPOTIPY_CLIENT_ID     = os.getenv("SPOTIPY_CLIENT_ID")
 SPOTIPY_CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
 SPOTIPY_REDIRECT_URI  = os.getenv("SPOTIPY_REDIRECT_URI", "http://127.0.0.1:8888/callback")
 SPOTIFY_CACHE_PATH    = os.getenv("SPOTIFY_CACHE_PATH", ".cache-gesture-session")
 
-if not (SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET):
-    raise EnvironmentError("Set SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET.")
-
 SCOPES = "user-modify-playback-state user-read-playback-state user-library-modify"
-sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=SPOTIPY_CLIENT_ID,
-    client_secret=SPOTIPY_CLIENT_SECRET,
-    redirect_uri=SPOTIPY_REDIRECT_URI,
-    scope=SCOPES,
-    cache_path=SPOTIFY_CACHE_PATH,
-))
+if REPLAY_PATH:
+    sp = FakeSpotify()
+else:
+    if not (SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET):
+        raise EnvironmentError("Set SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET.")
+    sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
+        client_id=SPOTIPY_CLIENT_ID,
+        client_secret=SPOTIPY_CLIENT_SECRET,
+        redirect_uri=SPOTIPY_REDIRECT_URI,
+        scope=SCOPES,
+        cache_path=SPOTIFY_CACHE_PATH,
+    ))
 
 def get_device_id():
     devs = sp.devices().get("devices", [])
@@ -101,39 +128,34 @@ def get_device_id():
     return (active[0] if active else devs[0]).get("id")
 
 # ======== Spotify Actions ========
+# Cooldown is per hand, so a left-hand action never blocks a right-hand one
 ACTION_COOLDOWN_SEC = float(os.getenv("GESTURE_ACTION_COOLDOWN", "1.0"))
-_last_action_at = 0.0
-def cooldown_ok():
-    global _last_action_at
-    now = time.time()
-    if now - _last_action_at >= ACTION_COOLDOWN_SEC:
-        _last_action_at = now
+_last_action_at = {}
+def cooldown_ok(side, now=None):
+    now = time.time() if now is None else now
+    last = _last_action_at.get(side)
+    if last is None or now - last >= ACTION_COOLDOWN_SEC:
+        _last_action_at[side] = now
         return True
     return False
 
 def do_play():
-    if cooldown_ok():
-        did = get_device_id()
-        sp.start_playback(device_id=did)
+    did = get_device_id()
+    sp.start_playback(device_id=did)
 
 def do_pause():
-    if cooldown_ok():
-        did = get_device_id()
-        sp.pause_playback(device_id=did)
+    did = get_device_id()
+    sp.pause_playback(device_id=did)
 
 def do_next():
-    if cooldown_ok():
-        did = get_device_id()
-        sp.next_track(device_id=did)
+    did = get_device_id()
+    sp.next_track(device_id=did)
 
 def do_prev():
-    if cooldown_ok():
-        did = get_device_id()
-        sp.previous_track(device_id=did)
+    did = get_device_id()
+    sp.previous_track(device_id=did)
 
 def do_volume_change(delta=+10):
-    if not cooldown_ok():
-        return
     devs = sp.devices().get("devices", [])
     if not devs: return
     cur = [x for x in devs if x.get("is_active")]
@@ -143,8 +165,6 @@ def do_volume_change(delta=+10):
     sp.volume(new_v, device_id=cur.get("id"))
 
 def do_like_current():
-    if not cooldown_ok():
-        return
     pb = sp.current_playback()
     if pb and pb.get("item"):
         tid = pb["item"]["id"]
@@ -152,8 +172,6 @@ def do_like_current():
             sp.current_user_saved_tracks_add([tid])
 
 def do_seek_forward(ms=30000):
-    if not cooldown_ok():
-        return
     pb = sp.current_playback()
     if not pb or not pb.get("item"):
         return
@@ -178,9 +196,10 @@ ACTIONS = {
 # ======== Confidence + Smoothing ========
 CONF_THRESHOLD = float(os.getenv("GESTURE_CONF_THRESHOLD", "0.75"))
 STABLE_FRAMES  = int(os.getenv("GESTURE_STABLE_FRAMES",  "5"))
-history = deque(maxlen=STABLE_FRAMES)
+histories = {}  # hand side -> recent labels
 
-def stable_decision(probs, labels):
+def stable_decision(probs, labels, side=None):
+    history = histories.setdefault(side, deque(maxlen=STABLE_FRAMES))
     top_idx = int(np.argmax(probs))
     top_label = labels[top_idx]
     top_prob  = float(probs[top_idx])
@@ -196,13 +215,108 @@ def stable_decision(probs, labels):
         return top_label, top_prob
     return "none", top_prob
 
+def handle_hands(points, sides, now=None):
+    """One frame's hands ((N, 21, 3) landmarks + sides) → smoothing → ACTIONS.
+
+    Returns [(side, raw_label, stable_label, top_prob, acted)] per hand. Shared by the
+    camera loop and replay(), which passes the recorded time as ``now``.
+    """
+    out = []
+    if len(sides):
+        # All hands through the scaler in one batched call, then their side's model
+        feat_s = scaler.transform(features_from_points(points, version=FEATURE_VERSION))
+        for side, (labels, probs) in zip(sides, classify(feat_s, sides)):
+            stable_label, top_prob = stable_decision(probs, labels, side)
+            stable_label = str(stable_label)
+            raw_label = str(labels[int(np.argmax(probs))]) if top_prob >= CONF_THRESHOLD else "none"
+            acted = False
+            if stable_label != "none":
+                action = ACTIONS.get(stable_label)
+                if action and cooldown_ok(side, now):
+                    action()
+                    acted = True
+            out.append((side, raw_label, stable_label, top_prob, acted))
+    # A hand that left the frame starts its streak over
+    for side in list(histories):
+        if side not in sides:
+            histories[side].clear()
+    return out
+
+# ======== Replay ========
+def _percentiles(values):
+    if not values:
+        return "n/a"
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return f"p50={p50:.2f}  p95={p95:.2f}  p99={p99:.2f}  max={max(values):.2f}  (n={len(values)})"
+
+def replay(path):
+    """Run a recorded session through handle_hands() against FakeSpotify and report timings.
+
+    Gesture-to-action latency runs from the first frame of the raw-label streak that
+    fired (recorded camera time) to the end of processing the frame that fired it.
+    """
+    header, frames = read_session(path)
+    print(f"▶️  Replaying {path}  (recorded {header.get('started_at')}, "
+          f"features v{header.get('feature_version')}, model v{FEATURE_VERSION})")
+    frame_ms, latency_ms, fired = [], [], {}
+    streaks = {}  # side -> (raw label, recorded ms it started)
+    n_frames = n_hand_frames = 0
+    for t_ms, recorded in frames:
+        recorded = recorded[:MAX_HANDS]
+        sides = [side for side, _, _ in recorded]
+        points = np.stack([p for _, _, p in recorded]) if recorded else None
+        start = time.perf_counter()
+        decisions = handle_hands(points, sides, now=t_ms / 1000.0)
+        took = (time.perf_counter() - start) * 1000.0
+        frame_ms.append(took)
+        n_frames += 1
+        n_hand_frames += bool(recorded)
+        for side in list(streaks):
+            if side not in sides:
+                del streaks[side]
+        for side, raw_label, stable_label, _, acted in decisions:
+            if streaks.get(side, (None,))[0] != raw_label:
+                streaks[side] = (raw_label, t_ms)
+            if acted:
+                fired[stable_label] = fired.get(stable_label, 0) + 1
+                latency_ms.append(t_ms - streaks[side][1] + took)
+                # A held gesture re-fires after the cooldown; time that from now
+                streaks[side] = (raw_label, t_ms)
+
+    print(f"Frames: {n_frames}  with hands: {n_hand_frames}")
+    print(f"Per-frame processing ms:    {_percentiles(frame_ms)}")
+    print(f"Gesture→action latency ms:  {_percentiles(latency_ms)}")
+    print(f"Actions: {dict(sorted(fired.items())) or 'none'}")
+    calls = {}
+    for method, _ in sp.calls:
+        calls[method] = calls.get(method, 0) + 1
+    print(f"Spotify calls: {dict(sorted(calls.items())) or 'none'}")
+    return {"frame_ms": frame_ms, "latency_ms": latency_ms, "actions": fired, "calls": sp.calls}
+
 # ======== Main Loop ========
 def main():
+    if REPLAY_PATH:
+        replay(REPLAY_PATH)
+        return
+
     cap = open_camera(CAM_INDEX)
+    hands = mp_hands.Hands(
+        static_image_mode=False,
+        max_num_hands=MAX_HANDS,
+        min_detection_confidence=0.6,
+        min_tracking_confidence=0.6
+    )
     print("🎵 Gesture→Spotify running. Press 'q' to quit.")
     print(f"Classes: {CLASSES}")
     print(f"Mirror:{MIRROR_FEED}  Thr:{CONF_THRESHOLD}  Stable:{STABLE_FRAMES}")
 
+    recorder = None
+    if RECORD_PATH:
+        recorder = SessionRecorder(RECORD_PATH, video=RECORD_VIDEO, fps=cap.get(cv2.CAP_PROP_FPS) or 30.0,
+                                   feature_version=FEATURE_VERSION, mirror=MIRROR_FEED,
+                                   max_hands=MAX_HANDS, width=FRAME_WIDTH, height=FRAME_HEIGHT)
+        print(f"⏺️  Recording to {RECORD_PATH}" + (" (+ video)" if RECORD_VIDEO else ""))
+
     while True:
         ok, img = cap.read()
         if not ok:
@@ -213,33 +327,20 @@ def main():
 
         rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         res = hands.process(rgb)
+        if recorder:
+            recorder.write(res, img)
 
         overlay = img.copy()
         shown_label, shown_prob = "none", 0.0
 
-        if res.multi_hand_landmarks and res.multi_handedness:
-            hand_lms = res.multi_hand_landmarks[0]
+        detected = (res.multi_hand_landmarks or [])[:MAX_HANDS] if res.multi_handedness else []
+        for hand_lms in detected:
             draw.draw_landmarks(overlay, hand_lms, mp_hands.HAND_CONNECTIONS)
-
-            feat = to_feature_vec(hand_lms)
-            feat_s = scaler.transform(feat)
-
-            if hasattr(model, "predict_proba"):
-                probs = model.predict_proba(feat_s)[0]
-                labels = model.classes_
-            else:
-                pred = model.predict(feat_s)[0]
-                labels = np.array(CLASSES)
-                probs = np.ones(len(labels)) / len(labels)
-                probs[labels.tolist().index(pred)] = 1.0
-
-            stable_label, top_prob = stable_decision(probs, labels)
-            shown_label, shown_prob = stable_label, top_prob
-
-            if stable_label != "none":
-                action = ACTIONS.get(stable_label)
-                if action:
-                    action()
+        sides = [side for side, _ in hand_sides(res)][:len(detected)]
+        points = np.stack([landmarks_to_array(h, 3) for h in detected]) if detected else None
+        for _, _, stable_label, top_prob, _ in handle_hands(points, sides):
+            if top_prob >= shown_prob:
+                shown_label, shown_prob = stable_label, top_prob
 
         # HUD
         cv2.putText(overlay, f"Pred: {shown_label}  p={shown_prob:.2f}",
@@ -252,9 +353,15 @@ def main():
             break
 
     cap.release()
+    hands.close()
     cv2.destroyAllWindows()
+    if recorder:
+        recorder.close()
+        print(f"Saved {recorder.frames} frames to {RECORD_PATH}")
 
 if __name__ == "__main__":
     main()
 
 # GESTURE_MIRROR=1 GESTURE_CAM_INDEX=0 python3 maintesting_spotify.py
+# GESTURE_RECORD=session.jsonl.gz python3 maintesting_spotify.py
+# GESTURE_REPLAY=session.jsonl.gz python3 maintesting_spotify.py
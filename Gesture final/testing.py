@@ -5,10 +5,14 @@ import mediapipe as mp
 import joblib
 import numpy as np
 
+from gesture_features import hand_sides, read_feature_version, to_feature_vec
+from gesture_routing import as_model, predict_proba
+
 # ==== Model ====
-model  = joblib.load("gesture_model.pkl")
+# Per-side {"left": model, "right": model} dicts are routed by handedness
+model  = as_model(joblib.load("gesture_model.pkl"))
 scaler = joblib.load("scaler.pkl")
-CLASSES = list(model.classes_)
+FEATURE_VERSION = read_feature_version("gesture_model.pkl", scaler)
 
 # ==== Camera settings ====
 IS_MAC = (sys.platform == "darwin")
@@ -27,8 +31,8 @@ if IS_MAC:
 else:
     cap = cv2.VideoCapture(CAM_INDEX)
 
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+cap.set(cv2.CAP_PROP_FRAME_WIDTH, int(os.getenv("GESTURE_FRAME_WIDTH", "640")))
+cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(os.getenv("GESTURE_FRAME_HEIGHT", "360")))
 if not cap.isOpened():
     raise RuntimeError(f"Could not open camera index {CAM_INDEX}")
 
@@ -59,21 +63,15 @@ try:
             hand_landmarks = result.multi_hand_landmarks[0]
             draw.draw_landmarks(img, hand_landmarks, mp_hands.HAND_CONNECTIONS)
 
-            # Normalize using wrist (landmark 0) as base
-            base_x = hand_landmarks.landmark[0].x
-            base_y = hand_landmarks.landmark[0].y
-
-            feat = []
-            for lm in hand_landmarks.landmark:
-                feat.append(round(lm.x - base_x, 4))
-                feat.append(round(lm.y - base_y, 4))
+            # Features in the version the model was trained on
+            feat = to_feature_vec(hand_landmarks, version=FEATURE_VERSION)
 
             # Scale & predict
-            Xs = scaler.transform([feat])
+            Xs = scaler.transform(feat)
             if hasattr(model, "predict_proba"):
-                probs = model.predict_proba(Xs)[0]
+                probs = predict_proba(model, Xs, [hand_sides(result)[0][0]])[0]
                 max_prob = float(probs.max())
-                predicted_label = CLASSES[int(probs.argmax())]
+                predicted_label = model.classes_[int(probs.argmax())]
             else:
                 predicted_label = model.predict(Xs)[0]
                 max_prob = 1.0
@@ -0,0 +1,230 @@
+# train_gesture_model.py
+# Trains the RF + SVM + KNN soft-voting ensemble on testing1.gds and writes
+# gesture_model.pkl, scaler.pkl and gesture_model.meta.json (feature version,
+# classes, accuracy). Files are replaced atomically, so a running backend
+# picks the new model up through its hot-reload watcher.
+#
+# With GESTURE_HAND_ROUTING=1 (default) one ensemble is trained per hand side,
+# on that side's classes plus "none", and both are pickled together as
+# {"left": model, "right": model} in gesture_model.pkl. The backend routes each
+# hand to its side's model using MediaPipe's handedness. A sample's side is
+# its recorded "hand", else its label suffix; "none" samples without a
+# recorded hand go to both sides.
+#
+# A logistic gesture-vs-none "rejector" is trained as well and stored in the
+# meta file. The backend runs it first and skips the full ensemble for frames
+# it is confident are "none". Its threshold keeps GESTURE_REJECTOR_RECALL of
+# gesture frames, measured on cross-validated scores of the same rejector
+# pipeline, so it is calibrated for the rejector that is actually saved.
+#
+# Env:
+#   GESTURE_DATASET=testing1.gds   (collector JSON files are read too; convert them
+#                                  with gesture_dataset.py)
+#   GESTURE_FEATURE_VERSION=1     (2 = scale/rotation-normalised features; needs
+#                                  samples recorded with raw landmarks)
+#   GESTURE_MODEL_OUT=gesture_model.pkl, GESTURE_SCALER_OUT=scaler.pkl
+#   GESTURE_TEST_SPLIT=0.2
+#   GESTURE_REJECTOR_RECALL=0.995 (0 = no rejector)
+#   GESTURE_HAND_ROUTING=1        (0 = one flat model over all classes)
+
+import os, sys, json, time, hashlib
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import StratifiedKFold, cross_val_predict, train_test_split
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from gesture_dataset import load_dataset
+from gesture_features import feature_dim, features_from_points, metadata_path
+from gesture_routing import as_model
+
+# ================= CONFIG =================
+DATASET = os.getenv("GESTURE_DATASET", "testing1.gds")
+FEATURE_VERSION = int(os.getenv("GESTURE_FEATURE_VERSION", "1"))
+MODEL_OUT = os.getenv("GESTURE_MODEL_OUT", "gesture_model.pkl")
+SCALER_OUT = os.getenv("GESTURE_SCALER_OUT", "scaler.pkl")
+TEST_SPLIT = float(os.getenv("GESTURE_TEST_SPLIT", "0.2"))
+REJECTOR_RECALL = float(os.getenv("GESTURE_REJECTOR_RECALL", "0.995"))
+HAND_ROUTING = os.getenv("GESTURE_HAND_ROUTING", "1") in ("1", "true", "True")
+NONE_LABEL = "none"
+SIDES = ("left", "right")
+SEED = 42
+
+def load_samples(path, version):
+    """(X, y, sides) for the requested feature version from a .gds (or collector JSON) dataset.
+
+    A sample's side is its recorded handedness, else its label suffix ("" if unknown).
+    """
+    data = load_dataset(path)
+    y, sides = data.y, data.sides()
+    if version == 1:
+        return np.asarray(data.X, dtype=np.float64), y, sides
+
+    # Newer feature versions are derived from the raw landmarks the collector stores
+    with_points = data.has_landmarks()
+    missing = int(np.sum((y != NONE_LABEL) & ~with_points))
+    if missing:
+        sys.exit(f"❌ {missing} gesture samples in {path} have no raw landmarks; "
+                 f"re-record with collect_gestures.py to train v{version} features")
+    X = np.zeros((len(data), feature_dim(version)), dtype=np.float64)
+    if with_points.any():
+        X[with_points] = features_from_points(data.landmarks[with_points], dtype=np.float64, version=version)
+    return X, y, sides
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_model():
+    return VotingClassifier([
+        ("rf", RandomForestClassifier(n_estimators=300, n_jobs=-1, random_state=SEED)),
+        ("svm", SVC(kernel="rbf", C=10.0, gamma="scale", probability=True, random_state=SEED)),
+        ("knn", KNeighborsClassifier(n_neighbors=5)),
+    ], voting="soft")
+
+def fit_model(X, y, sides):
+    """Flat ensemble, or {side: ensemble} trained on that side's (and side-less) rows"""
+    if not HAND_ROUTING:
+        return build_model().fit(X, y)
+    routed = {}
+    for side in SIDES:
+        rows = (sides == side) | (sides == "")
+        if np.any(y[rows] != NONE_LABEL):
+            routed[side] = build_model().fit(X[rows], y[rows])
+    return routed
+
+def model_classes(model):
+    if isinstance(model, dict):
+        return sorted({str(c) for m in model.values() for c in m.classes_})
+    return [str(c) for c in model.classes_]
+
+def predict_rows(model, X, sides):
+    """Labels for X, one per row, routed by side exactly as the backend does"""
+    if not isinstance(model, dict):
+        return model.predict(X)
+    return as_model(model).predict(X, sides).astype(str)
+
+def side_accuracy(model, X, y, sides):
+    """Each side model's accuracy on its side's rows plus the side-less ones"""
+    return {side: round(float(m.score(X[(sides == side) | (sides == "")],
+                                      y[(sides == side) | (sides == "")])), 4)
+            for side, m in model.items()}
+
+def build_rejector():
+    return LogisticRegression(C=1.0, max_iter=2000)
+
+def cross_val_rejector_scores(X, y):
+    """Out-of-fold P(gesture) of the scaler + rejector pipeline for every row of (unscaled) X"""
+    folds = StratifiedKFold(n_splits=5, shuffle=True, random_state=SEED)
+    return cross_val_predict(make_pipeline(StandardScaler(), build_rejector()), X, y != NONE_LABEL,
+                             cv=folds, method="predict_proba")[:, 1]
+
+def rejector_threshold(scores, y):
+    """Highest P(gesture) cut-off that still passes REJECTOR_RECALL of the gesture rows"""
+    gesture_scores = np.sort(scores[y != NONE_LABEL])
+    k = int(np.floor((1.0 - REJECTOR_RECALL) * len(gesture_scores)))
+    return float(gesture_scores[min(k, len(gesture_scores) - 1)])
+
+def rejector_params(rejector, threshold):
+    return {
+        "coef": rejector.coef_[0].tolist(),
+        "intercept": float(rejector.intercept_[0]),
+        "threshold": threshold,
+        "none_label": NONE_LABEL,
+    }
+
+def write_json(path, payload):
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+def save_atomic(path, write):
+    tmp = f"{path}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def main():
+    print("=== Gesture Model Training ===")
+    X, y, sides = load_samples(DATASET, FEATURE_VERSION)
+    labels, counts = np.unique(y, return_counts=True)
+    print(f"Dataset: {DATASET} | samples={len(y)} | features=v{FEATURE_VERSION} ({X.shape[1]})"
+          f" | routing={'handedness' if HAND_ROUTING else 'off'}")
+    print("Classes: " + ", ".join(f"{l}={c}" for l, c in zip(labels, counts)))
+
+    X_train, X_test, y_train, y_test, sides_train, sides_test = train_test_split(
+        X, y, sides, test_size=TEST_SPLIT, stratify=y, random_state=SEED)
+    scaler = StandardScaler().fit(X_train)
+    started = time.time()
+    model = fit_model(scaler.transform(X_train), y_train, sides_train)
+    # Every held-out row counts once; side-less rows take the backend's unknown-side rule
+    predicted = predict_rows(model, scaler.transform(X_test), sides_test)
+    accuracy = float(accuracy_score(y_test, predicted))
+    print(f"\nHeld-out accuracy: {accuracy:.4f} (trained in {time.time() - started:.1f}s)")
+    print(classification_report(y_test, predicted, digits=3))
+    per_side = {}
+    if isinstance(model, dict):
+        per_side = side_accuracy(model, scaler.transform(X_test), y_test, sides_test)
+        print("Per-side accuracy: " + ", ".join(f"{s}={a}" for s, a in per_side.items()))
+
+    use_rejector = REJECTOR_RECALL > 0 and NONE_LABEL in labels
+    if use_rejector:
+        # Held-out estimate of the whole procedure: threshold from the training split's
+        # cross-validated scores, applied to the split-fitted rejector on the test rows
+        rejector = build_rejector().fit(scaler.transform(X_train), y_train != NONE_LABEL)
+        threshold = rejector_threshold(cross_val_rejector_scores(X_train, y_train), y_train)
+        scores = rejector.predict_proba(scaler.transform(X_test))[:, 1]
+        passed = scores >= threshold
+        cascade = np.where(passed, predicted, NONE_LABEL)
+        rejector_report = {
+            "holdout_threshold": round(threshold, 6),
+            "holdout_rejection_rate": round(float(1.0 - passed.mean()), 4),
+            "holdout_none_rejected": round(float((~passed)[y_test == NONE_LABEL].mean()), 4),
+            "holdout_gesture_recall": round(float(passed[y_test != NONE_LABEL].mean()), 4),
+            "holdout_cascade_accuracy": round(float(accuracy_score(y_test, cascade)), 4),
+        }
+        print("Rejector (stage 1): " + ", ".join(f"{k}={v}" for k, v in rejector_report.items()))
+
+    # Final model on all samples; the saved rejector's threshold comes from the same procedure
+    scaler = StandardScaler().fit(X)
+    model = fit_model(scaler.transform(X), y, sides)
+    if use_rejector:
+        rejector = build_rejector().fit(scaler.transform(X), y != NONE_LABEL)
+        threshold = rejector_threshold(cross_val_rejector_scores(X, y), y)
+        print(f"Rejector threshold (all samples, cross-validated): {threshold:.6f}")
+
+    meta = {
+        "feature_version": FEATURE_VERSION,
+        "feature_dim": int(X.shape[1]),
+        "classes": model_classes(model),
+        "samples": int(len(y)),
+        "holdout_accuracy": round(accuracy, 4),
+        "dataset": os.path.basename(DATASET),
+        "dataset_sha256": file_sha256(DATASET),
+        "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if isinstance(model, dict):
+        meta["routing"] = {
+            "by": "handedness",
+            "sides": {side: [str(c) for c in m.classes_] for side, m in model.items()},
+            "holdout_accuracy": per_side,
+        }
+    if use_rejector:
+        meta["rejector"] = dict(rejector_params(rejector, threshold), **rejector_report)
+    # Metadata first: the model/scaler pair is what the backend watches
+    save_atomic(metadata_path(MODEL_OUT), lambda p: write_json(p, meta))
+    save_atomic(SCALER_OUT, lambda p: joblib.dump(scaler, p))
+    save_atomic(MODEL_OUT, lambda p: joblib.dump(model, p))
+    print(f"✅ Saved {MODEL_OUT}, {SCALER_OUT}, {metadata_path(MODEL_OUT)}")
+
+if __name__ == "__main__":
+    main()
+
+# GESTURE_FEATURE_VERSION=2 python3 train_gesture_model.py
@@ -6,6 +6,9 @@ import numpy as np
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 
+from gesture_features import hand_sides, read_feature_version, to_feature_vec
+from gesture_routing import as_model, predict_proba
+
 # ------------ Settings ------------
 CONF_THRESHOLD = float(os.getenv("GESTURE_CONF_THRESHOLD", "0.80"))
 COOLDOWN_SEC   = float(os.getenv("GESTURE_ACTION_COOLDOWN", "1.0"))
@@ -53,9 +56,10 @@ def device_id():
         return None
 
 # ------------ Model & MediaPipe ------------
-model  = joblib.load("gesture_model.pkl")
+# Per-side {"left": model, "right": model} dicts are routed by handedness
+model  = as_model(joblib.load("gesture_model.pkl"))
 scaler = joblib.load("scaler.pkl")
-CLASSES = list(model.classes_) if hasattr(model, "classes_") else []
+FEATURE_VERSION = read_feature_version("gesture_model.pkl", scaler)
 
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(max_num_hands=1, min_detection_confidence=0.6, min_tracking_confidence=0.6)
@@ -67,8 +71,8 @@ if IS_MAC:
 else:
     cap = cv2.VideoCapture(CAM_INDEX)
 cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+cap.set(cv2.CAP_PROP_FRAME_WIDTH, int(os.getenv("GESTURE_FRAME_WIDTH", "640")))
+cap.set(cv2.CAP_PROP_FRAME_HEIGHT, int(os.getenv("GESTURE_FRAME_HEIGHT", "360")))
 if not cap.isOpened():
     raise RuntimeError(f"Could not open camera index {CAM_INDEX}")
 
@@ -190,18 +194,14 @@ try:
             hand_lm = res.multi_hand_landmarks[0]
             draw.draw_landmarks(img, hand_lm, mp_hands.HAND_CONNECTIONS)
 
-            # wrist-relative features (42)
-            bx, by = hand_lm.landmark[0].x, hand_lm.landmark[0].y
-            feat = []
-            for lm in hand_lm.landmark:
-                feat.append(round(lm.x - bx, 4))
-                feat.append(round(lm.y - by, 4))
+            # features in the version the model was trained on
+            feat = to_feature_vec(hand_lm, version=FEATURE_VERSION)
 
-            Xs = scaler.transform([feat])
+            Xs = scaler.transform(feat)
             if hasattr(model, "predict_proba"):
-                probs = model.predict_proba(Xs)[0]
+                probs = predict_proba(model, Xs, [hand_sides(res)[0][0]])[0]
                 idx = int(np.argmax(probs))
-                pred = CLASSES[idx]
+                pred = model.classes_[idx]
                 p = float(probs[idx])
             else:
                 pred = model.predict(Xs)[0]
@@ -0,0 +1,394 @@
+"""Gesture inference benchmark suite.
+
+Four parts, all on the serving stack the backend actually runs (fast path,
+cascade and hand routing as configured):
+
+- dataset: ``testing1.gds`` replayed through feature extraction, scaling and
+  ``predict_proba``, one row at a time and in batches
+- handler: JPEG frames through the full ``/api/gesture/predict`` handler with
+  the Flask test client; per-stage times come from its ``Server-Timing``
+- concurrency: requests/s and latency percentiles at several client counts,
+  for ``/api/gesture/predict`` and ``/api/gesture/predict_landmarks``
+- baseline: results are written as JSON and compared against a saved
+  baseline; a metric more than ``--tolerance`` worse is a regression
+
+Recorded frames (``--frames DIR`` of .jpg/.png files) give realistic hand
+timings. Without them synthetic frames are used; they contain no hand, so
+they measure decode, gating and a full palm-detection pass per frame.
+
+Usage (from backend/):
+    python benchmark_gesture.py --save-baseline      # record a baseline
+    python benchmark_gesture.py --check              # exit 1 on regressions
+Environment settings (GESTURE_INFERENCE_WORKERS, GESTURE_CASCADE, ...) apply
+as they do for app.py.
+"""
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GESTURE_DIR = os.path.join(HERE, '..', 'Gesture final')
+DEFAULT_DATASET = os.path.join(GESTURE_DIR, 'testing1.gds')
+DEFAULT_BASELINE = os.path.join(HERE, 'gesture_benchmark_baseline.json')
+BATCH_SIZES = (8, 64, 512)
+CONCURRENCY = (1, 2, 4, 8)
+
+
+def summarize(durations_ms):
+    """p50/p95/p99/mean of a list of durations in ms"""
+    values = np.asarray(durations_ms, dtype=np.float64)
+    if values.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": int(values.size), "mean_ms": round(float(values.mean()), 4),
+            "p50_ms": round(float(p50), 4), "p95_ms": round(float(p95), 4), "p99_ms": round(float(p99), 4)}
+
+
+def load_dataset(path, limit=None):
+    """``(points, labels, sides)`` from a ``.gds`` dataset (or collector JSON).
+
+    Samples without raw landmarks are rebuilt from their v1 features
+    (wrist-relative x/y), which reproduces those features exactly.
+    """
+    import gesture_dataset
+
+    data = gesture_dataset.load_dataset(path)
+    rows = slice(None, limit)
+    if data.meta.get('feature_version', 1) != 1 and not data.has_landmarks()[rows].all():
+        raise ValueError(f"{path} holds v{data.meta['feature_version']} features; every sample needs raw landmarks")
+    X = np.asarray(data.X[rows], dtype=np.float64)
+    points = np.zeros((len(X), 21, 3), dtype=np.float64)
+    points[:, :, :2] = 0.5 + X.reshape(len(X), 21, 2)
+    with_points = data.has_landmarks()[rows]
+    if with_points.any():
+        points[with_points] = data.landmarks[rows][with_points]
+    sides = [side or None for side in data.sides()[rows].tolist()]
+    return points, data.y[rows].tolist(), sides
+
+
+def bench_dataset(models, points, sides, batch_sizes=BATCH_SIZES):
+    """Per-row stage timings, then batched throughput, over the dataset"""
+    from gesture_cascade import cascade_proba
+    from gesture_features import features_from_points
+
+    version = models.feature_version
+    if version == 2 and not np.any(points[:, :, 2]):
+        raise SystemExit("v2 model needs recorded landmarks with z; this dataset only has v1 features")
+    scaler = models.inference_scaler
+    stages = {"features": [], "scale": [], "predict": []}
+    started = time.perf_counter()
+    for i in range(len(points)):
+        t0 = time.perf_counter()
+        features = features_from_points(points[i], version=version)
+        t1 = time.perf_counter()
+        scaled = scaler.transform(features)
+        t2 = time.perf_counter()
+        cascade_proba(models, scaled, sides[i:i + 1])
+        t3 = time.perf_counter()
+        stages["features"].append((t1 - t0) * 1000.0)
+        stages["scale"].append((t2 - t1) * 1000.0)
+        stages["predict"].append((t3 - t2) * 1000.0)
+    single = {
+        "rows": len(points),
+        "rows_per_s": round(len(points) / (time.perf_counter() - started), 1),
+        "stages": {name: summarize(values) for name, values in stages.items()},
+    }
+
+    batched = {}
+    for size in batch_sizes:
+        if size > len(points):
+            continue
+        durations = []
+        started = time.perf_counter()
+        for start in range(0, len(points) - size + 1, size):
+            t0 = time.perf_counter()
+            scaled = scaler.transform(features_from_points(points[start:start + size], version=version))
+            cascade_proba(models, scaled, sides[start:start + size])
+            durations.append((time.perf_counter() - t0) * 1000.0)
+        rows = len(durations) * size
+        batched[str(size)] = dict(summarize(durations),
+                                  rows_per_s=round(rows / (time.perf_counter() - started), 1))
+    return {"single": single, "batched": batched}
+
+
+def synthetic_frames(count, width=640, height=480, seed=0):
+    """Distinct JPEG frames (random shapes) so the frame-change gate never reuses a result"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        img = np.full((height, width, 3), rng.integers(0, 255, 3), dtype=np.uint8)
+        for _ in range(12):
+            color = tuple(int(c) for c in rng.integers(0, 255, 3))
+            x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+            cv2.rectangle(img, (x, y), (x + int(rng.integers(20, 200)), y + int(rng.integers(20, 200))), color, -1)
+        ok, buf = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        frames.append(buf.tobytes())
+    return frames
+
+
+def recorded_frames(directory):
+    paths = sorted(glob.glob(os.path.join(directory, '*.jpg')) + glob.glob(os.path.join(directory, '*.jpeg'))
+                   + glob.glob(os.path.join(directory, '*.png')))
+    if not paths:
+        raise SystemExit(f"no .jpg/.png frames in {directory}")
+    frames = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            frames.append(f.read())
+    return frames
+
+
+def parse_server_timing(header):
+    stages = {}
+    for part in (header or '').split(','):
+        name, _, duration = part.strip().partition(';dur=')
+        if duration:
+            stages[name] = float(duration)
+    return stages
+
+
+def _content_type(frame):
+    return 'image/png' if frame[:4] == b'\x89PNG' else 'image/jpeg'
+
+
+def bench_handler(flask_app, frames, rounds=1):
+    """Frames through /api/gesture/predict one at a time, by stage"""
+    client = flask_app.test_client()
+    stages, latencies, hands = {}, [], 0
+    for _ in range(rounds):
+        for frame in frames:
+            t0 = time.perf_counter()
+            response = client.post('/api/gesture/predict', data=frame, content_type=_content_type(frame),
+                                   headers={'X-Client-Id': 'bench-handler'})
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+            if response.status_code != 200:
+                raise RuntimeError(f"/api/gesture/predict returned {response.status_code}: {response.get_data(as_text=True)}")
+            if response.get_json().get('message') is None:
+                hands += 1
+            for name, duration in parse_server_timing(response.headers.get('Server-Timing')).items():
+                stages.setdefault(name, []).append(duration)
+    return {
+        "requests": len(latencies),
+        "frames_with_hand": hands,
+        "latency": summarize(latencies),
+        "stages": {name: summarize(values) for name, values in stages.items()},
+    }
+
+
+def _run_clients(flask_app, clients, requests_per_client, make_request):
+    """``(requests/s, latencies)`` for ``clients`` threads, each with its own test client and session"""
+    latencies = [[] for _ in range(clients)]
+    errors = []
+    barrier = threading.Barrier(clients + 1)
+
+    def run(index):
+        client = flask_app.test_client()
+        barrier.wait()
+        for n in range(requests_per_client):
+            t0 = time.perf_counter()
+            response = make_request(client, index, n)
+            latencies[index].append((time.perf_counter() - t0) * 1000.0)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise RuntimeError(f"{len(errors)} requests failed (status {errors[0]})")
+    flat = [value for per_client in latencies for value in per_client]
+    return len(flat) / elapsed, flat
+
+
+def bench_concurrency(flask_app, frames, points, levels=CONCURRENCY, requests_per_client=20):
+    """Throughput and latency at each client count, for frames and for client-side landmarks"""
+    def frame_request(client, index, n):
+        frame = frames[(index * requests_per_client + n) % len(frames)]
+        return client.post('/api/gesture/predict', data=frame, content_type=_content_type(frame),
+                           headers={'X-Client-Id': f'bench-{index}'})
+
+    def landmark_request(client, index, n):
+        row = points[(index * requests_per_client + n) % len(points)]
+        return client.post('/api/gesture/predict_landmarks', json={"landmarks": row.tolist()},
+                           headers={'X-Client-Id': f'bench-lm-{index}'})
+
+    results = {}
+    for endpoint, make_request in (("predict", frame_request), ("predict_landmarks", landmark_request)):
+        results[endpoint] = {}
+        for clients in levels:
+            rate, latencies = _run_clients(flask_app, clients, requests_per_client, make_request)
+            results[endpoint][str(clients)] = dict(summarize(latencies), requests_per_s=round(rate, 1))
+    return results
+
+
+def _flatten(node, prefix=''):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, float(node)
+
+
+def compare(results, baseline, tolerance=0.15, floor_ms=0.05):
+    """``(regressions, improvements)`` as ``[(metric, baseline, current, change)]``.
+
+    ``*_ms`` metrics are better lower, ``*_per_s`` better higher; changes
+    within ``tolerance`` (relative) or under ``floor_ms`` are noise.
+    """
+    previous = dict(_flatten(baseline.get('results', {})))
+    regressions, improvements = [], []
+    for metric, value in _flatten(results):
+        old = previous.get(metric)
+        if old is None or old <= 0:
+            continue
+        if metric.endswith('_ms'):
+            if abs(value - old) < floor_ms:
+                continue
+            change = (value - old) / old
+        elif metric.endswith('_per_s'):
+            change = (old - value) / old
+        else:
+            continue
+        entry = (metric, old, value, change)
+        if change > tolerance:
+            regressions.append(entry)
+        elif change < -tolerance:
+            improvements.append(entry)
+    return regressions, improvements
+
+
+def environment(models):
+    import sklearn
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "model": models.info(),
+        "settings": {name: os.environ[name] for name in sorted(os.environ) if name.startswith('GESTURE_')},
+    }
+
+
+def _print_stages(title, stages):
+    print(f"\n{title}")
+    for name, stats in stages.items():
+        if stats.get("count"):
+            print(f"  {name:<12} p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  "
+                  f"p99 {stats['p99_ms']:8.3f} ms  (n={stats['count']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the gesture inference path")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET, help=".gds dataset (or collector JSON) to replay")
+    parser.add_argument('--limit', type=int, default=None, help="replay only the first N samples")
+    parser.add_argument('--frames', default=None, help="directory of recorded .jpg/.png frames")
+    parser.add_argument('--synthetic-frames', type=int, default=40, help="synthetic frames when --frames is not given")
+    parser.add_argument('--concurrency', default=','.join(map(str, CONCURRENCY)), help="client counts, e.g. 1,2,4,8")
+    parser.add_argument('--requests', type=int, default=20, help="requests per client at each concurrency level")
+    parser.add_argument('--skip-http', action='store_true', help="only run the dataset replay")
+    parser.add_argument('--out', default=None, help="write this run's results to a JSON file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="relative change treated as noise")
+    parser.add_argument('--check', action='store_true', help="exit 1 when a metric regressed")
+    args = parser.parse_args(argv)
+
+    # Measure the pipeline itself: no reused predictions, no sampled debug dumps
+    os.environ.setdefault('GESTURE_FRAME_DIFF_THRESHOLD', '0')
+    os.environ.setdefault('GESTURE_DEBUG_SAMPLE_RATE', '0')
+    os.environ.setdefault('BACKEND_ROLE', 'gesture-only')
+    os.environ.setdefault('GESTURE_MODEL_RELOAD', '0')
+    os.chdir(HERE)
+    sys.path.insert(0, HERE)
+    sys.path.append(GESTURE_DIR)
+
+    points, _labels, sides = load_dataset(args.dataset, args.limit)
+    results = {}
+    if args.skip_http:
+        from config import Config
+        from model_store import load_models
+        models = load_models(Config.GESTURE_MODEL_PATH, Config.GESTURE_SCALER_PATH,
+                             getattr(Config, 'GESTURE_FAST_PATH', True), getattr(Config, 'GESTURE_CASCADE', True))
+    else:
+        import app as backend_app
+        ready = False
+        for _ in range(1200):
+            ready = backend_app.app.test_client().get('/api/ready').status_code == 200
+            if ready:
+                break
+            time.sleep(0.1)
+        models = backend_app.gesture_api.model_store.current
+        if not ready or models is None:
+            raise SystemExit("gesture backend did not become ready (are the model files in place?)")
+
+    print(f"📊 Dataset replay: {len(points)} samples, features v{models.feature_version}")
+    results["dataset"] = bench_dataset(models, points, sides)
+    single = results["dataset"]["single"]
+    _print_stages(f"Single row ({single['rows_per_s']:.0f} rows/s)", single["stages"])
+    print("\nBatched")
+    for size, stats in results["dataset"]["batched"].items():
+        print(f"  batch {size:>4}  p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms  "
+              f"{stats['rows_per_s']:10.0f} rows/s")
+
+    if not args.skip_http:
+        frames = recorded_frames(args.frames) if args.frames else synthetic_frames(args.synthetic_frames)
+        results["handler"] = bench_handler(backend_app.app, frames)
+        handler = results["handler"]
+        _print_stages(f"/api/gesture/predict ({handler['requests']} frames, {handler['frames_with_hand']} with a hand)",
+                      dict(handler["stages"], request=handler["latency"]))
+        levels = [int(level) for level in args.concurrency.split(',') if level.strip()]
+        results["concurrency"] = bench_concurrency(backend_app.app, frames, points, levels, args.requests)
+        for endpoint, per_level in results["concurrency"].items():
+            print(f"\n{endpoint} under load")
+            for clients, stats in per_level.items():
+                print(f"  {clients:>2} clients  {stats['requests_per_s']:8.1f} req/s  p50 {stats['p50_ms']:8.2f} ms  "
+                      f"p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms")
+
+    report = {"environment": environment(models), "results": results}
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {args.out}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions, improvements = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with baseline from {baseline.get('environment', {}).get('timestamp', '?')}:")
+        previous_env = baseline.get('environment', {})
+        for key in ('cpus', 'settings'):
+            if previous_env.get(key) != report['environment'][key]:
+                print(f"  ⚠️ {key} differ from the baseline run: {previous_env.get(key)} vs {report['environment'][key]}")
+        for label, entries in (("❌ Regressed", regressions), ("✅ Improved", improvements)):
+            for metric, old, new, change in entries:
+                print(f"  {label}: {metric} {old:.3f} -> {new:.3f} ({abs(change):.0%})")
+        if not regressions and not improvements:
+            print(f"  no change beyond {args.tolerance:.0%}")
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Baseline saved to {args.baseline}")
+    return 1 if args.check and regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,11 +28,47 @@ class Config:
     SPOTIPY_CLIENT_ID = _cid
     SPOTIPY_CLIENT_SECRET = os.environ.get('SPOTIPY_CLIENT_SECRET')
     SPOTIPY_REDIRECT_URI = os.environ.get('SPOTIPY_REDIRECT_URI', 'http://127.0.0.1:5500/frontend/profile.html')
+    # Seconds a resolved playback device is reused by control actions before sp.devices() is called again
+    SPOTIFY_DEVICE_CACHE_TTL = float(os.environ.get('SPOTIFY_DEVICE_CACHE_TTL', '10'))
+    
+    # Subsystems served by this process: all | gesture-only | control-only
+    BACKEND_ROLE = os.environ.get('BACKEND_ROLE', 'all')
     
     # Gesture recognition settings
     GESTURE_CONFIDENCE_THRESHOLD = float(os.environ.get('GESTURE_CONFIDENCE_THRESHOLD', 0.3))  # Lowered from 0.8 to 0.3
     GESTURE_STABLE_FRAMES = int(os.environ.get('GESTURE_STABLE_FRAMES', '5'))
     GESTURE_ACTION_COOLDOWN = float(os.environ.get('GESTURE_ACTION_COOLDOWN', '1.0'))
+    # next_frame_in_ms hints: hand gesturing / hand in view (or just left) / no hand for a while
+    GESTURE_FRAME_HINT_ACTIVE_MS = int(os.environ.get('GESTURE_FRAME_HINT_ACTIVE_MS', '150'))
+    GESTURE_FRAME_HINT_BASE_MS = int(os.environ.get('GESTURE_FRAME_HINT_BASE_MS', '400'))
+    GESTURE_FRAME_HINT_IDLE_MS = int(os.environ.get('GESTURE_FRAME_HINT_IDLE_MS', '2000'))
+    GESTURE_FRAME_HINT_IDLE_AFTER = float(os.environ.get('GESTURE_FRAME_HINT_IDLE_AFTER', '2.0'))
+    GESTURE_BATCH_MAX_ITEMS = int(os.environ.get('GESTURE_BATCH_MAX_ITEMS', '64'))
+    GESTURE_HANDS_POOL_SIZE = int(os.environ.get('GESTURE_HANDS_POOL_SIZE', '8'))
+    GESTURE_HANDS_IDLE_TTL = float(os.environ.get('GESTURE_HANDS_IDLE_TTL', '60'))
+    # Frame pre-processing before MediaPipe: longest-side cap and hand ROI cropping
+    GESTURE_MAX_FRAME_SIDE = int(os.environ.get('GESTURE_MAX_FRAME_SIDE', '640'))
+    GESTURE_ROI_CROP = os.environ.get('GESTURE_ROI_CROP', '1') == '1'
+    GESTURE_ROI_MARGIN = float(os.environ.get('GESTURE_ROI_MARGIN', '0.6'))
+    # Hands tracked and classified per frame (2 = one prediction per hand, left and right)
+    GESTURE_MAX_HANDS = int(os.environ.get('GESTURE_MAX_HANDS', '1'))
+    # Frame-difference gate: reuse the previous prediction while frames stay unchanged (0 = off)
+    GESTURE_FRAME_DIFF_THRESHOLD = float(os.environ.get('GESTURE_FRAME_DIFF_THRESHOLD', '3.0'))
+    GESTURE_FRAME_CACHE_MAX_AGE = float(os.environ.get('GESTURE_FRAME_CACHE_MAX_AGE', '1.0'))
+    # Serve predictions from the compiled NumPy predictor instead of sklearn
+    GESTURE_FAST_PATH = os.environ.get('GESTURE_FAST_PATH', '1') == '1'
+    # Skip the full ensemble for frames the model's stage-1 none rejector (from .meta.json) rejects
+    GESTURE_CASCADE = os.environ.get('GESTURE_CASCADE', '1') == '1'
+    # Fraction of predictions that print a verbose landmark/feature dump
+    GESTURE_DEBUG_SAMPLE_RATE = float(os.environ.get('GESTURE_DEBUG_SAMPLE_RATE', '0.01'))
+    # Start-up warm-up gating /api/ready (synthetic frames through the whole pipeline)
+    GESTURE_WARMUP = os.environ.get('GESTURE_WARMUP', '1') == '1'
+    GESTURE_WARMUP_TRACKERS = int(os.environ.get('GESTURE_WARMUP_TRACKERS', '2'))
+    GESTURE_WARMUP_TIMEOUT = float(os.environ.get('GESTURE_WARMUP_TIMEOUT', '120'))
+    # Inference worker processes (0 = run MediaPipe/model in the request thread)
+    GESTURE_INFERENCE_WORKERS = int(os.environ.get('GESTURE_INFERENCE_WORKERS', '0'))
+    GESTURE_WORKER_MAX_FRAME_BYTES = int(os.environ.get('GESTURE_WORKER_MAX_FRAME_BYTES', str(1920 * 1080 * 3)))
+    GESTURE_WORKER_TIMEOUT = float(os.environ.get('GESTURE_WORKER_TIMEOUT', '5.0'))
     
     # DJ settings
     DJ_DEFAULT_BATCH_SIZE = int(os.environ.get('DJ_DEFAULT_BATCH_SIZE', '150'))
@@ -41,6 +77,9 @@ class Config:
     # Model paths
     GESTURE_MODEL_PATH = os.environ.get('GESTURE_MODEL_PATH', '../Gesture final/gesture_model.pkl')
     GESTURE_SCALER_PATH = os.environ.get('GESTURE_SCALER_PATH', '../Gesture final/scaler.pkl')
+    # Watch the model/scaler files and hot-swap retrained artifacts (interval in seconds)
+    GESTURE_MODEL_RELOAD = os.environ.get('GESTURE_MODEL_RELOAD', '1') == '1'
+    GESTURE_MODEL_RELOAD_INTERVAL = float(os.environ.get('GESTURE_MODEL_RELOAD_INTERVAL', '2.0'))
     
     # CORS settings
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000,http://127.0.0.1:3000,http://localhost:5000,http://127.0.0.1:5000,http://localhost:5500,http://127.0.0.1:5500,null').split(',')
@@ -93,6 +132,39 @@ GESTURE_CONFIDENCE_THRESHOLD=0.8
 GESTURE_STABLE_FRAMES=5
 GESTURE_ACTION_COOLDOWN=1.0
 
+# Subsystems served by this process: all | gesture-only | control-only
+BACKEND_ROLE=all
+
+# Seconds a resolved playback device is reused before asking Spotify again
+SPOTIFY_DEVICE_CACHE_TTL=10
+
+# Gesture Pipeline Tuning
+# next_frame_in_ms hints: hand gesturing / hand in view / no hand for IDLE_AFTER seconds
+GESTURE_FRAME_HINT_ACTIVE_MS=150
+GESTURE_FRAME_HINT_BASE_MS=400
+GESTURE_FRAME_HINT_IDLE_MS=2000
+GESTURE_FRAME_HINT_IDLE_AFTER=2.0
+GESTURE_BATCH_MAX_ITEMS=64
+GESTURE_HANDS_POOL_SIZE=8
+GESTURE_HANDS_IDLE_TTL=60
+GESTURE_MAX_FRAME_SIDE=640
+GESTURE_ROI_CROP=1
+GESTURE_ROI_MARGIN=0.6
+GESTURE_MAX_HANDS=1
+# Frame-difference gate (0 = off)
+GESTURE_FRAME_DIFF_THRESHOLD=3.0
+GESTURE_FRAME_CACHE_MAX_AGE=1.0
+GESTURE_FAST_PATH=1
+GESTURE_CASCADE=1
+GESTURE_DEBUG_SAMPLE_RATE=0.01
+GESTURE_WARMUP=1
+GESTURE_WARMUP_TRACKERS=2
+GESTURE_WARMUP_TIMEOUT=120
+# Inference worker processes (0 = in the request thread)
+GESTURE_INFERENCE_WORKERS=0
+GESTURE_WORKER_MAX_FRAME_BYTES=6220800
+GESTURE_WORKER_TIMEOUT=5.0
+
 # DJ Settings
 DJ_DEFAULT_BATCH_SIZE=150
 DJ_STRICT_PRIMARY=1
@@ -100,6 +172,9 @@ DJ_STRICT_PRIMARY=1
 # Model Paths (relative to backend directory)
 GESTURE_MODEL_PATH=../Gesture final/gesture_model.pkl
 GESTURE_SCALER_PATH=../Gesture final/scaler.pkl
+# Watch the model files and hot-swap retrained artifacts
+GESTURE_MODEL_RELOAD=1
+GESTURE_MODEL_RELOAD_INTERVAL=2.0
 
 # CORS Settings
 CORS_ORIGINS=http://localhost:3000,http://127.0.0.1:3000,http://localhost:5000
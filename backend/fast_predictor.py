@@ -0,0 +1,295 @@
+"""NumPy fast path for the gesture scaler + classifier.
+
+sklearn spends far more time validating and dispatching a single 42-float
+row than doing arithmetic. ``compile_predictor`` turns the loaded
+``scaler.pkl`` + ``gesture_model.pkl`` pair into a ``FastGesturePredictor``
+whose parameters are plain NumPy arrays:
+
+- StandardScaler: mean/scale vectors
+- Decision trees / random forests / extra trees: all trees packed into flat
+  node arrays and walked for every tree at once
+- SVC (probability=True): support vectors, dual coefficients and Platt
+  parameters, with libsvm's pairwise coupling reimplemented
+- KNeighborsClassifier: training matrix with precomputed squared norms
+- LogisticRegression, and soft-voting VotingClassifier over any of the above
+- Handedness-routed models (``gesture_routing``): each side model compiled
+
+It exposes the same ``transform`` / ``predict_proba`` / ``classes_`` surface
+as the sklearn objects, so it drops into the serving path unchanged. Models
+it does not understand raise ValueError and the caller keeps using sklearn.
+"""
+
+import numpy as np
+
+
+class _ScalerParams:
+    def __init__(self, scaler):
+        if type(scaler).__name__ != 'StandardScaler':
+            raise ValueError(f"unsupported scaler: {type(scaler).__name__}")
+        self.mean = None if scaler.mean_ is None or not scaler.with_mean else np.asarray(scaler.mean_)
+        self.scale = None if scaler.scale_ is None or not scaler.with_std else np.asarray(scaler.scale_)
+
+    def transform(self, X):
+        # Same in-place dtype semantics as StandardScaler (float32 in, float32 out)
+        X = np.array(X, dtype=np.float32 if np.asarray(X).dtype == np.float32 else np.float64, copy=True)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self.mean is not None:
+            X -= self.mean.astype(X.dtype)
+        if self.scale is not None:
+            X /= self.scale.astype(X.dtype)
+        return X
+
+
+class _ForestParams:
+    """All trees of a forest (or a single tree) packed into flat node arrays"""
+
+    def __init__(self, estimator, n_classes):
+        trees = getattr(estimator, 'estimators_', None)
+        if trees is None:
+            trees = [estimator]
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for tree in trees:
+            t = tree.tree_
+            if t.n_outputs != 1:
+                raise ValueError("multi-output trees are not supported")
+            n = t.node_count
+            left = t.children_left.astype(np.int64)
+            right = t.children_right.astype(np.int64)
+            leaf = left == -1
+            node_ids = np.arange(n)
+            # Leaves point to themselves so a fixed number of steps always lands on a leaf
+            left = np.where(leaf, node_ids, left) + offset
+            right = np.where(leaf, node_ids, right) + offset
+            value = t.value[:, 0, :n_classes].astype(np.float64)
+            norm = value.sum(axis=1, keepdims=True)
+            norm[norm == 0] = 1.0
+            features.append(np.where(leaf, 0, t.feature))
+            thresholds.append(np.where(leaf, np.inf, t.threshold))
+            lefts.append(left)
+            rights.append(right)
+            values.append(value / norm)
+            roots.append(offset)
+            offset += n
+            depth = max(depth, t.max_depth)
+        self.feature = np.concatenate(features).astype(np.intp)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.depth = depth
+
+    def predict_proba(self, X):
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.roots.size)).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].mean(axis=1)
+
+
+class _SVCParams:
+    """libsvm one-vs-one SVC with Platt-scaled pairwise coupling"""
+
+    def __init__(self, svc):
+        if not hasattr(svc, 'probA_') or len(getattr(svc, 'probA_', [])) == 0:
+            raise ValueError("SVC was trained without probability=True")
+        if svc.kernel not in ('rbf', 'linear', 'poly', 'sigmoid'):
+            raise ValueError(f"unsupported SVC kernel: {svc.kernel}")
+        self.kernel = svc.kernel
+        self.gamma = float(svc._gamma)
+        self.coef0 = float(svc.coef0)
+        self.degree = int(svc.degree)
+        self.sv = np.asarray(svc.support_vectors_, dtype=np.float64)
+        self.sv_sq = np.einsum('ij,ij->i', self.sv, self.sv)
+        self.dual_coef = np.asarray(svc._dual_coef_, dtype=np.float64)
+        self.intercept = np.asarray(svc._intercept_, dtype=np.float64)
+        self.prob_a = np.asarray(svc.probA_, dtype=np.float64)
+        self.prob_b = np.asarray(svc.probB_, dtype=np.float64)
+        n_support = np.asarray(svc.n_support_, dtype=np.intp)
+        self.n_classes = n_support.size
+        starts = np.concatenate([[0], np.cumsum(n_support)[:-1]])
+        # Fold each pair's two coefficient blocks into one (n_pairs, n_SV) matrix
+        pairs = []
+        coef = np.zeros((self.n_classes * (self.n_classes - 1) // 2, self.sv.shape[0]))
+        p = 0
+        for i in range(self.n_classes):
+            for j in range(i + 1, self.n_classes):
+                si, sj = starts[i], starts[j]
+                ci, cj = n_support[i], n_support[j]
+                coef[p, si:si + ci] = self.dual_coef[j - 1, si:si + ci]
+                coef[p, sj:sj + cj] = self.dual_coef[i, sj:sj + cj]
+                pairs.append((i, j))
+                p += 1
+        self.pair_coef = coef
+        self.pairs = np.asarray(pairs, dtype=np.intp)
+
+    def _kernel(self, X):
+        dot = X @ self.sv.T
+        if self.kernel == 'linear':
+            return dot
+        if self.kernel == 'rbf':
+            sq = np.einsum('ij,ij->i', X, X)[:, None] + self.sv_sq[None, :] - 2.0 * dot
+            return np.exp(-self.gamma * np.maximum(sq, 0.0))
+        if self.kernel == 'poly':
+            return (self.gamma * dot + self.coef0) ** self.degree
+        return np.tanh(self.gamma * dot + self.coef0)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        dec = self._kernel(X) @ self.pair_coef.T + self.intercept
+        f = dec * self.prob_a + self.prob_b
+        # libsvm's numerically stable sigmoid
+        pos = f >= 0
+        r = np.empty_like(f)
+        r[pos] = np.exp(-f[pos]) / (1.0 + np.exp(-f[pos]))
+        r[~pos] = 1.0 / (1.0 + np.exp(f[~pos]))
+        r = np.clip(r, 1e-7, 1 - 1e-7)
+        k = self.n_classes
+        pairwise = np.zeros((X.shape[0], k, k))
+        i, j = self.pairs[:, 0], self.pairs[:, 1]
+        pairwise[:, i, j] = r
+        pairwise[:, j, i] = 1.0 - r
+        if k == 2:
+            return np.stack([pairwise[:, 0, 1], pairwise[:, 1, 0]], axis=1)
+        return np.stack([_multiclass_probability(row) for row in pairwise])
+
+
+def _multiclass_probability(r):
+    """libsvm's pairwise coupling (Wu, Lin & Weng method 2) for one sample"""
+    k = r.shape[0]
+    Q = -(r.T * r)
+    np.fill_diagonal(Q, 0.0)
+    np.fill_diagonal(Q, (r * r).sum(axis=0))
+    p = np.full(k, 1.0 / k)
+    eps = 0.005 / k
+    for _ in range(max(100, k)):
+        Qp = Q @ p
+        pQp = float(p @ Qp)
+        if np.max(np.abs(Qp - pQp)) < eps:
+            break
+        for t in range(k):
+            diff = (-Qp[t] + pQp) / Q[t, t]
+            p[t] += diff
+            pQp = (pQp + diff * (diff * Q[t, t] + 2 * Qp[t])) / (1 + diff) / (1 + diff)
+            Qp = (Qp + diff * Q[t]) / (1 + diff)
+            p /= (1 + diff)
+    return p
+
+
+class _KNNParams:
+    def __init__(self, knn):
+        metric = knn.effective_metric_
+        if metric not in ('euclidean', 'minkowski') or (metric == 'minkowski' and knn.effective_metric_params_.get('p', knn.p) != 2):
+            raise ValueError(f"unsupported KNN metric: {metric}")
+        if knn.weights not in ('uniform', 'distance'):
+            raise ValueError("callable KNN weights are not supported")
+        self.fit_X = np.asarray(knn._fit_X, dtype=np.float64)
+        self.fit_sq = np.einsum('ij,ij->i', self.fit_X, self.fit_X)
+        self.y = np.asarray(knn._y, dtype=np.intp)
+        self.k = int(knn.n_neighbors)
+        self.weights = knn.weights
+        self.n_classes = len(knn.classes_)
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        sq = np.einsum('ij,ij->i', X, X)[:, None] + self.fit_sq[None, :] - 2.0 * (X @ self.fit_X.T)
+        sq = np.maximum(sq, 0.0)
+        idx = np.argpartition(sq, self.k - 1, axis=1)[:, :self.k]
+        labels = self.y[idx]
+        if self.weights == 'uniform':
+            weights = np.ones(labels.shape)
+        else:
+            dist = np.sqrt(np.take_along_axis(sq, idx, axis=1))
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / dist
+            exact = np.isinf(weights)
+            weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), weights)
+        proba = np.zeros((X.shape[0], self.n_classes))
+        np.add.at(proba, (np.arange(X.shape[0])[:, None], labels), weights)
+        norm = proba.sum(axis=1, keepdims=True)
+        norm[norm == 0] = 1.0
+        return proba / norm
+
+
+class _LogisticParams:
+    def __init__(self, lr):
+        self.coef = np.asarray(lr.coef_, dtype=np.float64)
+        self.intercept = np.asarray(lr.intercept_, dtype=np.float64)
+        self.multinomial = self.coef.shape[0] > 1 and getattr(lr, 'multi_class', 'auto') != 'ovr'
+
+    def predict_proba(self, X):
+        z = np.asarray(X, dtype=np.float64) @ self.coef.T + self.intercept
+        if self.coef.shape[0] == 1:
+            p = 1.0 / (1.0 + np.exp(-z[:, 0]))
+            return np.stack([1.0 - p, p], axis=1)
+        if self.multinomial:
+            z = z - z.max(axis=1, keepdims=True)
+            e = np.exp(z)
+            return e / e.sum(axis=1, keepdims=True)
+        p = 1.0 / (1.0 + np.exp(-z))
+        return p / p.sum(axis=1, keepdims=True)
+
+
+class _VotingParams:
+    def __init__(self, voting):
+        if voting.voting != 'soft':
+            raise ValueError("only soft-voting ensembles have predict_proba")
+        self.members = [_compile_estimator(est, len(voting.classes_)) for est in voting.estimators_]
+        weights = voting._weights_not_none
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+
+    def predict_proba(self, X):
+        probas = np.stack([member.predict_proba(X) for member in self.members])
+        return np.average(probas, axis=0, weights=self.weights)
+
+
+def _compile_estimator(estimator, n_classes):
+    name = type(estimator).__name__
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier',
+                'DecisionTreeClassifier', 'ExtraTreeClassifier'):
+        return _ForestParams(estimator, n_classes)
+    if name == 'SVC':
+        return _SVCParams(estimator)
+    if name == 'KNeighborsClassifier':
+        return _KNNParams(estimator)
+    if name == 'LogisticRegression':
+        return _LogisticParams(estimator)
+    if name == 'VotingClassifier':
+        return _VotingParams(estimator)
+    if name == 'HandRoutedModel':
+        return estimator.with_models([_compile_estimator(m, len(m.classes_)) for m in estimator.models])
+    raise ValueError(f"unsupported estimator: {name}")
+
+
+class FastGesturePredictor:
+    """Drop-in replacement for the (scaler, model) pair on the serving path"""
+
+    def __init__(self, model, scaler):
+        self.classes_ = np.asarray(model.classes_)
+        self._scaler = _ScalerParams(scaler)
+        self._model = _compile_estimator(model, len(self.classes_))
+        self.routed_sides = getattr(self._model, 'routed_sides', None)
+
+    def transform(self, X):
+        return self._scaler.transform(X)
+
+    def predict_proba(self, X_scaled, sides=None):
+        if self.routed_sides:
+            return self._model.predict_proba(X_scaled, sides)
+        return self._model.predict_proba(X_scaled)
+
+    def predict(self, X_scaled, sides=None):
+        return self.classes_[np.argmax(self.predict_proba(X_scaled, sides), axis=1)]
+
+
+def compile_predictor(model, scaler):
+    """Compile a fitted (model, scaler) pair; raises ValueError if unsupported"""
+    if not hasattr(model, 'predict_proba') or not hasattr(model, 'classes_'):
+        raise ValueError("model has no predict_proba")
+    return FastGesturePredictor(model, scaler)
@@ -0,0 +1,82 @@
+"""Per-client frame-difference gate in front of the gesture predict path.
+
+Most frames a client sends are near-identical (a still hand, or nobody in
+front of the camera). Each frame is reduced to a tiny grayscale thumbnail
+and compared with the thumbnail of the frame that produced the client's last
+prediction. The thumbnail is split into a ``grid`` of blocks; when no block's
+mean absolute difference (0-255 scale) reaches ``threshold``, that prediction
+is reused instead of running MediaPipe and the classifier again. Judging the
+most-changed block rather than the whole-frame mean keeps a finger moving on
+a hand that fills a small part of the frame from going unnoticed. A cached
+result is never reused for longer than ``max_age`` seconds, so slow drift is
+still picked up.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+class FrameChangeGate:
+    def __init__(self, threshold=3.0, size=(32, 18), grid=(8, 6), max_age=1.0, max_clients=256):
+        self.threshold = float(threshold)
+        self.size = tuple(size)
+        self.grid = tuple(grid)
+        self.max_age = float(max_age)
+        self.max_clients = max(1, int(max_clients))
+        self._entries = OrderedDict()  # key -> (signature, result, stored_at)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def signature(self, rgb_image):
+        """Downsampled grayscale thumbnail used for change detection"""
+        gray = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def change(self, signature, previous):
+        """Largest per-block mean absolute difference between two signatures"""
+        diff = np.abs(signature - previous).astype(np.float32)
+        return float(cv2.resize(diff, self.grid, interpolation=cv2.INTER_AREA).max())
+
+    def lookup(self, key, signature):
+        """Cached result for ``key`` if the frame has not materially changed, else None"""
+        if self.threshold <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                previous, result, stored_at = entry
+                if (previous.shape == signature.shape
+                        and time.monotonic() - stored_at <= self.max_age
+                        and self.change(signature, previous) < self.threshold):
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return result
+            self._misses += 1
+            return None
+
+    def store(self, key, signature, result):
+        with self._lock:
+            self._entries[key] = (signature, result, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_clients:
+                self._entries.popitem(last=False)
+
+    def forget(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "clients": len(self._entries),
+                "threshold": self.threshold,
+            }
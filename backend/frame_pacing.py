@@ -0,0 +1,105 @@
+"""Server-computed frame-rate hints for gesture clients.
+
+Clients used to post frames on a fixed timer whether or not a hand was in
+view and however busy the server was. Every smoothed gesture response now
+carries ``next_frame_in_ms``, the delay before the client's next frame:
+
+- a hand showing a gesture (it may be about to commit): ``active_ms``
+- a hand in view with no gesture, or no hand for under ``idle_after``
+  seconds: ``base_ms``
+- no hand for longer: doubles with every empty frame, up to ``idle_ms``
+
+The hint is then stretched by the inference load (frames queued or in
+flight per inference slot) once that exceeds one, up to ``max_load_factor``
+times, so idle clients stop competing with active ones for capacity.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _Pace:
+    __slots__ = ('last_hand_at', 'empty_frames')
+
+    def __init__(self, now):
+        self.last_hand_at = now
+        self.empty_frames = 0
+
+
+class FramePacer:
+    def __init__(self, active_ms=150, base_ms=400, idle_ms=2000, idle_after=2.0,
+                 max_load_factor=4.0, max_clients=256):
+        self.active_ms = int(active_ms)
+        self.base_ms = int(base_ms)
+        self.idle_ms = max(self.base_ms, int(idle_ms))
+        self.idle_after = float(idle_after)
+        self.max_load_factor = max(1.0, float(max_load_factor))
+        self.max_clients = max(1, int(max_clients))
+        self._clients = OrderedDict()  # key -> _Pace
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._hints = {"active": 0, "base": 0, "idle": 0}
+
+    @contextmanager
+    def tracking(self):
+        """Count an in-process inference for ``in_flight``"""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    def hint(self, key, hand_seen, gesturing, load=0.0, now=None):
+        """Milliseconds the client behind ``key`` should wait before its next frame"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            pace = self._clients.get(key)
+            if pace is None:
+                pace = self._clients[key] = _Pace(now)
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+            else:
+                self._clients.move_to_end(key)
+            if hand_seen:
+                pace.last_hand_at = now
+                pace.empty_frames = 0
+                state = "active" if gesturing else "base"
+                delay = self.active_ms if gesturing else self.base_ms
+            elif now - pace.last_hand_at < self.idle_after:
+                state, delay = "base", self.base_ms
+            else:
+                pace.empty_frames += 1
+                state = "idle"
+                delay = min(self.idle_ms, self.base_ms << min(pace.empty_frames, 16))
+            self._hints[state] += 1
+        return int(delay * min(self.max_load_factor, max(1.0, float(load))))
+
+    def apply(self, key, payload, hand_seen, load=0.0):
+        """Copy of a prediction payload with ``next_frame_in_ms`` added"""
+        hands = payload.get("hands")
+        gestures = [h.get("gesture") for h in hands] if hands else [payload.get("gesture")]
+        gesturing = hand_seen and any(g not in (None, "none") for g in gestures)
+        return dict(payload, next_frame_in_ms=self.hint(key, hand_seen, gesturing, load))
+
+    def forget(self, key):
+        with self._lock:
+            self._clients.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": len(self._clients),
+                "in_flight": self._in_flight,
+                "hints": dict(self._hints),
+                "active_ms": self.active_ms,
+                "base_ms": self.base_ms,
+                "idle_ms": self.idle_ms,
+            }
@@ -0,0 +1,159 @@
+"""Frame pre-processing in front of MediaPipe Hands.
+
+Two stages cut the pixels MediaPipe has to look at:
+
+1. Resolution cap: frames whose longest side exceeds ``max_side`` are
+   downscaled (aspect ratio kept, so normalised landmarks are unchanged).
+2. Hand ROI crop: once a hand has been found, the next frame is cropped to an
+   expanded box around the previous landmarks (all tracked hands). Landmarks
+   found in the crop are mapped back to full-frame normalised coordinates, so
+   the features the model expects are the same as without cropping. While
+   fewer than ``max_hands`` hands are tracked, every ``rescan_interval``-th
+   frame is processed whole so a hand entering elsewhere is still found.
+
+Crops go to their own ``crop_hands`` instance, so MediaPipe's frame-to-frame
+tracking never mixes crop and full-frame coordinates. The crop window stays
+put while the hands remain well inside it; when it has to move, the crop
+instance is reset. A hand lost inside the crop is reported as no hand for
+that frame and searched for on the whole next frame, so a miss never costs
+two passes in one frame.
+"""
+
+import cv2
+
+
+def cap_frame_size(rgb_image, max_side):
+    """Downscale ``rgb_image`` so its longest side is at most ``max_side``"""
+    if not max_side:
+        return rgb_image
+    height, width = rgb_image.shape[:2]
+    longest = max(height, width)
+    if longest <= max_side:
+        return rgb_image
+    scale = max_side / float(longest)
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(rgb_image, size, interpolation=cv2.INTER_AREA)
+
+
+class RoiHandTracker:
+    """Wraps a MediaPipe ``Hands`` instance with resolution capping and ROI cropping.
+
+    ``process`` has the same contract as ``Hands.process``; landmark
+    coordinates in the returned results always refer to the full frame.
+    ROI cropping needs a second ``crop_hands`` instance and is off without one.
+    """
+
+    def __init__(self, hands, crop_hands=None, max_side=640, roi_crop=True, roi_margin=0.6,
+                 min_roi_side=128, max_hands=1, rescan_interval=10, edge_fraction=0.1):
+        self.hands = hands
+        self.crop_hands = crop_hands
+        self.max_side = max_side
+        self.roi_crop = roi_crop and crop_hands is not None
+        self.roi_margin = roi_margin
+        self.min_roi_side = min_roi_side
+        self.max_hands = max_hands
+        self.rescan_interval = rescan_interval
+        self.edge_fraction = edge_fraction
+        self._last_box = None  # (x_min, y_min, x_max, y_max), normalised full-frame coords
+        self._last_count = 0
+        self._cropped_frames = 0
+        self._crop = None  # current crop window (x0, y0, x1, y1) in capped-frame pixels
+        self._crop_frame_size = None
+
+    def process(self, rgb_image):
+        frame = cap_frame_size(rgb_image, self.max_side)
+        height, width = frame.shape[:2]
+        if self.roi_crop and self._last_box is not None and not self._rescan_due():
+            crop = self._stable_crop(width, height)
+            if crop is not None:
+                x0, y0, x1, y1 = crop
+                results = self.crop_hands.process(frame[y0:y1, x0:x1])
+                if results.multi_hand_landmarks:
+                    self._to_full_frame(results, crop, width, height)
+                    self._remember(results)
+                    self._cropped_frames += 1
+                    return results
+                # Lost inside the crop: no hand this frame, the next one is searched whole
+                self._remember(results)
+                return results
+        # No previous hand, the hand left the ROI, or a periodic look for more hands.
+        # After cropped frames the full-frame instance's tracking state is stale.
+        if self._cropped_frames:
+            self._reset(self.hands)
+        results = self.hands.process(frame)
+        self._remember(results)
+        self._cropped_frames = 0
+        return results
+
+    def close(self):
+        self.hands.close()
+        if self.crop_hands is not None:
+            self.crop_hands.close()
+
+    @staticmethod
+    def _reset(hands):
+        reset = getattr(hands, 'reset', None)
+        if reset is not None:
+            reset()
+
+    def _stable_crop(self, width, height):
+        """The current crop window while the hands stay clear of its edges, else a new one"""
+        if self._crop is not None and self._crop_frame_size == (width, height) \
+                and self._inside_crop(width, height):
+            return self._crop
+        crop = self._crop_rect(width, height)
+        if crop != self._crop:
+            # New coordinate system for the crop instance: drop its tracking state
+            self._reset(self.crop_hands)
+            self._crop, self._crop_frame_size = crop, (width, height)
+        return crop
+
+    def _inside_crop(self, width, height):
+        x0, y0, x1, y1 = self._crop
+        x_min, y_min, x_max, y_max = self._last_box
+        edge = self.edge_fraction * max(x1 - x0, y1 - y0)
+        # Crop edges on the frame border can't move further, so they don't count
+        return ((x0 == 0 or x_min * width - x0 >= edge)
+                and (y0 == 0 or y_min * height - y0 >= edge)
+                and (x1 == width or x1 - x_max * width >= edge)
+                and (y1 == height or y1 - y_max * height >= edge))
+
+    def _rescan_due(self):
+        return (self._last_count < self.max_hands and self.rescan_interval > 0
+                and self._cropped_frames >= self.rescan_interval)
+
+    def _crop_rect(self, width, height):
+        x_min, y_min, x_max, y_max = self._last_box
+        cx = (x_min + x_max) / 2.0 * width
+        cy = (y_min + y_max) / 2.0 * height
+        side = max((x_max - x_min) * width, (y_max - y_min) * height)
+        side = max(side * (1.0 + 2.0 * self.roi_margin), self.min_roi_side)
+        x0 = int(max(0, cx - side / 2.0))
+        y0 = int(max(0, cy - side / 2.0))
+        x1 = int(min(width, cx + side / 2.0))
+        y1 = int(min(height, cy + side / 2.0))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        if (x1 - x0) * (y1 - y0) >= 0.8 * width * height:
+            return None  # cropping would barely save anything
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _to_full_frame(results, crop, width, height):
+        x0, y0, x1, y1 = crop
+        crop_w, crop_h = float(x1 - x0), float(y1 - y0)
+        for hand_landmarks in results.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = (lm.x * crop_w + x0) / width
+                lm.y = (lm.y * crop_h + y0) / height
+                lm.z = lm.z * crop_w / width
+
+    def _remember(self, results):
+        if not results.multi_hand_landmarks:
+            self._last_box = None
+            self._last_count = 0
+            return
+        xs = [lm.x for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in results.multi_hand_landmarks for lm in hand.landmark]
+        self._last_box = (min(xs), min(ys), max(xs), max(ys))
+        self._last_count = len(results.multi_hand_landmarks)
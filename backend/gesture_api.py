@@ -0,0 +1,867 @@
+"""Gesture recognition API: model serving, MediaPipe trackers and the predict routes.
+
+Registered by ``app.py`` only when the backend role includes gestures, so
+control-plane replicas never import OpenCV, NumPy, scikit-learn or MediaPipe.
+MediaPipe itself is imported on first use, when the first tracker is built.
+"""
+
+import base64
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+from contextlib import nullcontext
+
+import cv2
+import numpy as np
+from flask import Blueprint, request, jsonify, g, has_request_context
+
+# Feature extraction is shared with the collector and controllers in "Gesture final"
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Gesture final'))
+from gesture_features import features_from_points, hand_sides, to_feature_batch, to_feature_vec
+
+from hands_pool import HandsPool
+from frame_preprocess import RoiHandTracker
+from frame_gate import FrameChangeGate
+from gesture_smoothing import GestureSmoother
+from frame_pacing import FramePacer
+from gesture_cascade import CascadeStats, cascade_proba
+from gesture_timing import StageTimer, TimingStats
+from model_store import ModelStore
+from inference_workers import InferenceWorkerPool
+
+try:
+    from config import Config
+except ImportError:
+    class Config:
+        GESTURE_CONFIDENCE_THRESHOLD = 0.3
+
+gesture_bp = Blueprint('gesture', __name__)
+
+# Per-stage pipeline timings, aggregated in-process and sent as Server-Timing
+timing_stats = TimingStats()
+
+def _stage(name):
+    """Time a pipeline stage of the current gesture request (no-op elsewhere)"""
+    timer = g.get('stage_timer') if has_request_context() else None
+    return timer.stage(name) if timer is not None else nullcontext()
+
+def _add_stage(name, duration_ms):
+    timer = g.get('stage_timer') if has_request_context() else None
+    if timer is not None:
+        timer.add(name, duration_ms)
+
+@gesture_bp.before_request
+def start_stage_timer():
+    if request.path.startswith(('/api/gesture/predict', '/api/gesture/act')):
+        g.stage_timer = StageTimer()
+
+@gesture_bp.after_request
+def add_server_timing(response):
+    timer = g.get('stage_timer')
+    if timer is not None and timer.stages:
+        response.headers['Server-Timing'] = timer.server_timing()
+        timing_stats.record(timer)
+    return response
+
+MODEL_PATH = getattr(Config, 'GESTURE_MODEL_PATH', "../Gesture final/gesture_model.pkl")
+SCALER_PATH = getattr(Config, 'GESTURE_SCALER_PATH', "../Gesture final/scaler.pkl")
+
+# Active model bundle; request paths read model_store.current once and use that
+# bundle throughout. The module-level names mirror it for scripts and health checks.
+gesture_model = gesture_scaler = gesture_predictor = None
+
+def _on_models_swapped(models, previous):
+    global gesture_model, gesture_scaler, gesture_predictor
+    gesture_model, gesture_scaler, gesture_predictor = models.model, models.scaler, models.predictor
+    if previous is not None and _inference_workers is not None:
+        _inference_workers.reload_models()
+
+def _warm_models(models):
+    """First-call warm-up of a bundle at the batch shapes the routes use"""
+    rng = np.random.default_rng(0)
+    for rows in (1, 8, getattr(Config, 'GESTURE_BATCH_MAX_ITEMS', 64)):
+        features = rng.normal(0.0, 0.1, size=(rows, models.n_features)).astype(np.float32)
+        _classify_scaled(models, models.inference_scaler.transform(features), record=False)
+
+model_store = ModelStore(
+    MODEL_PATH,
+    SCALER_PATH,
+    fast_path=getattr(Config, 'GESTURE_FAST_PATH', True),
+    poll_interval=getattr(Config, 'GESTURE_MODEL_RELOAD_INTERVAL', 2.0),
+    on_swap=_on_models_swapped,
+    warmup=_warm_models,
+    cascade=getattr(Config, 'GESTURE_CASCADE', True)
+)
+
+# Rows settled by the stage-1 none rejector vs. the full ensemble
+cascade_stats = CascadeStats()
+
+def _is_server_process():
+    """False inside spawned inference workers, which re-import the app while starting.
+
+    ``parent_process()`` is still None at that point; the process name is already set.
+    """
+    return multiprocessing.current_process().name == 'MainProcess'
+
+def load_models():
+    """Initial model load; starts the reload watcher in the server process"""
+    try:
+        model_store.load()
+        print("✅ Gesture models loaded successfully")
+        print(f"📊 Model classes: {model_store.current.classes or 'Unknown'} (version {model_store.current.version})")
+        if gesture_predictor is not None:
+            print("⚡ Gesture fast path compiled")
+    except Exception as e:
+        print(f"❌ Error loading gesture models: {e}")
+    if getattr(Config, 'GESTURE_MODEL_RELOAD', True) and _is_server_process():
+        model_store.start()
+
+# Hands classified per frame; with 2, responses carry one prediction per hand
+MAX_HANDS = max(1, getattr(Config, 'GESTURE_MAX_HANDS', 1))
+NO_HAND_MESSAGE = "No hand detected"
+
+HANDS_SETTINGS = dict(
+    static_image_mode=False,
+    max_num_hands=MAX_HANDS,
+    min_detection_confidence=0.6,
+    min_tracking_confidence=0.6
+)
+
+# Resolution cap + hand ROI cropping applied in front of every tracker
+ROI_SETTINGS = dict(
+    max_side=getattr(Config, 'GESTURE_MAX_FRAME_SIDE', 640),
+    roi_crop=getattr(Config, 'GESTURE_ROI_CROP', True),
+    roi_margin=getattr(Config, 'GESTURE_ROI_MARGIN', 0.6),
+    max_hands=MAX_HANDS
+)
+
+# Unrelated images (batch items without a client_id) must not share tracking state
+STATIC_HANDS_SETTINGS = dict(HANDS_SETTINGS, static_image_mode=True)
+STATIC_ROI_SETTINGS = dict(ROI_SETTINGS, roi_crop=False)
+
+def _new_hands_tracker():
+    """Create a MediaPipe Hands tracker with the project's standard settings"""
+    import mediapipe as mp  # deferred: the graph libraries are only needed once frames arrive
+    # ROI crops run in their own instance so its tracking state stays in crop coordinates
+    crop_hands = mp.solutions.hands.Hands(**HANDS_SETTINGS) if ROI_SETTINGS['roi_crop'] else None
+    return RoiHandTracker(mp.solutions.hands.Hands(**HANDS_SETTINGS), crop_hands, **ROI_SETTINGS)
+
+def _new_static_hands_tracker():
+    """Detection-only tracker: every image is processed on its own"""
+    import mediapipe as mp
+    return RoiHandTracker(mp.solutions.hands.Hands(**STATIC_HANDS_SETTINGS), **STATIC_ROI_SETTINGS)
+
+# One tracker per client/session so tracking state is never shared between users
+hands_pool = HandsPool(
+    _new_hands_tracker,
+    max_size=getattr(Config, 'GESTURE_HANDS_POOL_SIZE', 8),
+    idle_ttl=getattr(Config, 'GESTURE_HANDS_IDLE_TTL', 60.0)
+)
+
+# Detection-only trackers for batch images that belong to no client session
+static_hands_pool = HandsPool(
+    _new_static_hands_tracker,
+    max_size=getattr(Config, 'GESTURE_HANDS_POOL_SIZE', 8),
+    idle_ttl=getattr(Config, 'GESTURE_HANDS_IDLE_TTL', 60.0)
+)
+
+# Optional process pool running MediaPipe + model outside the request threads
+_inference_workers = None
+_inference_workers_lock = threading.Lock()
+
+def _get_inference_workers():
+    """Worker pool when GESTURE_INFERENCE_WORKERS > 0, started on first use.
+
+    Never started at import time: spawned workers re-import the main module.
+    """
+    global _inference_workers
+    num_workers = getattr(Config, 'GESTURE_INFERENCE_WORKERS', 0)
+    if num_workers <= 0 or model_store.current is None:
+        return None
+    if _inference_workers is None:
+        with _inference_workers_lock:
+            if _inference_workers is None:
+                _inference_workers = InferenceWorkerPool(
+                    num_workers,
+                    os.path.abspath(MODEL_PATH),
+                    os.path.abspath(SCALER_PATH),
+                    HANDS_SETTINGS,
+                    roi_settings=ROI_SETTINGS,
+                    max_frame_bytes=getattr(Config, 'GESTURE_WORKER_MAX_FRAME_BYTES', 1920 * 1080 * 3),
+                    pool_size=getattr(Config, 'GESTURE_HANDS_POOL_SIZE', 8),
+                    idle_ttl=getattr(Config, 'GESTURE_HANDS_IDLE_TTL', 60.0),
+                    use_fast_path=getattr(Config, 'GESTURE_FAST_PATH', True),
+                    use_cascade=getattr(Config, 'GESTURE_CASCADE', True)
+                )
+                print(f"✅ Started {num_workers} gesture inference worker(s)")
+    return _inference_workers
+
+# Reuses a client's previous prediction while its frames stay unchanged
+frame_gate = FrameChangeGate(
+    threshold=getattr(Config, 'GESTURE_FRAME_DIFF_THRESHOLD', 3.0),
+    max_age=getattr(Config, 'GESTURE_FRAME_CACHE_MAX_AGE', 1.0)
+)
+
+# Per-client stable-frame/cooldown policy; responses carry the committed ``action``
+gesture_smoother = GestureSmoother(
+    stable_frames=getattr(Config, 'GESTURE_STABLE_FRAMES', 5),
+    cooldown=getattr(Config, 'GESTURE_ACTION_COOLDOWN', 1.0)
+)
+
+# Per-client ``next_frame_in_ms`` hints: back off idle clients and under load
+frame_pacer = FramePacer(
+    active_ms=getattr(Config, 'GESTURE_FRAME_HINT_ACTIVE_MS', 150),
+    base_ms=getattr(Config, 'GESTURE_FRAME_HINT_BASE_MS', 400),
+    idle_ms=getattr(Config, 'GESTURE_FRAME_HINT_IDLE_MS', 2000),
+    idle_after=getattr(Config, 'GESTURE_FRAME_HINT_IDLE_AFTER', 2.0)
+)
+
+# Set by init_app when this backend also serves the control plane
+_control_dispatch = None
+
+def _client_id():
+    """Session key for the current request's tracker"""
+    return (request.headers.get('X-Client-Id')
+            or request.args.get('client_id')
+            or request.remote_addr
+            or 'anonymous')
+
+
+def _landmarks_to_features(landmarks, version=1):
+    """(1, dim) feature row of the given version from client-supplied landmarks.
+
+    Accepts 21 ``[x, y]`` / ``[x, y, z]`` pairs, 21 ``{"x", "y", "z"}`` objects
+    (the shape MediaPipe JS returns) or the same values flattened; v2 models
+    need z. Raises ValueError on anything else, including missing or
+    non-finite coordinates.
+    """
+    if not isinstance(landmarks, (list, tuple)):
+        raise ValueError(f"landmarks must be a list of 21 points, got {type(landmarks).__name__}")
+    if landmarks and isinstance(landmarks[0], dict):
+        landmarks = [[lm.get('x', 0.0), lm.get('y', 0.0), lm.get('z', 0.0)] for lm in landmarks]
+    points = np.asarray(landmarks, dtype=np.float64)
+    if points.ndim == 1 and points.size in (42, 63):
+        points = points.reshape(21, -1)
+    if points.ndim != 2 or points.shape[0] != 21 or points.shape[1] not in (2, 3):
+        raise ValueError(f"expected 21x2 or 21x3 landmarks, got shape {points.shape}")
+    if version == 2 and points.shape[1] != 3:
+        raise ValueError("this model uses v2 features, which need [x, y, z] landmarks")
+    features = features_from_points(points, version=version)
+    if not np.isfinite(features).all():
+        raise ValueError("landmarks must be finite numbers")
+    return features
+
+def _classify_scaled(models, features_scaled, sides=None, record=True):
+    """Run the bundle's gesture model on scaled (N, 42) rows.
+
+    Returns ``(labels, confidences, probabilities)``; ``probabilities`` is an
+    (N, n_classes) array, or None when the model has no ``predict_proba``.
+    Rows the bundle's none rejector settles never reach the full model, and
+    ``sides`` (hand side or None per row) routes rows of a handedness-routed
+    model to their side's classifier. ``record=False`` keeps synthetic
+    warm-up rows out of ``cascade_stats``.
+    """
+    model = models.inference_model
+    if hasattr(model, 'predict_proba'):
+        probabilities, passed = cascade_proba(models, features_scaled, sides)
+        top = np.argmax(probabilities, axis=1)
+        labels = [str(c) for c in model.classes_[top]]
+        if record and models.rejector is not None:
+            stage2_none = sum(1 for ok, label in zip(passed, labels) if ok and label == models.rejector.none_label)
+            cascade_stats.record(len(labels), int((~passed).sum()), stage2_none)
+        confidences = probabilities[np.arange(len(top)), top].astype(float).tolist()
+        return labels, confidences, probabilities
+    labels = [str(c) for c in model.predict(features_scaled)]
+    return labels, [1.0] * len(labels), None
+
+def _gesture_result(predicted_class, confidence, probabilities):
+    """Apply the confidence threshold and build the prediction payload"""
+    threshold = getattr(Config, 'GESTURE_CONFIDENCE_THRESHOLD', 0.3)
+    if confidence < threshold:
+        predicted_class = "none"
+        confidence = 0.0
+    return {
+        "gesture": predicted_class,
+        "confidence": confidence,
+        "probabilities": probabilities.tolist() if probabilities is not None else None,
+        "threshold": threshold
+    }
+
+# Raw frame uploads accepted by /api/gesture/predict besides the JSON data-URL
+FRAME_CONTENT_TYPES = ('image/jpeg', 'image/webp', 'image/png', 'application/octet-stream')
+
+def _decode_frame(image_bytes):
+    """Decode encoded image bytes straight into the RGB array MediaPipe expects"""
+    buf = np.frombuffer(image_bytes, dtype=np.uint8)
+    if buf.size == 0:
+        raise ValueError("empty image payload")
+    rgb_flag = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+    if rgb_flag is not None:
+        image = cv2.imdecode(buf, rgb_flag)
+    else:
+        image = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        if image is not None:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    if image is None:
+        raise ValueError("could not decode image")
+    return image
+
+def _read_request_frame():
+    """Return the RGB frame carried by the current request.
+
+    Accepts a raw image body (image/jpeg, image/webp, ...), a multipart upload
+    with an ``image`` (or ``frame``) file field, or the legacy JSON body
+    ``{"image": "data:image/jpeg;base64,..."}``. Raises ValueError when no
+    usable frame is present.
+    """
+    content_type = (request.mimetype or '').lower()
+    if content_type in FRAME_CONTENT_TYPES:
+        return _decode_frame(request.get_data(cache=False))
+    if content_type == 'multipart/form-data':
+        upload = request.files.get('image') or request.files.get('frame')
+        if upload is None:
+            raise ValueError("No image file provided")
+        return _decode_frame(upload.read())
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        raise ValueError("JSON body must be an object")
+    image_data = data.get('image')
+    if not image_data:
+        raise ValueError("No image data provided")
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    return _decode_frame(base64.b64decode(image_data))
+
+def _dump_prediction(models, rgb_image, hand_landmarks, features, features_scaled, payload):
+    """Verbose landmark/feature dump, printed for a sampled fraction of frames"""
+    print(f"🔍 Frame {rgb_image.shape} -> {payload['gesture']} ({payload['confidence']:.3f}, threshold {payload['threshold']})")
+    for i, landmark in enumerate(hand_landmarks.landmark[:5]):
+        print(f"   Landmark {i}: x={landmark.x:.3f}, y={landmark.y:.3f}, z={landmark.z:.3f}")
+    print(f"   Features first/last 5: {features[0][:5]} / {features[0][-5:]}")
+    print(f"   Scaled first 5: {features_scaled[0][:5]}")
+    if payload.get('probabilities') is not None:
+        probs = ", ".join(f"{cls}={prob:.3f}" for cls, prob in zip(models.classes, payload['probabilities']))
+        print(f"   Probabilities: {probs}")
+
+def _no_hand_payload():
+    payload = {"gesture": "none", "confidence": 0.0, "message": NO_HAND_MESSAGE}
+    if MAX_HANDS > 1:
+        payload["hands"] = []
+    return payload
+
+def _hands_payload(hand_results):
+    """Multi-hand payload: one entry per hand, the most confident gesture on top.
+
+    ``hand_results`` is ``[(side, side_score, result), ...]`` with ``result``
+    shaped like ``_gesture_result``.
+    """
+    hands = [dict(result, hand=side, hand_score=score) for side, score, result in hand_results]
+    primary = max(hands, key=lambda h: (h["gesture"] != "none", h["confidence"]))
+    return dict(primary, hands=hands)
+
+def _predict_frame(models, rgb_image, session_key):
+    """Full frame -> prediction payload using the session's tracker"""
+    workers = _get_inference_workers()
+    if workers is not None and workers.fits(rgb_image):
+        with _stage('worker'):
+            outcome = workers.predict(rgb_image, session_key,
+                                      timeout=getattr(Config, 'GESTURE_WORKER_TIMEOUT', 5.0))
+        if outcome is None:
+            return _no_hand_payload()
+        for name, duration in (outcome.get('timings') or {}).items():
+            _add_stage(name, duration)
+        hand_results = []
+        for hand in outcome['hands']:
+            if hand.get('stage1_rejected') is not None:
+                cascade_stats.record(1, hand['stage1_rejected'],
+                                     not hand['stage1_rejected'] and hand['gesture'] == 'none')
+            probabilities = hand['probabilities']
+            hand_results.append((hand['hand'], hand['hand_score'], _gesture_result(
+                hand['gesture'], hand['confidence'],
+                np.asarray(probabilities) if probabilities is not None else None)))
+        if MAX_HANDS == 1:
+            return hand_results[0][2]
+        return _hands_payload(hand_results)
+    
+    with _stage('hands'):
+        with hands_pool.session(session_key) as tracker:
+            results = tracker.process(rgb_image)
+    if not results.multi_hand_landmarks:
+        return _no_hand_payload()
+    
+    # Every detected hand goes through the scaler and model in one batched call
+    hands = results.multi_hand_landmarks[:MAX_HANDS]
+    sides = hand_sides(results)[:len(hands)]
+    with _stage('features'):
+        features = to_feature_batch(hands, version=models.feature_version)
+    with _stage('scale'):
+        features_scaled = models.inference_scaler.transform(features)
+    with _stage('predict'):
+        labels, confidences, probabilities = _classify_scaled(models, features_scaled,
+                                                              [side for side, _ in sides])
+    
+    hand_results = [
+        (side, score, _gesture_result(labels[i], confidences[i],
+                                      probabilities[i] if probabilities is not None else None))
+        for i, (side, score) in enumerate(sides)
+    ]
+    payload = hand_results[0][2] if MAX_HANDS == 1 else _hands_payload(hand_results)
+    if random.random() < getattr(Config, 'GESTURE_DEBUG_SAMPLE_RATE', 0.01):
+        _dump_prediction(models, rgb_image, hands[0], features[:1], features_scaled[:1], hand_results[0][2])
+    return payload
+
+def _inference_load():
+    """Frames queued or in flight per inference slot (worker process, else CPU core)"""
+    if _inference_workers is not None:
+        return _inference_workers.queue_depth() / _inference_workers.num_workers
+    return frame_pacer.in_flight / (os.cpu_count() or 1)
+
+def _hand_in_view(payload):
+    if payload.get('hands') is not None:
+        return bool(payload['hands'])
+    return payload.get('message') != NO_HAND_MESSAGE
+
+def _paced(session_key, payload):
+    """Add the session's ``next_frame_in_ms`` hint to a smoothed payload"""
+    return frame_pacer.apply(session_key, payload, _hand_in_view(payload), _inference_load())
+
+def _smoothed_frame_prediction(models, rgb_image, session_key):
+    """Gate, predict, smooth and pace one frame for a session"""
+    with _stage('gate'):
+        signature = frame_gate.signature(rgb_image)
+        cached = frame_gate.lookup(session_key, signature)
+    if cached is not None:
+        return _paced(session_key, gesture_smoother.apply(session_key, dict(cached, cached=True)))
+    with frame_pacer.tracking():
+        payload = _predict_frame(models, rgb_image, session_key)
+    frame_gate.store(session_key, signature, payload)
+    return _paced(session_key, gesture_smoother.apply(session_key, dict(payload, cached=False)))
+
+def _body_landmark_features(models, data):
+    """``(features, sides)`` from a landmark body, or None when it carries no landmarks.
+
+    ``{"landmarks": [...]}`` is one hand (``sides`` is None);
+    ``{"hands": [{"landmarks": [...], "hand": "left"}, ...]}`` is one row per
+    hand. Raises ValueError/TypeError/KeyError on malformed landmarks.
+    """
+    if data.get('landmarks'):
+        return _landmarks_to_features(data['landmarks'], models.feature_version), None
+    hands = data.get('hands')
+    if not hands or not isinstance(hands, list):
+        return None
+    hands = hands[:MAX_HANDS]
+    features = np.vstack([_landmarks_to_features(h.get('landmarks'), models.feature_version) for h in hands])
+    sides = [(str(h['hand']).lower() if h.get('hand') else None, float(h.get('hand_score', 1.0))) for h in hands]
+    return features, sides
+
+def _smoothed_landmark_prediction(models, features, session_key, sides=None):
+    """Classify and smooth client-supplied feature rows (one per hand) for a session"""
+    with _stage('scale'):
+        features_scaled = models.inference_scaler.transform(features)
+    with _stage('predict'):
+        labels, confidences, probabilities = _classify_scaled(
+            models, features_scaled, None if sides is None else [side for side, _ in sides])
+    results = [_gesture_result(labels[i], confidences[i],
+                               probabilities[i] if probabilities is not None else None)
+               for i in range(len(labels))]
+    if sides is None:
+        payload = results[0]
+    else:
+        payload = _hands_payload([(side, score, result) for (side, score), result in zip(sides, results)])
+    return _paced(session_key, gesture_smoother.apply(session_key, payload))
+
+@gesture_bp.route('/api/gesture/predict', methods=['POST'])
+def predict_gesture():
+    models = model_store.current
+    if models is None:
+        return jsonify({"error": "Gesture models not loaded"}), 500
+    
+    try:
+        try:
+            with _stage('decode'):
+                rgb_image = _read_request_frame()
+        except Exception as e:
+            return jsonify({"error": f"Invalid image data: {str(e)}"}), 400
+        
+        return jsonify(_smoothed_frame_prediction(models, rgb_image, _client_id()))
+        
+    except Exception as e:
+        print(f"❌ Gesture prediction error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+@gesture_bp.route('/api/gesture/predict_landmarks', methods=['POST'])
+def predict_gesture_landmarks():
+    """Classify hand landmarks computed on the client (no image processing).
+    Body: { "landmarks": [[x, y(, z)], ... 21 points] }
+       or { "hands": [ {"landmarks": [...], "hand": "left"|"right"}, ... ] }
+    """
+    models = model_store.current
+    if models is None:
+        return jsonify({"error": "Gesture models not loaded"}), 500
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON body must be an object"}), 400
+    try:
+        with _stage('features'):
+            parsed = _body_landmark_features(models, data)
+    except (TypeError, ValueError, AttributeError, KeyError) as e:
+        return jsonify({"error": f"Invalid landmarks: {str(e)}"}), 400
+    if parsed is None:
+        return jsonify({"error": "No landmarks provided"}), 400
+    
+    try:
+        features, sides = parsed
+        return jsonify(_smoothed_landmark_prediction(models, features, _client_id(), sides))
+    except Exception as e:
+        print(f"❌ Landmark prediction error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _act_on(payload):
+    """Dispatch the payload's committed ``action`` server-side and attach the control result"""
+    if _control_dispatch is None:
+        return payload
+    if payload.get('hands') is not None:
+        # Each hand's committed gesture is performed; the top-level action's result is repeated on top
+        hands, control = [], None
+        for hand in payload['hands']:
+            hand_control = None
+            if hand.get('action'):
+                with _stage('control'):
+                    hand_control = _control_dispatch(hand['action'])
+                if control is None and hand['action'] == payload.get('action'):
+                    control = hand_control
+            hands.append(dict(hand, control=hand_control))
+        return dict(payload, hands=hands, control=control)
+    control = None
+    if payload.get('action'):
+        with _stage('control'):
+            control = _control_dispatch(payload['action'])
+    return dict(payload, control=control)
+
+@gesture_bp.route('/api/gesture/act', methods=['POST'])
+def predict_gesture_and_act():
+    """Predict, smooth and, when a gesture commits, perform its Spotify control in one call.
+    Accepts every /api/gesture/predict and /api/gesture/predict_landmarks body.
+    """
+    models = model_store.current
+    if models is None:
+        return jsonify({"error": "Gesture models not loaded"}), 500
+    
+    session_key = _client_id()
+    data = request.get_json(silent=True) if request.is_json else None
+    if data is not None and not isinstance(data, dict):
+        return jsonify({"error": "JSON body must be an object"}), 400
+    try:
+        parsed = None
+        if data and (data.get('landmarks') or data.get('hands')):
+            try:
+                with _stage('features'):
+                    parsed = _body_landmark_features(models, data)
+            except (TypeError, ValueError, AttributeError, KeyError) as e:
+                return jsonify({"error": f"Invalid landmarks: {str(e)}"}), 400
+        if parsed is not None:
+            features, sides = parsed
+            payload = _smoothed_landmark_prediction(models, features, session_key, sides)
+        else:
+            try:
+                with _stage('decode'):
+                    rgb_image = _read_request_frame()
+            except Exception as e:
+                return jsonify({"error": f"Invalid image data: {str(e)}"}), 400
+            payload = _smoothed_frame_prediction(models, rgb_image, session_key)
+        return jsonify(_act_on(payload))
+    except Exception as e:
+        print(f"❌ Gesture act error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _frame_features(models, rgb_image, session_key, static=False):
+    """Run the session's tracker on an RGB frame.
+
+    Returns ``((1, dim) features, hand side)`` for the first hand, or None
+    when no hand is found. ``static`` uses a detection-only tracker, for
+    images that are not consecutive frames of one client.
+    """
+    workers = _get_inference_workers()
+    if workers is not None and workers.fits(rgb_image):
+        outcome = workers.predict(rgb_image, session_key,
+                                  timeout=getattr(Config, 'GESTURE_WORKER_TIMEOUT', 5.0), static=static)
+        if outcome is None:
+            return None
+        return (np.asarray(outcome['features'], dtype=np.float32).reshape(1, -1),
+                outcome['hands'][0]['hand'])
+    pool = static_hands_pool if static else hands_pool
+    with pool.session(session_key) as tracker:
+        results = tracker.process(rgb_image)
+    if not results.multi_hand_landmarks:
+        return None
+    return (to_feature_vec(results.multi_hand_landmarks[0], version=models.feature_version),
+            hand_sides(results)[0][0])
+
+def _batch_item_features(models, item):
+    """``(features, hand side)`` for one /api/gesture/predict_batch item (landmarks or image).
+
+    Images with a ``client_id`` are tracked in that client's session; others
+    go through a detection-only tracker.
+    """
+    if item.get('landmarks'):
+        side = str(item['hand']).lower() if item.get('hand') else None
+        return _landmarks_to_features(item['landmarks'], models.feature_version), side
+    image_data = item.get('image')
+    if not image_data:
+        raise ValueError("item needs 'landmarks' or 'image'")
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    client_id = item.get('client_id')
+    return _frame_features(models, _decode_frame(base64.b64decode(image_data)),
+                           client_id or _client_id(), static=not client_id)
+
+@gesture_bp.route('/api/gesture/predict_batch', methods=['POST'])
+def predict_gesture_batch():
+    """Classify many frames/landmark sets with a single scaler + model call.
+    Body: { "items": [ {"id": "...", "landmarks": [...]} | {"id": "...", "image": "data:..."} ] }
+    """
+    models = model_store.current
+    if models is None:
+        return jsonify({"error": "Gesture models not loaded"}), 500
+    
+    if (request.mimetype or '').lower() == 'multipart/form-data':
+        items = [{"id": f.filename, "raw": f.read()} for f in request.files.getlist('image')]
+    else:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data, dict):
+            return jsonify({"error": "JSON body must be an object"}), 400
+        items = data.get('items')
+    if not items or not isinstance(items, list):
+        return jsonify({"error": "No items provided"}), 400
+    max_items = getattr(Config, 'GESTURE_BATCH_MAX_ITEMS', 64)
+    if len(items) > max_items:
+        return jsonify({"error": f"Too many items (max {max_items})"}), 400
+    
+    try:
+        results = [None] * len(items)
+        rows, sides, row_index = [], [], []
+        for i, item in enumerate(items):
+            try:
+                if 'raw' in item:
+                    found = _frame_features(models, _decode_frame(item['raw']), _client_id(), static=True)
+                else:
+                    found = _batch_item_features(models, item)
+            except Exception as e:
+                results[i] = {"error": str(e)}
+                continue
+            if found is None:
+                results[i] = {"gesture": "none", "confidence": 0.0, "message": NO_HAND_MESSAGE}
+            else:
+                rows.append(found[0])
+                sides.append(found[1])
+                row_index.append(i)
+        
+        if rows:
+            with _stage('scale'):
+                features_scaled = models.inference_scaler.transform(np.vstack(rows))
+            with _stage('predict'):
+                labels, confidences, probabilities = _classify_scaled(models, features_scaled, sides)
+            for j, i in enumerate(row_index):
+                results[i] = _gesture_result(labels[j], confidences[j],
+                                             probabilities[j] if probabilities is not None else None)
+        
+        for i, (item, result) in enumerate(zip(items, results)):
+            if isinstance(item, dict) and item.get('client_id') and 'error' not in result:
+                # Items from several clients share one request; each is smoothed in its own session
+                result = results[i] = _paced(item['client_id'], gesture_smoother.apply(item['client_id'], result))
+            if isinstance(item, dict) and item.get('id') is not None:
+                result["id"] = item['id']
+        return jsonify({"results": results, "count": len(results)})
+    except Exception as e:
+        print(f"❌ Batch prediction error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def _stream_message_frame(models, message):
+    """``(rgb_frame, None)`` for a frame message, ``(None, (features, sides))`` for landmarks"""
+    if isinstance(message, (bytes, bytearray)):
+        return _decode_frame(message), None
+    data = json.loads(message)
+    parsed = _body_landmark_features(models, data)
+    if parsed is not None:
+        return None, parsed
+    image_data = data.get('image')
+    if not image_data:
+        raise ValueError("message needs a binary frame, 'landmarks', 'hands' or 'image'")
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]
+    return _decode_frame(base64.b64decode(image_data)), None
+
+def gesture_stream(ws):
+    """Persistent gesture channel: one prediction message per frame pushed.
+
+    Each connection gets its own pooled Hands tracker so MediaPipe can track
+    the hand across consecutive frames instead of re-running palm detection.
+    Connecting with ``?act=1`` also performs committed gestures' Spotify
+    controls server-side, as /api/gesture/act does.
+    """
+    session_key = f"ws:{id(ws)}"
+    act = request.args.get('act') == '1'
+    try:
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            g.stage_timer = StageTimer()
+            models = model_store.current
+            if models is None:
+                ws.send(json.dumps({"error": "Gesture models not loaded"}))
+                continue
+            try:
+                rgb_image, parsed = _stream_message_frame(models, message)
+            except Exception as e:
+                ws.send(json.dumps({"error": f"Invalid frame: {str(e)}"}))
+                continue
+            try:
+                if parsed is not None:
+                    payload = _smoothed_landmark_prediction(models, parsed[0], session_key, parsed[1])
+                else:
+                    payload = _smoothed_frame_prediction(models, rgb_image, session_key)
+                if act:
+                    payload = _act_on(payload)
+            except Exception as e:
+                # A failed frame (worker timeout, MediaPipe error) keeps the connection and its tracker
+                print(f"❌ Gesture stream error: {e}")
+                ws.send(json.dumps({"error": str(e)}))
+                continue
+            ws.send(json.dumps(payload))
+            if rgb_image is not None and not payload.get('cached'):
+                timing_stats.record(g.stage_timer)
+    finally:
+        g.stage_timer = None
+        hands_pool.discard(session_key)
+        frame_gate.forget(session_key)
+        gesture_smoother.forget(session_key)
+        frame_pacer.forget(session_key)
+
+
+
+@gesture_bp.route('/api/gesture/classes')
+def get_gesture_classes():
+    """Get available gesture classes"""
+    models = model_store.current
+    if models is None:
+        return jsonify({"error": "Gesture model not loaded"}), 500
+    
+    classes = models.classes
+    return jsonify({
+        "classes": classes,
+        "total_classes": len(classes),
+        "model_version": models.version,
+        "model_loaded_at": models.loaded_at,
+        "feature_version": models.feature_version,
+        "confidence_threshold": getattr(Config, 'GESTURE_CONFIDENCE_THRESHOLD', 0.8)
+    })
+
+@gesture_bp.route('/api/gesture/timings')
+def get_gesture_timings():
+    """Aggregated per-stage gesture pipeline timings (ms); ?reset=1 clears them"""
+    stats = timing_stats.snapshot()
+    if request.args.get('reset') == '1':
+        timing_stats.reset()
+    return jsonify({"stages": stats})
+
+# ===== Warm-up and readiness =====
+
+_warmed_up = threading.Event()
+_warmup_report = {"state": "pending"}
+
+def _synthetic_frame_bytes(width=640, height=480):
+    """Encoded noise frame: exercises JPEG decode, the gate and a full Hands pass"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode('.jpg', frame)
+    if not ok:
+        raise RuntimeError("could not encode warm-up frame")
+    return encoded.tobytes()
+
+def warm_up():
+    """Run synthetic frames and landmark rows through every stage of the pipeline"""
+    timer = StageTimer()
+    _warmup_report.update(state="running")
+    try:
+        with timer.stage('decode'):
+            rgb_image = _decode_frame(_synthetic_frame_bytes())
+        with timer.stage('gate'):
+            frame_gate.signature(rgb_image)
+        workers = _get_inference_workers()
+        if workers is not None:
+            with timer.stage('workers'):
+                if not workers.wait_ready(getattr(Config, 'GESTURE_WARMUP_TIMEOUT', 120.0)):
+                    raise TimeoutError("inference workers did not become ready")
+        else:
+            with timer.stage('hands'):
+                # Spare trackers go to the first sessions, which then skip graph start-up.
+                # Workers build their own; the in-process pool then only sees oversized frames.
+                hands_pool.prewarm(getattr(Config, 'GESTURE_WARMUP_TRACKERS', 2),
+                                   warm=lambda tracker: tracker.process(rgb_image))
+        models = model_store.current
+        if models is not None:
+            with timer.stage('models'):
+                _warm_models(models)
+                _classify_scaled(models, models.inference_scaler.transform(
+                    _landmarks_to_features([[0.5, 0.5, 0.0]] * 21, models.feature_version)), record=False)
+        _warmup_report.update(
+            state="done",
+            stages_ms={name: round(duration, 1) for name, duration in timer.stages.items()},
+            total_ms=round(timer.total_ms(), 1),
+        )
+        print(f"🔥 Gesture warm-up done in {timer.total_ms():.0f}ms")
+    except Exception as e:
+        _warmup_report.update(state="failed", error=str(e))
+        print(f"❌ Gesture warm-up failed: {e}")
+    finally:
+        _warmed_up.set()
+
+def start_warmup():
+    """Warm up on a background thread so the port opens while /api/ready reports 503"""
+    if not getattr(Config, 'GESTURE_WARMUP', True):
+        _warmup_report.update(state="skipped")
+        _warmed_up.set()
+        return
+    if not _is_server_process():
+        return
+    threading.Thread(target=warm_up, name="gesture-warmup", daemon=True).start()
+
+def readiness():
+    """``(ready, details)``: warm-up finished and a model bundle is serving"""
+    models_loaded = model_store.current is not None
+    ready = _warmed_up.is_set() and models_loaded and _warmup_report["state"] != "failed"
+    return ready, dict(_warmup_report, models_loaded=models_loaded)
+
+def health_info():
+    """Gesture subsystem fields merged into /api/health"""
+    return {
+        "gesture_models": model_store.current is not None,
+        "gesture_fast_path": gesture_predictor is not None,
+        "gesture_model": model_store.stats(),
+        "hands_pool": hands_pool.stats(),
+        "inference_workers": _inference_workers.stats() if _inference_workers else None,
+        "frame_gate": frame_gate.stats(),
+        "smoothing": gesture_smoother.stats(),
+        "pacing": dict(frame_pacer.stats(), load=round(_inference_load(), 3)),
+        "cascade": cascade_stats.stats(),
+    }
+
+def init_app(app, sock=None, control_dispatch=None):
+    """Register the gesture routes (and /ws/gesture when flask-sock is available).
+
+    ``control_dispatch(gesture)`` performs a committed gesture's playback
+    control and returns its result; without it /api/gesture/act only predicts.
+    """
+    global _control_dispatch
+    _control_dispatch = control_dispatch
+    app.register_blueprint(gesture_bp)
+    if sock is not None:
+        sock.route('/ws/gesture')(gesture_stream)
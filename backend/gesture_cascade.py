@@ -0,0 +1,112 @@
+"""Two-stage gesture classification: a linear "none" rejector before the ensemble.
+
+Most frames with a hand in view are still the ``none`` class (idle or
+passing hands). ``train_gesture_model.py`` fits a logistic gesture-vs-none
+model on the scaled features and stores its weights and cut-off in the
+model's ``.meta.json``. ``cascade_proba`` scores every row with that single
+dot product first and only runs the full ensemble's ``predict_proba`` on
+rows that may be a gesture; the rest are answered as ``none`` directly.
+"""
+
+import threading
+
+import numpy as np
+
+from gesture_routing import predict_proba
+
+
+class NoneRejector:
+    """Stage 1: logistic P(gesture) on scaled features, rejecting rows below ``threshold``"""
+
+    def __init__(self, coef, intercept, threshold, none_label='none'):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.threshold = float(threshold)
+        self.none_label = none_label
+        self._none_index = None
+
+    @classmethod
+    def from_metadata(cls, meta, n_features=None):
+        """Rejector described by a model's metadata, or None when it has none (or does not fit)"""
+        params = (meta or {}).get('rejector')
+        if not params:
+            return None
+        rejector = cls(params['coef'], params['intercept'], params['threshold'],
+                       params.get('none_label', 'none'))
+        if n_features is not None and rejector.coef.shape != (n_features,):
+            raise ValueError(f"rejector has {rejector.coef.size} weights, model expects {n_features} features")
+        return rejector
+
+    def gesture_scores(self, X_scaled):
+        z = np.asarray(X_scaled) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def none_index(self, classes):
+        if self._none_index is None:
+            self._none_index = list(classes).index(self.none_label)
+        return self._none_index
+
+    def info(self):
+        return {"threshold": self.threshold, "none_label": self.none_label}
+
+
+def cascade_proba(models, X_scaled, sides=None):
+    """``(probabilities, passed)`` for scaled rows.
+
+    ``sides`` (one hand side or None per row) routes rows of a
+    handedness-routed model to their side's classifier.
+
+    ``passed`` marks the rows that reached the full model (all True without a
+    rejector). Rejected rows put ``1 - P(gesture)`` on the none class and
+    spread the rest evenly, so they still sum to one.
+    """
+    model = models.inference_model
+    rejector = models.rejector
+    if rejector is None:
+        return np.asarray(predict_proba(model, X_scaled, sides)), np.ones(len(X_scaled), dtype=bool)
+    scores = rejector.gesture_scores(X_scaled)
+    passed = scores >= rejector.threshold
+    if passed.all():
+        return np.asarray(predict_proba(model, X_scaled, sides)), passed
+    n_classes = len(model.classes_)
+    none_index = rejector.none_index(model.classes_)
+    probabilities = np.empty((len(scores), n_classes), dtype=np.float64)
+    rejected = ~passed
+    p_none = 1.0 - scores[rejected]
+    probabilities[rejected] = ((1.0 - p_none) / max(1, n_classes - 1))[:, None]
+    probabilities[rejected, none_index] = p_none
+    if passed.any():
+        passed_sides = None if sides is None else [s for s, ok in zip(sides, passed) if ok]
+        probabilities[passed] = predict_proba(model, np.asarray(X_scaled)[passed], passed_sides)
+    return probabilities, passed
+
+
+class CascadeStats:
+    """Thread-safe counters for how many rows each stage settled"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, rows, rejected, stage2_none=0):
+        with self._lock:
+            self._rows += int(rows)
+            self._rejected += int(rejected)
+            self._stage2_none += int(stage2_none)
+
+    def reset(self):
+        with self._lock:
+            self._rows = 0
+            self._rejected = 0
+            self._stage2_none = 0
+
+    def stats(self):
+        with self._lock:
+            passed = self._rows - self._rejected
+            return {
+                "rows": self._rows,
+                "stage1_rejected": self._rejected,
+                "stage2_rows": passed,
+                "stage2_none": self._stage2_none,
+                "stage1_rejection_rate": round(self._rejected / self._rows, 4) if self._rows else 0.0,
+            }
@@ -0,0 +1,106 @@
+"""Per-client temporal smoothing and action debouncing for gesture predictions.
+
+Raw per-frame predictions flicker: one noisy frame can look like a different
+gesture. Each client session keeps a ring buffer of its last
+``stable_frames`` labels; a gesture becomes *stable* only once it fills the
+whole buffer (the ``stable_decision`` rule from ``maintesting_spotify.py``).
+A stable gesture becomes *action-ready* at most once per ``cooldown``
+seconds per session, so clients can fire a control call exactly when the
+response carries an ``action`` instead of running their own debounce.
+
+Multi-hand payloads are smoothed per hand side, so a held left-hand gesture
+and a right-hand gesture commit independently.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+HAND_SIDES = ("left", "right")
+
+
+class _Session:
+    __slots__ = ('history', 'last_action_at')
+
+    def __init__(self, stable_frames):
+        self.history = deque(maxlen=stable_frames)
+        self.last_action_at = None
+
+
+class GestureSmoother:
+    def __init__(self, stable_frames=5, cooldown=1.0, max_clients=256):
+        self.stable_frames = max(1, int(stable_frames))
+        self.cooldown = float(cooldown)
+        self.max_clients = max(1, int(max_clients))
+        self._sessions = OrderedDict()  # key -> _Session
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._actions = 0
+
+    def observe(self, key, gesture, now=None):
+        """Feed one frame's label for ``key``; returns ``(stable_gesture, action)``.
+
+        ``stable_gesture`` is the smoothed label ("none" until a gesture holds
+        for ``stable_frames`` frames); ``action`` is that gesture when it is
+        ready to act on, else None.
+        """
+        now = time.monotonic() if now is None else now
+        label = gesture or "none"
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = _Session(self.stable_frames)
+                while len(self._sessions) > self.max_clients:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(key)
+            self._frames += 1
+            session.history.append(label)
+            if label == "none" or session.history.count(label) < self.stable_frames:
+                return "none", None
+            if session.last_action_at is not None and now - session.last_action_at < self.cooldown:
+                return label, None
+            session.last_action_at = now
+            self._actions += 1
+            return label, label
+
+    def apply(self, key, payload):
+        """Copy of a prediction payload with ``stable_gesture`` and ``action`` added"""
+        hands = payload.get("hands")
+        if hands is None:
+            stable, action = self.observe(key, payload.get("gesture"))
+            return dict(payload, stable_gesture=stable, action=action)
+
+        smoothed, seen = [], set()
+        for hand in hands:
+            side = hand.get("hand")
+            hand_key = f"{key}:{side}" if side not in seen else f"{key}:{side}:{len(seen)}"
+            seen.add(side)
+            stable, action = self.observe(hand_key, hand.get("gesture"))
+            smoothed.append(dict(hand, stable_gesture=stable, action=action))
+        # A side without a hand in this frame breaks its streak
+        for side in HAND_SIDES:
+            if side not in seen:
+                self.observe(f"{key}:{side}", "none")
+        top = (next((h for h in smoothed if h["action"]), None)
+               or next((h for h in smoothed if h["stable_gesture"] != "none"), None))
+        return dict(payload, hands=smoothed,
+                    stable_gesture=top["stable_gesture"] if top else "none",
+                    action=top["action"] if top else None)
+
+    def forget(self, key):
+        """Drop a client's session and every per-hand session kept under ``key:``"""
+        prefix = f"{key}:"
+        with self._lock:
+            for name in [name for name in self._sessions if name == key or name.startswith(prefix)]:
+                del self._sessions[name]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": len(self._sessions),
+                "frames": self._frames,
+                "actions": self._actions,
+                "stable_frames": self.stable_frames,
+                "cooldown": self.cooldown,
+            }
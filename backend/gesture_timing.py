@@ -0,0 +1,84 @@
+"""Per-stage timing for the gesture pipeline.
+
+A ``StageTimer`` collects the duration of each pipeline stage (decode,
+hands, features, scale, predict, ...) for one request; it renders as a
+``Server-Timing`` header and is folded into a process-wide ``TimingStats``
+aggregate that keeps counts, means and recent percentiles per stage.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = OrderedDict()
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000.0)
+
+    def add(self, name, duration_ms):
+        self.stages[name] = self.stages.get(name, 0.0) + duration_ms
+
+    def total_ms(self):
+        return (time.perf_counter() - self._started) * 1000.0
+
+    def server_timing(self):
+        parts = [f"{name};dur={duration:.2f}" for name, duration in self.stages.items()]
+        parts.append(f"total;dur={self.total_ms():.2f}")
+        return ", ".join(parts)
+
+
+class TimingStats:
+    """Thread-safe per-stage aggregate with a bounded window for percentiles"""
+
+    def __init__(self, window=1000):
+        self._window = window
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, timer):
+        with self._lock:
+            for name, duration in list(timer.stages.items()) + [("total", timer.total_ms())]:
+                entry = self._stages.get(name)
+                if entry is None:
+                    entry = self._stages[name] = {"count": 0, "sum": 0.0, "max": 0.0,
+                                                  "recent": deque(maxlen=self._window)}
+                entry["count"] += 1
+                entry["sum"] += duration
+                entry["max"] = max(entry["max"], duration)
+                entry["recent"].append(duration)
+
+    def snapshot(self):
+        with self._lock:
+            out = {}
+            for name, entry in self._stages.items():
+                recent = sorted(entry["recent"])
+                out[name] = {
+                    "count": entry["count"],
+                    "mean_ms": round(entry["sum"] / entry["count"], 3),
+                    "max_ms": round(entry["max"], 3),
+                    "p50_ms": round(_percentile(recent, 50), 3),
+                    "p95_ms": round(_percentile(recent, 95), 3),
+                    "p99_ms": round(_percentile(recent, 99), 3),
+                }
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,168 @@
+"""Bounded pool of MediaPipe Hands trackers keyed by client/session id.
+
+A single shared tracker serialises every request and mixes tracking state
+between users, so MediaPipe keeps falling back to full palm detection. The
+pool gives each client its own tracker (so consecutive frames take the cheap
+tracking path and different clients run in parallel), evicts trackers that
+have been idle for too long and caps the total number of live instances.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _PoolEntry:
+    __slots__ = ('tracker', 'busy', 'last_used')
+
+    def __init__(self):
+        self.tracker = None
+        self.busy = True
+        self.last_used = time.monotonic()
+
+
+class HandsPool:
+    """LRU pool of trackers built by ``factory``.
+
+    ``max_size`` caps live trackers; when the pool is full the least recently
+    used idle tracker is closed to make room, and if every tracker is busy the
+    caller waits for one to be released. Trackers unused for ``idle_ttl``
+    seconds are closed on the next acquire.
+    """
+
+    def __init__(self, factory, max_size=8, idle_ttl=60.0):
+        self._factory = factory
+        self._max_size = max(1, int(max_size))
+        self._idle_ttl = float(idle_ttl)
+        self._entries = OrderedDict()
+        self._spares = []  # pre-built trackers handed to new sessions before calling the factory
+        self._cond = threading.Condition()
+        self._created = 0
+        self._evicted = 0
+
+    @contextmanager
+    def session(self, key):
+        """Hold the tracker for ``key`` for the duration of the block"""
+        entry = self._acquire(key)
+        try:
+            yield entry.tracker
+        finally:
+            self._release(entry)
+
+    def prewarm(self, count, warm=None):
+        """Build up to ``count`` spare trackers ahead of traffic.
+
+        ``warm(tracker)`` runs once on each (e.g. a synthetic frame) so the
+        first real session skips graph initialisation.
+        """
+        with self._cond:
+            missing = max(0, int(count) - len(self._spares))
+        for _ in range(missing):
+            tracker = self._factory()
+            if warm is not None:
+                warm(tracker)
+            with self._cond:
+                self._spares.append(tracker)
+                self._created += 1
+
+    def discard(self, key):
+        """Close and forget the tracker for ``key`` (e.g. when a socket closes)"""
+        with self._cond:
+            entry = self._entries.get(key)
+            if entry is None or entry.busy:
+                return
+            del self._entries[key]
+            self._cond.notify_all()
+        self._close(entry)
+
+    def close_all(self):
+        with self._cond:
+            entries = [e for e in self._entries.values() if not e.busy]
+            for key in [k for k, e in self._entries.items() if not e.busy]:
+                del self._entries[key]
+            spares, self._spares = self._spares, []
+        for entry in entries:
+            self._close(entry)
+        for tracker in spares:
+            try:
+                tracker.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": len(self._entries),
+                "busy": sum(1 for e in self._entries.values() if e.busy),
+                "spares": len(self._spares),
+                "max_size": self._max_size,
+                "idle_ttl": self._idle_ttl,
+                "created": self._created,
+                "evicted": self._evicted,
+            }
+
+    def _acquire(self, key):
+        to_close = []
+        try:
+            with self._cond:
+                while True:
+                    to_close.extend(self._pop_idle_locked())
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        if entry.busy:
+                            self._cond.wait()
+                            continue
+                        entry.busy = True
+                        self._entries.move_to_end(key)
+                        return entry
+                    if len(self._entries) >= self._max_size:
+                        victim = next((k for k, e in self._entries.items() if not e.busy), None)
+                        if victim is None:
+                            self._cond.wait()
+                            continue
+                        to_close.append(self._entries.pop(victim))
+                        self._evicted += 1
+                    entry = _PoolEntry()
+                    self._entries[key] = entry
+                    if self._spares:
+                        entry.tracker = self._spares.pop()
+                        return entry
+                    # Reserve the slot, then build the tracker outside the lock
+                    break
+        finally:
+            for stale in to_close:
+                self._close(stale)
+
+        try:
+            entry.tracker = self._factory()
+        except Exception:
+            with self._cond:
+                self._entries.pop(key, None)
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._created += 1
+        return entry
+
+    def _release(self, entry):
+        with self._cond:
+            entry.busy = False
+            entry.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    def _pop_idle_locked(self):
+        now = time.monotonic()
+        expired = [k for k, e in self._entries.items()
+                   if not e.busy and now - e.last_used > self._idle_ttl]
+        popped = [self._entries.pop(k) for k in expired]
+        self._evicted += len(popped)
+        return popped
+
+    @staticmethod
+    def _close(entry):
+        try:
+            if entry.tracker is not None:
+                entry.tracker.close()
+        except Exception:
+            pass
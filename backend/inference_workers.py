@@ -0,0 +1,309 @@
+"""Process-pool gesture inference with shared-memory frame handoff.
+
+Request threads only copy the decoded frame into a free shared-memory slot,
+enqueue a small job tuple and wait for the answer. MediaPipe, the scaler and
+the classifier run in worker processes, so inference uses every core instead
+of contending for one GIL. Jobs are routed to workers by session key, which
+keeps each client's tracker (and its cheap tracking path) inside one worker.
+A worker that dies is replaced the next time a job is routed to it or times
+out waiting on it; its unanswered jobs fail and give their slots back.
+"""
+
+import atexit
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _worker_main(task_queue, result_queue, slot_names, model_path, scaler_path,
+                 hands_kwargs, roi_kwargs, pool_size, idle_ttl, use_fast_path, use_cascade):
+    """Worker process loop: load models once, then serve frames from shared memory"""
+    import mediapipe as mp_lib
+    from frame_preprocess import RoiHandTracker
+    from gesture_cascade import cascade_proba
+    from gesture_features import hand_sides, to_feature_batch
+    from hands_pool import HandsPool
+    from model_store import load_models
+
+    models = load_models(model_path, scaler_path, use_fast_path, use_cascade)
+    hands_module = mp_lib.solutions.hands
+    def new_tracker():
+        crop_hands = hands_module.Hands(**hands_kwargs) if roi_kwargs.get('roi_crop', True) else None
+        return RoiHandTracker(hands_module.Hands(**hands_kwargs), crop_hands, **roi_kwargs)
+
+    trackers = HandsPool(new_tracker, max_size=pool_size, idle_ttl=idle_ttl)
+    # Detection-only trackers for images that are not consecutive frames of a session
+    static_trackers = HandsPool(
+        lambda: RoiHandTracker(hands_module.Hands(**dict(hands_kwargs, static_image_mode=True)),
+                               **dict(roi_kwargs, roi_crop=False)),
+        max_size=pool_size, idle_ttl=idle_ttl)
+    segments = {name: shared_memory.SharedMemory(name=name) for name in slot_names}
+
+    # Build one tracker on a blank frame before announcing readiness
+    blank = np.zeros((480, 640, 3), dtype=np.uint8)
+    trackers.prewarm(1, warm=lambda tracker: tracker.process(blank))
+    result_queue.put((None, "ready", None))
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            if task == 'reload':
+                # Keep serving the previous pair if the new one does not load
+                try:
+                    models = load_models(model_path, scaler_path, use_fast_path, use_cascade)
+                except Exception as e:
+                    print(f"Warning: gesture worker kept model {models.version}: {e}")
+                continue
+            job_id, slot_name, shape, session_key, static = task
+            try:
+                started = time.perf_counter()
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=segments[slot_name].buf)
+                with (static_trackers if static else trackers).session(session_key) as tracker:
+                    results = tracker.process(frame)
+                del frame
+                if not results.multi_hand_landmarks:
+                    result_queue.put((job_id, None, None))
+                    continue
+                hands_done = time.perf_counter()
+                hands = results.multi_hand_landmarks
+                features = to_feature_batch(hands, version=models.feature_version)
+                features_done = time.perf_counter()
+                model = models.inference_model
+                features_scaled = models.inference_scaler.transform(features)
+                scale_done = time.perf_counter()
+                sides = hand_sides(results)
+                per_hand = []
+                if hasattr(model, 'predict_proba'):
+                    probabilities, passed = cascade_proba(models, features_scaled,
+                                                          [side for side, _ in sides])
+                    top = np.argmax(probabilities, axis=1)
+                    for i in range(len(hands)):
+                        per_hand.append({
+                            "gesture": str(model.classes_[top[i]]),
+                            "confidence": float(probabilities[i, top[i]]),
+                            "probabilities": probabilities[i].tolist(),
+                            "stage1_rejected": None if models.rejector is None else not bool(passed[i]),
+                        })
+                else:
+                    for label in model.predict(features_scaled):
+                        per_hand.append({"gesture": str(label), "confidence": 1.0,
+                                         "probabilities": None, "stage1_rejected": None})
+                for hand, (side, score) in zip(per_hand, sides):
+                    hand["hand"], hand["hand_score"] = side, score
+                payload = {
+                    "hands": per_hand,
+                    "features": features[0].tolist(),
+                    "timings": {
+                        "hands": (hands_done - started) * 1000.0,
+                        "features": (features_done - hands_done) * 1000.0,
+                        "scale": (scale_done - features_done) * 1000.0,
+                        "predict": (time.perf_counter() - scale_done) * 1000.0,
+                    },
+                }
+                result_queue.put((job_id, payload, None))
+            except Exception as e:
+                result_queue.put((job_id, None, str(e)))
+    finally:
+        trackers.close_all()
+        static_trackers.close_all()
+        for segment in segments.values():
+            segment.close()
+
+
+class InferenceWorkerPool:
+    """Pool of inference worker processes fed through shared-memory frame slots.
+
+    ``predict`` returns the worker's payload dict (``hands``: one ``gesture`` /
+    ``confidence`` / ``probabilities`` / ``hand`` entry per detected hand, the
+    first hand's ``features`` and per-stage ``timings`` in ms), None when no
+    hand was found, and raises
+    RuntimeError/TimeoutError on worker failure. Frames larger than
+    ``max_frame_bytes`` do not fit a slot; check ``fits`` before submitting.
+    """
+
+    def __init__(self, num_workers, model_path, scaler_path, hands_kwargs,
+                 roi_settings=None, slots_per_worker=2, max_frame_bytes=1920 * 1080 * 3,
+                 pool_size=8, idle_ttl=60.0, use_fast_path=True, use_cascade=True,
+                 start_method='spawn'):
+        self.num_workers = max(1, int(num_workers))
+        self.max_frame_bytes = int(max_frame_bytes)
+        self._ctx = mp.get_context(start_method)
+        self._segments = [
+            shared_memory.SharedMemory(create=True, size=self.max_frame_bytes)
+            for _ in range(self.num_workers * max(1, int(slots_per_worker)))
+        ]
+        self._free_slots = queue.Queue()
+        for segment in self._segments:
+            self._free_slots.put(segment)
+        self._results = self._ctx.Queue()
+        self._worker_args = ([segment.name for segment in self._segments], model_path, scaler_path,
+                             hands_kwargs, roi_settings or {}, pool_size, idle_ttl, use_fast_path,
+                             use_cascade)
+        self._task_queues = [None] * self.num_workers
+        self._processes = [None] * self.num_workers
+        for i in range(self.num_workers):
+            self._spawn(i)
+        # job id -> (future, worker index)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._respawn_lock = threading.Lock()
+        self.respawned = 0
+        self._job_ids = itertools.count()
+        self._closed = False
+        self._ready_workers = 0
+        self._ready = threading.Event()
+        self._collector = threading.Thread(target=self._collect, name="gesture-results", daemon=True)
+        self._collector.start()
+        atexit.register(self.close)
+
+    def _spawn(self, i):
+        """Start worker ``i`` on a fresh task queue"""
+        tasks = self._ctx.Queue()
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(tasks, self._results) + self._worker_args,
+            name=f"gesture-worker-{i}",
+            daemon=True,
+        )
+        proc.start()
+        self._task_queues[i] = tasks
+        self._processes[i] = proc
+
+    def _replace_if_dead(self, i):
+        """Respawn worker ``i`` if it has exited, failing the jobs it still owed.
+
+        Failing a job resolves its future, which puts its frame slot back on the
+        free list. The old task queue is dropped with any jobs still in it.
+        """
+        with self._respawn_lock:
+            proc = self._processes[i]
+            if self._closed or proc.is_alive():
+                return
+            with self._pending_lock:
+                lost = [job_id for job_id, (_, worker) in self._pending.items() if worker == i]
+                futures = [self._pending.pop(job_id)[0] for job_id in lost]
+            error = f"gesture worker {i} exited with code {proc.exitcode}"
+            print(f"Warning: {error}; restarting it")
+            for future in futures:
+                future.set_result((None, error))
+            if self._ready_workers > 0:
+                self._ready_workers -= 1
+            self.respawned += 1
+            self._spawn(i)
+
+    def fits(self, frame):
+        return frame.dtype.itemsize == 1 and frame.nbytes <= self.max_frame_bytes
+
+    def wait_ready(self, timeout=None):
+        """Block until every worker has loaded its models and warmed a tracker"""
+        return self._ready.wait(timeout)
+
+    def queue_depth(self):
+        with self._pending_lock:
+            return len(self._pending)
+
+    def predict(self, frame, session_key, timeout=5.0, static=False):
+        """Run one RGB uint8 frame through the session's worker and wait for the result.
+
+        ``static`` uses a detection-only tracker that keeps no state between frames.
+        """
+        if self._closed:
+            raise RuntimeError("inference workers are shut down")
+        try:
+            segment = self._free_slots.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError("no free frame slot")
+        try:
+            np.ndarray(frame.shape, dtype=np.uint8, buffer=segment.buf)[...] = frame
+        except Exception:
+            self._free_slots.put(segment)
+            raise
+        # The slot goes back to the free list only once the worker has answered,
+        # even if this request already gave up waiting
+        future = Future()
+        future.add_done_callback(lambda _f: self._free_slots.put(segment))
+        job_id = next(self._job_ids)
+        worker = zlib.crc32(str(session_key).encode()) % self.num_workers
+        self._replace_if_dead(worker)
+        with self._pending_lock:
+            self._pending[job_id] = (future, worker)
+        self._task_queues[worker].put((job_id, segment.name, frame.shape, session_key, bool(static)))
+        try:
+            payload, error = future.result(timeout=timeout)
+        except FutureTimeout:
+            # A crashed worker never answers; replacing it fails this job too
+            self._replace_if_dead(worker)
+            if not future.done():
+                raise TimeoutError("gesture worker did not answer in time")
+            payload, error = future.result()
+        if error:
+            raise RuntimeError(error)
+        return payload
+
+    def reload_models(self):
+        """Ask every worker to reload the model artifacts from disk"""
+        if self._closed:
+            return
+        for tasks in self._task_queues:
+            tasks.put('reload')
+
+    def stats(self):
+        return {
+            "workers": self.num_workers,
+            "alive": sum(1 for p in self._processes if p.is_alive()),
+            "ready": self._ready_workers,
+            "respawned": self.respawned,
+            "free_slots": self._free_slots.qsize(),
+            "pending": self.queue_depth(),
+        }
+
+    def close(self):
+        with self._respawn_lock:
+            if self._closed:
+                return
+            self._closed = True
+        for tasks in self._task_queues:
+            try:
+                tasks.put(None)
+            except Exception:
+                pass
+        for proc in self._processes:
+            proc.join(timeout=2)
+            if proc.is_alive():
+                proc.terminate()
+        self._results.put(None)
+        for segment in self._segments:
+            try:
+                segment.close()
+                segment.unlink()
+            except Exception:
+                pass
+
+    def _collect(self):
+        while True:
+            try:
+                item = self._results.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, payload, error = item
+            if job_id is None:
+                self._ready_workers += 1
+                if self._ready_workers >= self.num_workers:
+                    self._ready.set()
+                continue
+            with self._pending_lock:
+                entry = self._pending.pop(job_id, None)
+            if entry is not None:
+                entry[0].set_result((payload, error))
@@ -0,0 +1,200 @@
+"""Single-file, memory-mapped gesture model bundle (``.gmb``).
+
+``joblib.load`` gives every worker process its own copy of every tree array,
+support vector and KNN training row. A bundle stores the compiled
+``FastGesturePredictor`` instead: a JSON header (object layout, classes,
+feature version, rejector, dataset hash) followed by the raw parameter
+arrays, each 64-byte aligned and uncompressed. ``read_bundle`` maps the file
+read-only and builds the arrays as views into the mapping, so loading only
+parses the header and N workers share one page-cache copy of the arrays.
+
+Leaf probabilities are stored as float32 and tree node indices as int32,
+which roughly halves the forest. Split thresholds, support vectors and KNN
+rows stay float64 so every comparison and distance matches sklearn.
+
+Bundles are replaced with ``os.replace`` and never rewritten in place, so
+processes still mapping the previous file keep a consistent view of it.
+
+Usage:
+    python model_bundle.py gesture_model.pkl scaler.pkl -o gesture_model.gmb
+"""
+
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+import fast_predictor
+# Handedness routing is shared with the trainer and controllers in "Gesture final"
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Gesture final'))
+import gesture_routing
+
+MAGIC = b'GESTMB01'
+ALIGN = 64
+BUNDLE_SUFFIX = '.gmb'
+
+# Predictor classes a bundle may instantiate
+_CLASSES = {cls.__name__: cls for cls in (
+    fast_predictor.FastGesturePredictor, fast_predictor._ScalerParams,
+    fast_predictor._ForestParams, fast_predictor._SVCParams, fast_predictor._KNNParams,
+    fast_predictor._LogisticParams, fast_predictor._VotingParams,
+    gesture_routing.HandRoutedModel,
+)}
+# (class, attribute) -> narrower storage dtype
+_NARROW = {
+    ('_ForestParams', 'value'): np.float32,
+    ('_ForestParams', 'feature'): np.int32,
+    ('_ForestParams', 'left'): np.int32,
+    ('_ForestParams', 'right'): np.int32,
+    ('_ForestParams', 'roots'): np.int32,
+}
+
+
+def is_bundle(path):
+    return str(path).endswith(BUNDLE_SUFFIX)
+
+
+def _encode(value, arrays, owner=None, attr=None):
+    """JSON-able layout of a predictor object; arrays are appended to ``arrays``"""
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'OUS':
+            return {"__strings__": [str(v) for v in value.tolist()]}
+        dtype = _NARROW.get((owner, attr))
+        if dtype is not None:
+            narrowed = value.astype(dtype)
+            if np.issubdtype(dtype, np.integer) and not np.array_equal(narrowed, value):
+                narrowed = value  # index range does not fit; keep the original width
+            value = narrowed
+        arrays.append(np.ascontiguousarray(value))
+        return {"__array__": len(arrays) - 1}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v, arrays) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    name = type(value).__name__
+    if name not in _CLASSES:
+        raise ValueError(f"cannot bundle {name}")
+    return {"__class__": name,
+            "attrs": {k: _encode(v, arrays, name, k) for k, v in vars(value).items()}}
+
+
+def _decode(node, arrays):
+    if isinstance(node, list):
+        return [_decode(v, arrays) for v in node]
+    if not isinstance(node, dict):
+        return node
+    if "__array__" in node:
+        return arrays[node["__array__"]]
+    if "__strings__" in node:
+        return np.asarray(node["__strings__"])
+    obj = _CLASSES[node["__class__"]].__new__(_CLASSES[node["__class__"]])
+    for key, value in node["attrs"].items():
+        setattr(obj, key, _decode(value, arrays))
+    return obj
+
+
+def _padding(offset):
+    return (-offset) % ALIGN
+
+
+def write_bundle(path, predictor, meta):
+    """Write ``predictor`` (a FastGesturePredictor) and ``meta`` atomically to ``path``"""
+    arrays = []
+    layout = _encode(predictor, arrays)
+    specs, offset = [], 0
+    for array in arrays:
+        offset += _padding(offset)
+        specs.append({"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset})
+        offset += array.nbytes
+    header = json.dumps({"meta": meta, "layout": layout, "arrays": specs}).encode('utf-8')
+    data_start = len(MAGIC) + 8 + len(header)
+    data_start += _padding(data_start)
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        f.write(b'\0' * (data_start - f.tell()))
+        for spec, array in zip(specs, arrays):
+            f.write(b'\0' * (data_start + spec["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp, path)
+
+
+def read_bundle(path):
+    """``(predictor, meta)`` from a bundle; parameter arrays are read-only views of the mapping"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a gesture model bundle")
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    data_start = len(MAGIC) + 8 + header_len
+    data_start += _padding(data_start)
+    mapping = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = []
+    for spec in header["arrays"]:
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"], dtype=np.int64))
+        start = data_start + spec["offset"]
+        if start + count * dtype.itemsize > mapping.size:
+            raise ValueError(f"{path} is truncated")
+        arrays.append(np.frombuffer(mapping, dtype=dtype, count=count, offset=start)
+                      .reshape(spec["shape"]))
+    return _decode(header["layout"], arrays), header["meta"]
+
+
+def build_bundle(model_path, scaler_path, out_path, dataset_path=None):
+    """Compile a (model, scaler) pair into a bundle; returns the bundle's metadata.
+
+    With ``dataset_path`` (a .gds or collector JSON dataset) the bundle is
+    checked against the sklearn pair on every sample before it is kept.
+    """
+    import joblib
+    from gesture_dataset import load_dataset
+    from gesture_features import read_metadata, read_feature_version
+
+    model = gesture_routing.as_model(joblib.load(model_path))
+    scaler = joblib.load(scaler_path)
+    predictor = fast_predictor.compile_predictor(model, scaler)
+    meta = dict(read_metadata(model_path))
+    meta.update(
+        feature_version=read_feature_version(model_path, scaler),
+        feature_dim=int(scaler.n_features_in_),
+        classes=[str(c) for c in model.classes_],
+    )
+    write_bundle(out_path, predictor, meta)
+    if dataset_path:
+        X = np.asarray(load_dataset(dataset_path).X, dtype=np.float32)
+        bundled, _ = read_bundle(out_path)
+        expected = model.predict_proba(scaler.transform(X))
+        actual = bundled.predict_proba(bundled.transform(X))
+        agree = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+        meta["verified"] = {"samples": len(X), "label_agreement": agree,
+                            "max_probability_error": float(np.max(np.abs(expected - actual)))}
+        if agree < 1.0:
+            os.remove(out_path)
+            raise ValueError(f"bundle disagrees with sklearn on {1.0 - agree:.4%} of samples")
+    return meta
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a memory-mapped gesture model bundle")
+    parser.add_argument('model', help="gesture_model.pkl")
+    parser.add_argument('scaler', help="scaler.pkl")
+    parser.add_argument('-o', '--out', default=None, help="output .gmb (default: next to the model)")
+    parser.add_argument('--dataset', default=None, help=".gds dataset (or collector JSON) to verify the bundle against")
+    args = parser.parse_args()
+    out = args.out or os.path.splitext(args.model)[0] + BUNDLE_SUFFIX
+    info = build_bundle(args.model, args.scaler, out, args.dataset)
+    print(f"✅ Wrote {out} ({os.path.getsize(out) / 1e6:.1f} MB, "
+          f"{len(info['classes'])} classes, features v{info['feature_version']})")
+    if 'verified' in info:
+        print(f"   Verified on {info['verified']['samples']} samples: "
+              f"max probability error {info['verified']['max_probability_error']:.2e}")
@@ -0,0 +1,254 @@
+"""Gesture model artifacts with background hot-reload.
+
+The fitted classifier and scaler (plus the compiled fast-path predictor) are
+held together in one immutable ``GestureModels`` bundle (or mapped from a
+single ``.gmb`` file, see ``model_bundle``). A ``ModelStore``
+watches the two artifact files; when either changes (size/mtime, then content
+hash) and the change has settled for one poll interval, the new pair is
+loaded, compiled and smoke-tested on a background thread and only then
+swapped in with a single reference assignment. Requests read ``current``
+once and use that bundle throughout, so a scale/predict pair never mixes
+artifacts from two versions. A bad artifact is reported and the previous
+bundle keeps serving.
+"""
+
+import datetime
+import hashlib
+import os
+import threading
+
+import joblib
+import numpy as np
+
+from fast_predictor import compile_predictor
+from gesture_cascade import NoneRejector
+from gesture_features import feature_dim, metadata_path, read_feature_version, read_metadata
+from gesture_routing import as_model
+from model_bundle import is_bundle, read_bundle
+
+
+class GestureModels:
+    """One loaded (model, scaler) pair and the predictor used to serve it"""
+
+    def __init__(self, model, scaler, predictor, version, loaded_at, signature=None,
+                 feature_version=1, rejector=None, n_features=None):
+        self.model = model
+        self.scaler = scaler
+        self.predictor = predictor
+        self.feature_version = feature_version
+        self.rejector = rejector  # optional stage-1 NoneRejector (see gesture_cascade)
+        self.n_features = n_features or getattr(scaler, 'n_features_in_', None) or feature_dim(feature_version)
+        self.version = version
+        self.loaded_at = loaded_at
+        self.signature = signature
+
+    @property
+    def inference_model(self):
+        return self.predictor or self.model
+
+    @property
+    def inference_scaler(self):
+        return self.predictor or self.scaler
+
+    @property
+    def classes(self):
+        return self.model.classes_.tolist() if hasattr(self.model, 'classes_') else []
+
+    def info(self):
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "fast_path": self.predictor is not None,
+            "mapped": self.model is self.predictor,
+            "feature_version": self.feature_version,
+            "cascade": self.rejector.info() if self.rejector is not None else None,
+            "routed_sides": getattr(self.inference_model, 'routed_sides', None),
+        }
+
+
+def _artifact_paths(model_path, scaler_path):
+    """Files that make up one model version (the .meta.json sidecar is optional)"""
+    if is_bundle(model_path):
+        return [model_path]
+    paths = [model_path, scaler_path]
+    if os.path.exists(metadata_path(model_path)):
+        paths.append(metadata_path(model_path))
+    return paths
+
+
+def _file_signature(*paths):
+    """Cheap change marker: (size, mtime_ns) of every path"""
+    signature = []
+    for path in paths:
+        st = os.stat(path)
+        signature.append((st.st_size, st.st_mtime_ns))
+    return tuple(signature)
+
+
+def _content_version(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def load_models(model_path, scaler_path, fast_path=True, cascade=True):
+    """Load, compile and smoke-test a (model, scaler) pair; raises on any failure"""
+    paths = _artifact_paths(model_path, scaler_path)
+    signature = _file_signature(*paths)
+    version = _content_version(*paths)
+    if is_bundle(model_path):
+        if not fast_path:
+            print("Warning: a .gmb bundle only holds the compiled predictor; GESTURE_FAST_PATH=0 is ignored")
+        return _load_bundle(model_path, version, signature, cascade)
+    model = as_model(joblib.load(model_path))
+    scaler = joblib.load(scaler_path)
+    feature_version = read_feature_version(model_path, scaler)
+    rejector = None
+    if cascade and hasattr(model, 'predict_proba'):
+        rejector = NoneRejector.from_metadata(read_metadata(model_path),
+                                              getattr(scaler, 'n_features_in_', None))
+        if rejector is not None and rejector.none_label not in list(model.classes_):
+            raise ValueError(f"rejector label {rejector.none_label!r} is not a model class")
+    predictor = None
+    if fast_path:
+        try:
+            predictor = compile_predictor(model, scaler)
+        except ValueError as e:
+            print(f"Warning: gesture fast path unavailable, using sklearn: {e}")
+    bundle = GestureModels(model, scaler, predictor, version,
+                           datetime.datetime.now().isoformat(timespec='seconds'), signature,
+                           feature_version, rejector)
+    _smoke_test(bundle)
+    return bundle
+
+
+def _load_bundle(path, version, signature, cascade):
+    """Memory-mapped ``.gmb`` bundle: the predictor serves as model and scaler"""
+    predictor, meta = read_bundle(path)
+    feature_version = int(meta.get('feature_version', 1))
+    n_features = int(meta.get('feature_dim') or feature_dim(feature_version))
+    rejector = NoneRejector.from_metadata(meta, n_features) if cascade else None
+    bundle = GestureModels(predictor, predictor, predictor, version,
+                           datetime.datetime.now().isoformat(timespec='seconds'), signature,
+                           feature_version, rejector, n_features)
+    _smoke_test(bundle)
+    return bundle
+
+
+def _smoke_test(bundle):
+    """One prediction on a neutral row; also warms the predictor before it serves traffic"""
+    row = np.zeros((1, bundle.n_features), dtype=np.float32)
+    scaled = bundle.inference_scaler.transform(row)
+    model = bundle.inference_model
+    if hasattr(model, 'predict_proba'):
+        probabilities = np.asarray(model.predict_proba(scaled))
+        if probabilities.shape != (1, len(bundle.classes)) or not np.all(np.isfinite(probabilities)):
+            raise ValueError(f"smoke prediction returned bad probabilities {probabilities.shape}")
+        if bundle.rejector is not None and not np.all(np.isfinite(bundle.rejector.gesture_scores(scaled))):
+            raise ValueError("smoke rejector score is not finite")
+    else:
+        model.predict(scaled)
+
+
+class ModelStore:
+    """Holds the active ``GestureModels`` and hot-reloads it when the artifacts change"""
+
+    def __init__(self, model_path, scaler_path, fast_path=True, poll_interval=2.0, on_swap=None,
+                 warmup=None, cascade=True):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.fast_path = fast_path
+        self.cascade = cascade
+        self.poll_interval = float(poll_interval)
+        self.on_swap = on_swap
+        self.warmup = warmup  # warmup(bundle) runs before a new bundle is swapped in
+        self.current = None
+        self.last_error = None
+        self.reloads = 0
+        self.failures = 0
+        self._pending = None  # signature seen once, loaded if unchanged on the next poll
+        self._failed = None  # signature that already failed to load
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def load(self):
+        """Synchronous (re)load; returns True when a new bundle was swapped in"""
+        with self._reload_lock:
+            try:
+                bundle = load_models(self.model_path, self.scaler_path, self.fast_path, self.cascade)
+                if self.warmup is not None:
+                    self.warmup(bundle)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                try:
+                    self._failed = _file_signature(*_artifact_paths(self.model_path, self.scaler_path))
+                except OSError:
+                    self._failed = None
+                raise
+            previous = self.current
+            if previous is not None and previous.version == bundle.version:
+                # Touched but identical content: keep the warm bundle, remember the new mtime
+                previous.signature = bundle.signature
+                return False
+            self.current = bundle
+            self.last_error = None
+            if previous is not None:
+                self.reloads += 1
+            if self.on_swap is not None:
+                self.on_swap(bundle, previous)
+            return True
+
+    def check(self):
+        """One poll: reload once a changed signature has been stable for an interval"""
+        try:
+            signature = _file_signature(*_artifact_paths(self.model_path, self.scaler_path))
+        except OSError:
+            return False
+        active = self.current.signature if self.current is not None else None
+        if signature == active or signature == self._failed:
+            self._pending = None
+            return False
+        if signature != self._pending:
+            self._pending = signature  # still being written, maybe; look again next poll
+            return False
+        self._pending = None
+        try:
+            swapped = self.load()
+        except Exception as e:
+            print(f"❌ Gesture model reload failed, keeping version "
+                  f"{self.current.version if self.current else None}: {e}")
+            return False
+        if swapped:
+            print(f"🔄 Gesture models reloaded: version {self.current.version}")
+        return swapped
+
+    def start(self):
+        if self._thread is not None or self.poll_interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="gesture-model-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        info = self.current.info() if self.current is not None else {"version": None, "loaded_at": None}
+        info.update({
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "watching": self._thread is not None,
+        })
+        return info
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Warning: gesture model watcher error: {e}")
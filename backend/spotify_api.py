@@ -0,0 +1,410 @@
+"""Control plane: Spotify OAuth, playback control and DJ sessions.
+
+Registered by ``app.py`` when the backend role includes control. Nothing
+here touches the gesture stack, so control-only replicas start quickly.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import spotipy
+from flask import Blueprint, request, jsonify, redirect
+from spotipy.oauth2 import SpotifyOAuth
+
+try:
+    from config import Config
+except ImportError:
+    class Config:
+        DJ_DEFAULT_BATCH_SIZE = 150
+        DJ_STRICT_PRIMARY = True
+
+spotify_bp = Blueprint('spotify', __name__)
+
+# DJ session generator from the Models package
+try:
+    sys.path.append('../Models/Models')
+    from artists_gig_backfriend import run_once as dj_run_once
+    print("✅ DJ module imported successfully")
+except ImportError as e:
+    print(f"Warning: DJ module not available: {e}")
+    dj_run_once = None
+
+@spotify_bp.route('/api/spotify/dj/start', methods=['POST'])
+def start_dj_session():
+    """Start a DJ session with the specified parameters"""
+    if not dj_run_once:
+        return jsonify({"error": "DJ functionality not available"}), 503
+    
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"error": "No data provided"}), 400
+            
+        mode = data.get('mode', 'random')
+        genre = data.get('genre', 'Remix')
+        artists = data.get('artists', [])
+        batch_size = data.get('batch_size', getattr(Config, 'DJ_DEFAULT_BATCH_SIZE', 150))
+        strict_primary = data.get('strict_primary', getattr(Config, 'DJ_STRICT_PRIMARY', True))
+        
+        # Validate inputs
+        if mode not in ['random', 'artist']:
+            return jsonify({"error": "Invalid mode. Must be 'random' or 'artist'"}), 400
+            
+        if genre not in ['Remix', 'LOFI', 'Mashup']:
+            return jsonify({"error": "Invalid genre. Must be 'Remix', 'LOFI', or 'Mashup'"}), 400
+            
+        if mode == 'artist' and not artists:
+            return jsonify({"error": "Artists list required for artist mode"}), 400
+        
+        # Call the DJ function
+        result = dj_run_once(
+            mode=mode,
+            genre=genre,
+            artists=artists,
+            batch_size=batch_size,
+            strict_primary=strict_primary
+        )
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        print(f"DJ session error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+# ===== Spotify OAuth (server-managed) =====
+
+def _spotify_oauth():
+    client_id = getattr(Config, 'SPOTIPY_CLIENT_ID', None)
+    client_secret = getattr(Config, 'SPOTIPY_CLIENT_SECRET', None)
+    redirect_uri = getattr(Config, 'SPOTIPY_REDIRECT_URI', 'http://localhost:5000/callback')
+    scopes = os.environ.get(
+        'SPOTIFY_SCOPES',
+        'user-modify-playback-state user-read-playback-state user-read-currently-playing user-library-modify'
+    )
+    cache_path = os.environ.get('SPOTIFY_CACHE_PATH', '.cache-dj-session')
+    if not client_id or not client_secret:
+        # Return a minimal auth manager which will error on use; endpoints will surface error
+        print("⚠️ Spotify credentials not configured")
+    return SpotifyOAuth(
+        client_id=client_id,
+        client_secret=client_secret,
+        redirect_uri=redirect_uri,
+        scope=scopes,
+        cache_path=cache_path,
+        open_browser=False,
+    )
+
+@spotify_bp.get('/api/spotify/status')
+def spotify_status():
+    try:
+        oauth = _spotify_oauth()
+        token_info = oauth.get_cached_token()
+        is_authed = bool(token_info)
+        status = {"authenticated": is_authed}
+        if is_authed:
+            sp = spotipy.Spotify(auth=token_info['access_token'])
+            try:
+                me = sp.current_user()
+                status["user"] = {"id": me.get('id'), "name": me.get('display_name') or me.get('id')}
+                devices = sp.devices().get('devices', [])
+                status["devices"] = [{"id": d.get('id'), "name": d.get('name'), "is_active": d.get('is_active')} for d in devices]
+            except Exception:
+                pass
+        return jsonify(status)
+    except Exception as e:
+        return jsonify({"authenticated": False, "error": str(e)}), 500
+
+@spotify_bp.get('/api/spotify/login')
+def spotify_login():
+    try:
+        oauth = _spotify_oauth()
+        auth_url = oauth.get_authorize_url()
+        return jsonify({"auth_url": auth_url})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@spotify_bp.get('/callback')
+def spotify_callback():
+    try:
+        oauth = _spotify_oauth()
+        if not oauth:
+            return jsonify({"error": "Spotify OAuth not configured"}), 500
+            
+        code = request.args.get('code')
+        state = request.args.get('state')
+        if not code:
+            return jsonify({"error": "Missing authorization code"}), 400
+            
+        token_info = oauth.get_access_token(code)
+        # Persisted via cache_path; redirect back to frontend with success
+        frontend_url = getattr(Config, 'SPOTIPY_REDIRECT_URI', 'http://127.0.0.1:5500/frontend/profile.html')
+        return redirect(f"{frontend_url}?auth=success&expires_in={token_info.get('expires_in', 0)}")
+    except Exception as e:
+        print(f"Spotify callback error: {e}")
+        frontend_url = getattr(Config, 'SPOTIPY_REDIRECT_URI', 'http://127.0.0.1:5500/frontend/profile.html')
+        return redirect(f"{frontend_url}?auth=error&message={str(e)}")
+
+@spotify_bp.post('/api/spotify/play')
+def spotify_play_specific():
+    """Play a specific track given a Spotify URI or search query."""
+    try:
+        data = request.get_json(force=True)
+        uri = (data or {}).get('uri')
+        query = (data or {}).get('query')
+        oauth = _spotify_oauth()
+        token = oauth.get_cached_token()
+        if not token:
+            return jsonify({"ok": False, "error": "Not authenticated"}), 401
+        sp = spotipy.Spotify(auth=token['access_token'])
+
+        # resolve device
+        devices = sp.devices().get('devices', [])
+        if not devices:
+            return jsonify({"ok": False, "error": "No active Spotify device"}), 400
+        device_id = None
+        for d in devices:
+            if d.get('is_active'):
+                device_id = d.get('id'); break
+        if not device_id:
+            device_id = devices[0].get('id')
+            try:
+                sp.transfer_playback(device_id=device_id, force_play=True)
+            except Exception:
+                pass
+
+        target_uri = uri
+        if not target_uri and query:
+            res = sp.search(q=query, type='track', limit=1)
+            items = ((res or {}).get('tracks') or {}).get('items') or []
+            if not items:
+                return jsonify({"ok": False, "error": "Track not found"}), 404
+            target_uri = items[0].get('uri')
+
+        if not target_uri:
+            return jsonify({"ok": False, "error": "Provide 'uri' or 'query'"}), 400
+
+        sp.start_playback(device_id=device_id, uris=[target_uri])
+        return jsonify({"ok": True, "played": target_uri})
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+# Gesture label -> /api/spotify/control body, used when the backend acts on gestures itself
+GESTURE_CONTROLS = {
+    # Right hand
+    'play_right':       {"action": "play"},
+    'pause_right':      {"action": "pause"},
+    'next_right':       {"action": "next"},
+    'previous_right':   {"action": "previous"},
+    # Left hand
+    'volume_up_left':   {"action": "volume", "delta": 10},
+    'volume_down_left': {"action": "volume", "delta": -10},
+    'like_left':        {"action": "like"},
+    'skip30_left':      {"action": "seek", "delta": 30000},
+}
+
+# Playback device id, reused for a few seconds instead of calling sp.devices() per action.
+# Only the id is kept: state such as the volume changes outside this process.
+_device_cache = {"device": None, "expires_at": 0.0}
+_device_lock = threading.Lock()
+
+def _playback_device_id(sp):
+    """Id of the active (or first) Spotify device, or None when the account has none"""
+    with _device_lock:
+        if _device_cache["device"] is not None and time.monotonic() < _device_cache["expires_at"]:
+            return _device_cache["device"]
+    devices = sp.devices().get('devices', [])
+    device = next((d for d in devices if d.get('is_active')), devices[0]) if devices else None
+    device_id = device.get('id') if device else None
+    with _device_lock:
+        _device_cache["device"] = device_id
+        _device_cache["expires_at"] = time.monotonic() + getattr(Config, 'SPOTIFY_DEVICE_CACHE_TTL', 10.0)
+    return device_id
+
+def _forget_device():
+    with _device_lock:
+        _device_cache["device"] = None
+
+def perform_control(action, delta=0):
+    """Run one playback action; returns ``(body, status_code)`` as /api/spotify/control answers"""
+    action = (action or '').lower()
+    delta = int(delta or 0)
+    oauth = _spotify_oauth()
+    token = oauth.get_cached_token()
+    if not token:
+        return {"ok": False, "error": "Not authenticated"}, 401
+    sp = spotipy.Spotify(auth=token['access_token'])
+
+    device_id = _playback_device_id(sp)
+    if device_id is None:
+        return {"ok": False, "error": "No active Spotify device"}, 400
+
+    try:
+        if action == 'play':
+            sp.start_playback(device_id=device_id)
+        elif action == 'pause':
+            sp.pause_playback(device_id=device_id)
+        elif action == 'next':
+            sp.next_track(device_id=device_id)
+        elif action == 'previous':
+            sp.previous_track(device_id=device_id)
+        elif action == 'volume':
+            # Read the live volume; it may have been changed from another app since the last action
+            pb = sp.current_playback() or {}
+            cur_v = (pb.get('device') or {}).get('volume_percent')
+            new_v = max(0, min(100, (50 if cur_v is None else cur_v) + delta))
+            sp.volume(new_v, device_id=device_id)
+        elif action == 'seek':
+            pb = sp.current_playback()
+            if not pb or not pb.get('item'):
+                return {"ok": False, "error": "No current playback"}, 400
+            pos = pb.get('progress_ms', 0)
+            dur = pb['item'].get('duration_ms', 0)
+            new_pos = min(max(0, pos + delta), max(0, dur - 1000))
+            sp.seek_track(new_pos, device_id=device_id)
+        elif action == 'like':
+            # Like/save current track
+            pb = sp.current_playback()
+            if not pb or not pb.get('item'):
+                return {"ok": False, "error": "No current playback"}, 400
+            track_id = pb['item'].get('id')
+            if track_id:
+                sp.current_user_saved_tracks_add([track_id])
+            else:
+                return {"ok": False, "error": "No track ID"}, 400
+        else:
+            return {"ok": False, "error": "Unknown action"}, 400
+    except Exception:
+        # The cached device may have gone away; resolve it again next time
+        _forget_device()
+        raise
+
+    return {"ok": True, "action": action}, 200
+
+def dispatch_gesture(gesture):
+    """Perform the control mapped to a committed gesture; None when the gesture has no mapping"""
+    control = GESTURE_CONTROLS.get(gesture)
+    if control is None:
+        return None
+    try:
+        body, status = perform_control(control["action"], control.get("delta", 0))
+    except Exception as e:
+        body, status = {"ok": False, "error": str(e)}, 500
+    return dict(body, status=status, gesture=gesture)
+
+@spotify_bp.post('/api/spotify/control')
+def spotify_control():
+    """Generic control endpoint for playback actions from gestures/UI.
+    Body: { "action": "play|pause|next|previous|volume|seek|like", "delta": 10| -10 | 30000 }
+    """
+    try:
+        data = request.get_json(force=True) or {}
+        body, status = perform_control(data.get('action'), data.get('delta'))
+        return jsonify(body), status
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@spotify_bp.get('/api/spotify/current')
+def spotify_current():
+    """Get currently playing track information with metadata and progress"""
+    try:
+        oauth = _spotify_oauth()
+        token = oauth.get_cached_token()
+        if not token:
+            return jsonify({"ok": False, "error": "Not authenticated"}), 401
+        
+        sp = spotipy.Spotify(auth=token['access_token'])
+        playback = sp.current_playback()
+        
+        if not playback:
+            return jsonify({"ok": True, "playing": False, "message": "No active playback"})
+        
+        track = playback.get('item', {})
+        if not track:
+            return jsonify({"ok": True, "playing": False, "message": "No track information"})
+        
+        # Extract track information
+        track_info = {
+            "id": track.get('id'),
+            "name": track.get('name'),
+            "artists": [artist.get('name') for artist in track.get('artists', [])],
+            "album": track.get('album', {}).get('name'),
+            "duration_ms": track.get('duration_ms'),
+            "external_urls": track.get('external_urls', {}),
+            "preview_url": track.get('preview_url')
+        }
+        
+        # Extract album art
+        images = track.get('album', {}).get('images', [])
+        if images:
+            track_info['album_art'] = images[0].get('url')  # Get largest image
+        
+        # Extract playback state
+        playback_info = {
+            "is_playing": playback.get('is_playing', False),
+            "progress_ms": playback.get('progress_ms', 0),
+            "volume_percent": playback.get('device', {}).get('volume_percent', 0),
+            "shuffle_state": playback.get('shuffle_state', False),
+            "repeat_state": playback.get('repeat_state', 'off'),
+            "device": {
+                "id": playback.get('device', {}).get('id'),
+                "name": playback.get('device', {}).get('name'),
+                "type": playback.get('device', {}).get('type'),
+                "is_active": playback.get('device', {}).get('is_active', False)
+            }
+        }
+        
+        return jsonify({
+            "ok": True,
+            "playing": True,
+            "track": track_info,
+            "playback": playback_info
+        })
+        
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@spotify_bp.get('/api/spotify/devices')
+def spotify_devices():
+    """Get available Spotify devices"""
+    try:
+        oauth = _spotify_oauth()
+        token = oauth.get_cached_token()
+        if not token:
+            return jsonify({"ok": False, "error": "Not authenticated"}), 401
+        
+        sp = spotipy.Spotify(auth=token['access_token'])
+        devices = sp.devices().get('devices', [])
+        
+        return jsonify({
+            "ok": True,
+            "devices": devices
+        })
+        
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
+
+@spotify_bp.post('/api/spotify/transfer')
+def spotify_transfer():
+    """Transfer playback to a specific device"""
+    try:
+        data = request.get_json(force=True) or {}
+        device_id = data.get('device_id')
+        
+        if not device_id:
+            return jsonify({"ok": False, "error": "Device ID required"}), 400
+        
+        oauth = _spotify_oauth()
+        token = oauth.get_cached_token()
+        if not token:
+            return jsonify({"ok": False, "error": "Not authenticated"}), 401
+        
+        sp = spotipy.Spotify(auth=token['access_token'])
+        sp.transfer_playback(device_id=device_id, force_play=True)
+        _forget_device()
+        
+        return jsonify({"ok": True, "device_id": device_id})
+        
+    except Exception as e:
+        return jsonify({"ok": False, "error": str(e)}), 500
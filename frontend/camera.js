@@ -9,10 +9,19 @@ const placeholder = document.getElementById('placeholder');
 let stream = null;
 let isGestureRecognitionActive = false;
 let gestureRecognitionInterval = null;
+let gestureSocket = null;
 
 // Backend API configuration
 const BACKEND_URL = 'http://127.0.0.1:3000';
 const CONTROL_ENDPOINT = `${BACKEND_URL}/api/spotify/control`;
+// Predict-and-act endpoints: the backend performs committed gestures' controls itself
+const GESTURE_ACT_ENDPOINT = `${BACKEND_URL}/api/gesture/act`;
+const GESTURE_STREAM_URL = `${BACKEND_URL.replace(/^http/, 'ws')}/ws/gesture?act=1`;
+const MAX_FRAME_SIDE = 640;
+// Used until the backend sends a `next_frame_in_ms` hint (it backs off when no hand is in view)
+const DEFAULT_FRAME_INTERVAL_MS = 500;
+// Lets the backend keep a dedicated hand tracker for this page
+const GESTURE_CLIENT_ID = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `cam-${Date.now()}-${Math.random().toString(36).slice(2)}`;
 
 async function startCamera() {
   try {
@@ -70,30 +79,38 @@ function drawOverlay() {
 }
 
 // Gesture recognition functions
+async function captureFrameBlob() {
+  // Capture frame from video, capped to MAX_FRAME_SIDE (the backend caps it anyway)
+  const scale = Math.min(1, MAX_FRAME_SIDE / Math.max(video.videoWidth, video.videoHeight));
+  const canvas = document.createElement('canvas');
+  canvas.width = Math.round(video.videoWidth * scale);
+  canvas.height = Math.round(video.videoHeight * scale);
+  const ctx = canvas.getContext('2d');
+  ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
+  
+  // Encode as JPEG; the raw bytes are uploaded (no base64/JSON wrapping)
+  return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+}
+
+// Returns the backend's suggested delay before the next frame
 async function predictGesture() {
-  if (!video.srcObject) return;
+  if (!video.srcObject) return DEFAULT_FRAME_INTERVAL_MS;
   
   try {
     console.log('🔄 Predicting gesture...'); // Debug log
     
-    // Capture frame from video
-    const canvas = document.createElement('canvas');
-    canvas.width = video.videoWidth;
-    canvas.height = video.videoHeight;
-    const ctx = canvas.getContext('2d');
-    ctx.drawImage(video, 0, 0);
-    
-    // Convert to base64
-    const imageData = canvas.toDataURL('image/jpeg', 0.8);
-    console.log('📸 Frame captured, size:', imageData.length); // Debug log
+    const frameBlob = await captureFrameBlob();
+    if (!frameBlob) return DEFAULT_FRAME_INTERVAL_MS;
+    console.log('📸 Frame captured, size:', frameBlob.size); // Debug log
     
     // Send to backend
-    const response = await fetch(`${BACKEND_URL}/api/gesture/predict`, {
+    const response = await fetch(GESTURE_ACT_ENDPOINT, {
       method: 'POST',
       headers: {
-        'Content-Type': 'application/json',
+        'Content-Type': 'image/jpeg',
+        'X-Client-Id': GESTURE_CLIENT_ID,
       },
-      body: JSON.stringify({ image: imageData })
+      body: frameBlob
     });
     
     console.log('📡 Backend response status:', response.status); // Debug log
@@ -104,6 +121,7 @@ async function predictGesture() {
       updateGestureDisplay(result);
       // Try triggering playback control for supported gestures
       maybeTriggerSpotifyControl(result);
+      return result.next_frame_in_ms ?? DEFAULT_FRAME_INTERVAL_MS;
     } else {
       console.error('❌ Backend error:', response.status, response.statusText);
       const errorText = await response.text();
@@ -112,6 +130,7 @@ async function predictGesture() {
   } catch (error) {
     console.error('❌ Gesture prediction error:', error);
   }
+  return DEFAULT_FRAME_INTERVAL_MS;
 }
 
 // Map gesture -> control action
@@ -127,17 +146,14 @@ const GESTURE_TO_ACTION = {
   'skip30_left':      { action: 'seek',   delta: +30000 },
 };
 
-let lastActionAt = 0;
-const ACTION_COOLDOWN_MS = 1000;
-
+// The backend smooths predictions per client and sets `action` only once a
+// gesture is stable and out of cooldown, so every action is sent as-is
 async function maybeTriggerSpotifyControl(pred) {
   try {
-    if (!pred || pred.gesture === 'none') return;
-    const mapping = GESTURE_TO_ACTION[pred.gesture];
+    // A `control` field means the backend already performed the action
+    if (!pred || !pred.action || 'control' in pred) return;
+    const mapping = GESTURE_TO_ACTION[pred.action];
     if (!mapping) return;
-    const now = Date.now();
-    if (now - lastActionAt < ACTION_COOLDOWN_MS) return;
-    lastActionAt = now;
     await fetch(CONTROL_ENDPOINT, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
@@ -187,16 +203,80 @@ function updateGestureDisplay(result) {
   }
 }
 
-function startGestureRecognition() {
+// Streaming mode: push a frame, wait for its prediction, push the next one
+// after the server's `next_frame_in_ms` hint, so there is never more than one frame in flight.
+async function sendStreamFrame() {
+  if (!gestureSocket || gestureSocket.readyState !== WebSocket.OPEN || !video.srcObject) return;
+  const frameBlob = await captureFrameBlob();
+  if (frameBlob && gestureSocket && gestureSocket.readyState === WebSocket.OPEN) {
+    gestureSocket.send(frameBlob);
+  }
+}
+
+function startGestureStream() {
+  const socket = new WebSocket(GESTURE_STREAM_URL);
+  gestureSocket = socket;
+  let opened = false;
+  
+  socket.onopen = () => {
+    opened = true;
+    console.log('Gesture stream connected');
+    sendStreamFrame();
+  };
+  socket.onmessage = (event) => {
+    const result = JSON.parse(event.data);
+    if (result.error) {
+      console.error('❌ Gesture stream error:', result.error);
+    } else {
+      updateGestureDisplay(result);
+      maybeTriggerSpotifyControl(result);
+    }
+    setTimeout(() => requestAnimationFrame(sendStreamFrame), result.next_frame_in_ms ?? 0);
+  };
+  socket.onclose = () => {
+    if (gestureSocket !== socket) return;
+    gestureSocket = null;
+    // Backend without streaming support (or connection lost): fall back to polling
+    if (isGestureRecognitionActive && stream) {
+      console.warn(opened ? 'Gesture stream closed, falling back to polling' : 'Gesture stream unavailable, using polling');
+      startGesturePolling();
+    }
+  };
+}
+
+function startGesturePolling() {
   if (gestureRecognitionInterval) return;
+  // One request at a time, each scheduled after the previous one's hint
+  let timer;
+  const poll = async () => {
+    const delay = await predictGesture();
+    // Stopped (or restarted) while the request was in flight
+    if (gestureRecognitionInterval !== timer) return;
+    timer = gestureRecognitionInterval = setTimeout(poll, delay);
+  };
+  timer = gestureRecognitionInterval = setTimeout(poll, 0);
+}
+
+function startGestureRecognition() {
+  if (gestureRecognitionInterval || gestureSocket) return;
   
-  gestureRecognitionInterval = setInterval(predictGesture, 500); // Predict every 500ms
+  if ('WebSocket' in window) {
+    startGestureStream();
+  } else {
+    startGesturePolling();
+  }
   console.log('Gesture recognition started');
 }
 
 function stopGestureRecognition() {
+  if (gestureSocket) {
+    const socket = gestureSocket;
+    gestureSocket = null;
+    socket.close();
+    console.log('Gesture recognition stopped');
+  }
   if (gestureRecognitionInterval) {
-    clearInterval(gestureRecognitionInterval);
+    clearTimeout(gestureRecognitionInterval);
     gestureRecognitionInterval = null;
     console.log('Gesture recognition stopped');
   }
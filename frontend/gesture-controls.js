@@ -409,6 +409,8 @@ class CameraGestureRecognizer {
         this.threshold = options.threshold;
         this.onGesture = options.onGesture;
         this.isProcessing = false;
+        // Lets the backend keep a tracker and smoothing state for this camera
+        this.clientId = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `cam-${Date.now()}-${Math.random().toString(36).slice(2)}`;
         
         this.init();
     }
@@ -430,6 +432,7 @@ class CameraGestureRecognizer {
     async processFrame() {
         if (!this.isProcessing) return;
         
+        let delay = 0;
         try {
             // Capture frame from video
             const canvas = document.createElement('canvas');
@@ -445,23 +448,26 @@ class CameraGestureRecognizer {
             const response = await fetch(`${this.backendUrl}/api/gesture/predict`, {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'X-Client-Id': this.clientId
                 },
                 body: JSON.stringify({ image: imageData })
             });
             
             const result = await response.json();
             
-            if (result.gesture && result.gesture !== 'none' && result.confidence >= this.threshold) {
-                this.onGesture(result.gesture);
+            // `action` is set by the backend once the gesture is stable and out of cooldown
+            if (result.action && result.confidence >= this.threshold) {
+                this.onGesture(result.action);
             }
+            delay = result.next_frame_in_ms ?? 0;
         } catch (error) {
             console.error('Camera gesture recognition error:', error);
         }
         
-        // Continue processing
+        // Continue processing after the backend's hint (it backs off while no hand is in view)
         if (this.isProcessing) {
-            requestAnimationFrame(() => this.processFrame());
+            setTimeout(() => requestAnimationFrame(() => this.processFrame()), delay);
         }
     }
     
@@ -19,6 +19,8 @@ class UnifiedGestureController {
         this.lastGestureTime = 0;
         this.hammer = null;
         this.cameraStream = null;
+        // Lets the backend keep a tracker and smoothing state for this controller's camera
+        this.gestureClientId = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : `cam-${Date.now()}-${Math.random().toString(36).slice(2)}`;
         this.gestureRecognitionInterval = null;
         
         // Your exact gesture mappings from maintesting_spotify.py
@@ -184,15 +186,21 @@ class UnifiedGestureController {
     startCameraGestureRecognition(video) {
         if (this.gestureRecognitionInterval) return;
         
-        this.gestureRecognitionInterval = setInterval(async () => {
-            await this.predictCameraGesture(video);
-        }, 500); // Predict every 500ms
+        // Each frame is scheduled after the backend's `next_frame_in_ms` hint for the previous one
+        let timer;
+        const poll = async () => {
+            const delay = await this.predictCameraGesture(video);
+            if (this.gestureRecognitionInterval !== timer) return;
+            timer = this.gestureRecognitionInterval = setTimeout(poll, delay);
+        };
+        timer = this.gestureRecognitionInterval = setTimeout(poll, 0);
         
         console.log('📹 Camera gesture recognition started');
     }
     
+    // Returns the delay before the next frame (500 ms when the backend sends no hint)
     async predictCameraGesture(video) {
-        if (!video.srcObject) return;
+        if (!video.srcObject) return 500;
         
         try {
             // Capture frame from video
@@ -209,7 +217,8 @@ class UnifiedGestureController {
             const response = await fetch(`${this.options.backendUrl}/api/gesture/predict`, {
                 method: 'POST',
                 headers: {
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'X-Client-Id': this.gestureClientId
                 },
                 body: JSON.stringify({ image: imageData })
             });
@@ -217,14 +226,17 @@ class UnifiedGestureController {
             if (response.ok) {
                 const result = await response.json();
                 
-                if (result.gesture && result.gesture !== 'none' && result.confidence >= this.options.gestureThreshold) {
-                    console.log('📹 Camera gesture detected:', result.gesture, result.confidence);
-                    this.handleGesture(result.gesture);
+                // `action` is set by the backend once the gesture is stable and out of cooldown
+                if (result.action && result.confidence >= this.options.gestureThreshold) {
+                    console.log('📹 Camera gesture detected:', result.action, result.confidence);
+                    this.handleGesture(result.action);
                 }
+                return result.next_frame_in_ms ?? 500;
             }
         } catch (error) {
             console.error('Camera gesture recognition error:', error);
         }
+        return 500;
     }
     
     async handleGesture(gesture) {
@@ -454,7 +466,8 @@ class UnifiedGestureController {
             this.cameraStream.getTracks().forEach(track => track.stop());
         }
         if (this.gestureRecognitionInterval) {
-            clearInterval(this.gestureRecognitionInterval);
+            clearTimeout(this.gestureRecognitionInterval);
+            this.gestureRecognitionInterval = null;
         }
     }
 }
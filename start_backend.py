@@ -4,6 +4,7 @@ Smart Music Backend Startup Script
 This script sets up and runs the Flask backend server
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
@@ -11,19 +12,29 @@ import time
 from pathlib import Path
 from dotenv import load_dotenv
 
-def check_dependencies():
-    """Check if required Python packages are installed"""
-    required_packages = [
-        'flask', 'flask-cors', 'opencv-python', 'mediapipe', 
-        'numpy', 'Pillow', 'joblib', 'spotipy', 'requests', 'scikit-learn'
-    ]
+# pip package -> importable module, per backend subsystem
+CORE_PACKAGES = [('flask', 'flask'), ('flask-cors', 'flask_cors'), ('python-dotenv', 'dotenv')]
+GESTURE_PACKAGES = [('opencv-python', 'cv2'), ('mediapipe', 'mediapipe'), ('numpy', 'numpy'),
+                    ('joblib', 'joblib'), ('scikit-learn', 'sklearn')]
+CONTROL_PACKAGES = [('spotipy', 'spotipy'), ('requests', 'requests')]
+
+def check_dependencies(role=None):
+    """Check if the packages needed for BACKEND_ROLE are installed.
+
+    Uses ``find_spec`` so nothing is actually imported here; the server
+    process imports what it needs itself.
+    """
+    role = role or os.environ.get('BACKEND_ROLE', 'all')
+    required_packages = list(CORE_PACKAGES)
+    if role in ('all', 'gesture-only'):
+        required_packages += GESTURE_PACKAGES
+    if role in ('all', 'control-only'):
+        required_packages += CONTROL_PACKAGES
     
     missing_packages = []
     
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
+    for package, module in required_packages:
+        if importlib.util.find_spec(module) is None:
             missing_packages.append(package)
     
     return missing_packages
@@ -40,9 +51,24 @@ def install_dependencies():
         return False
 
 def check_models():
-    """Check if gesture models exist"""
-    model_path = "Gesture final/gesture_model.pkl"
-    scaler_path = "Gesture final/scaler.pkl"
+    """Check if the gesture model files configured for the backend exist"""
+    sys.path.insert(0, 'backend')
+    try:
+        from config import Config
+    finally:
+        sys.path.pop(0)
+    # Config paths are relative to backend/, where the server runs
+    model_path = os.path.normpath(os.path.join('backend', Config.GESTURE_MODEL_PATH))
+    scaler_path = os.path.normpath(os.path.join('backend', Config.GESTURE_SCALER_PATH))
+    
+    if model_path.endswith('.gmb'):
+        if not os.path.exists(model_path):
+            print(f"❌ Gesture model bundle not found: {model_path}")
+            return False
+        print(f"✅ Gesture model bundle found: {model_path}")
+        if not Config.GESTURE_FAST_PATH:
+            print("⚠️  GESTURE_FAST_PATH=0 has no effect on a .gmb bundle (it only holds the compiled predictor)")
+        return True
     
     if not os.path.exists(model_path):
         print(f"❌ Gesture model not found: {model_path}")
@@ -121,8 +147,8 @@ def main():
             print("❌ Cannot continue without required dependencies")
             return
     
-    # Check models
-    if not check_models():
+    # Check models (not needed on control-only nodes)
+    if os.environ.get('BACKEND_ROLE', 'all') != 'control-only' and not check_models():
         print("⚠️  Gesture recognition will not work without models")
         print("   You can still use the DJ functionality")
     
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Request-level tests for the gesture API, run with pytest from the project root.
+
+A small handedness-routed model with a none rejector is trained on
+Gesture final/testing1.json and served through the real Flask routes.
+"""
+
+import json
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(ROOT, 'backend'))
+sys.path.append(os.path.join(ROOT, 'Gesture final'))
+
+DATASET_JSON = os.path.join(ROOT, 'Gesture final', 'testing1.json')
+
+gesture_api = pytest.importorskip('gesture_api')
+from flask import Flask
+from frame_gate import FrameChangeGate
+from frame_pacing import FramePacer
+from gesture_routing import HandRoutedModel
+from gesture_smoothing import GestureSmoother
+from inference_workers import InferenceWorkerPool
+from model_store import ModelStore
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    if not os.path.exists(DATASET_JSON):
+        pytest.skip(f"{DATASET_JSON} not found")
+    from gesture_dataset import load_dataset
+    return load_dataset(DATASET_JSON)
+
+
+@pytest.fixture(scope='module')
+def store(dataset, tmp_path_factory):
+    """ModelStore serving per-side forests and a logistic none rejector, as the trainer writes them"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.preprocessing import StandardScaler
+
+    X, y, sides = np.asarray(dataset.X, dtype=np.float64), dataset.y, dataset.sides()
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    model = {}
+    for side in ('left', 'right'):
+        rows = (sides == side) | (sides == '')
+        model[side] = RandomForestClassifier(n_estimators=20, random_state=0).fit(X_scaled[rows], y[rows])
+    rejector = LogisticRegression(max_iter=2000).fit(X_scaled, y != 'none')
+
+    out = tmp_path_factory.mktemp('model')
+    model_path, scaler_path = str(out / 'gesture_model.pkl'), str(out / 'scaler.pkl')
+    joblib.dump(model, model_path)
+    joblib.dump(scaler, scaler_path)
+    with open(out / 'gesture_model.meta.json', 'w') as f:
+        json.dump({"feature_version": 1, "rejector": {
+            "coef": rejector.coef_[0].tolist(), "intercept": float(rejector.intercept_[0]),
+            "threshold": 0.5, "none_label": "none"}}, f)
+    store = ModelStore(model_path, scaler_path)
+    store.load()
+    return store
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(gesture_api, 'model_store', store)
+    app = Flask(__name__)
+    gesture_api.init_app(app)
+    return app.test_client()
+
+
+@pytest.fixture(scope='module')
+def samples(dataset, store):
+    """label -> 21 [x, y] points of a recorded sample the served model is sure about.
+
+    The points reproduce the sample's v1 features exactly; some recorded rows
+    sit between two classes, so the most confidently classified one is used.
+    """
+    models = store.current
+    sides = [side or None for side in dataset.sides().tolist()]
+    probabilities = models.inference_model.predict_proba(
+        models.inference_scaler.transform(dataset.X), sides)
+    own = probabilities[np.arange(len(dataset)), np.searchsorted(models.inference_model.classes_, dataset.y)]
+    picked = {}
+    for label in np.unique(dataset.y):
+        rows = np.flatnonzero(dataset.y == label)
+        row = rows[np.argmax(own[rows])]
+        picked[str(label)] = (0.5 + np.asarray(dataset.X[row], dtype=np.float64).reshape(21, 2)).tolist()
+    return picked
+
+
+# ===== /api/gesture/predict_landmarks =====
+
+def test_landmarks_prediction_matches_recorded_label(client, samples):
+    body = {"hands": [{"landmarks": samples['play_right'], "hand": "right"}]}
+    response = client.post('/api/gesture/predict_landmarks', json=body)
+    assert response.status_code == 200
+    assert response.get_json()["gesture"] == "play_right"
+
+
+@pytest.mark.parametrize('body', [
+    {"landmarks": {"a": 1}},
+    {"landmarks": "0.1,0.2"},
+    {"landmarks": [[None, 1.0]] * 21},
+    {"landmarks": [[float('nan'), 0.5]] * 21},
+    {"landmarks": [{"x": 0.1, "y": 0.2}, [0.1, 0.2]] + [[0.3, 0.4]] * 19},
+    {"hands": ["left"]},
+])
+def test_landmarks_rejects_malformed_points(client, body):
+    response = client.post('/api/gesture/predict_landmarks', json=body)
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Invalid landmarks")
+
+
+# ===== /api/gesture/act =====
+
+def test_act_rejects_non_object_json(client):
+    for body in ([1, 2], "frame", 3):
+        response = client.post('/api/gesture/act', json=body)
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "JSON body must be an object"}
+
+
+def test_act_dispatches_committed_gesture_once(client, samples, monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(gesture_api, '_control_dispatch',
+                        lambda gesture: dispatched.append(gesture) or {"ok": True, "gesture": gesture})
+    body = {"hands": [{"landmarks": samples['play_right'], "hand": "right"}]}
+    headers = {"X-Client-Id": "test-act"}
+    stable_frames = gesture_api.gesture_smoother.stable_frames
+
+    payloads = [client.post('/api/gesture/act', json=body, headers=headers).get_json()
+                for _ in range(stable_frames + 1)]
+
+    assert all(p["gesture"] == "play_right" for p in payloads)
+    assert [p["action"] for p in payloads[:stable_frames - 1]] == [None] * (stable_frames - 1)
+    assert payloads[stable_frames - 1]["action"] == "play_right"
+    assert payloads[stable_frames - 1]["control"] == {"ok": True, "gesture": "play_right"}
+    # Still held inside the cooldown: stable, but nothing is performed again
+    assert payloads[-1]["stable_gesture"] == "play_right" and payloads[-1]["action"] is None
+    assert dispatched == ["play_right"]
+
+
+def test_act_reports_invalid_landmarks(client):
+    response = client.post('/api/gesture/act', json={"landmarks": [[0.1, 0.2]] * 5})
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Invalid landmarks")
+
+
+def test_predict_rejects_non_object_json(client):
+    response = client.post('/api/gesture/predict', json=["data:image/jpeg;base64,"])
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid image data: JSON body must be an object"}
+
+
+class _FakeSpotify:
+    """Spotify client whose playback volume can be changed behind the backend's back"""
+
+    def __init__(self, state):
+        self.state = state
+
+    def devices(self):
+        self.state["device_lists"] += 1
+        return {"devices": [{"id": "speaker", "is_active": True, "volume_percent": 0}]}
+
+    def current_playback(self):
+        return {"device": {"id": "speaker", "volume_percent": self.state["volume"]}}
+
+    def volume(self, volume_percent, device_id=None):
+        assert device_id == "speaker"
+        self.state["volume"] = volume_percent
+
+
+def test_volume_control_steps_from_the_live_volume(monkeypatch):
+    spotify_api = pytest.importorskip('spotify_api')
+    state = {"volume": 40, "device_lists": 0}
+    monkeypatch.setattr(spotify_api, '_spotify_oauth',
+                        lambda: type('OAuth', (), {'get_cached_token': lambda self: {"access_token": "t"}})())
+    monkeypatch.setattr(spotify_api.spotipy, 'Spotify', lambda auth: _FakeSpotify(state))
+    spotify_api._forget_device()
+
+    assert spotify_api.perform_control('volume', 10) == ({"ok": True, "action": "volume"}, 200)
+    assert state["volume"] == 50
+    # Changed in another app while the device id is still cached
+    state["volume"] = 20
+    spotify_api.perform_control('volume', -10)
+    assert state["volume"] == 10
+    assert state["device_lists"] == 1
+
+
+
+# ===== /api/gesture/predict_batch =====
+
+def test_batch_reports_errors_per_item(client, samples):
+    items = [
+        {"id": "short", "landmarks": [[0.1, 0.2]] * 5},
+        {"id": "empty"},
+        {"id": "bad-image", "image": "data:image/jpeg;base64,bm90IGFuIGltYWdl"},
+        {"id": "good", "landmarks": samples['play_right'], "hand": "right"},
+    ]
+    response = client.post('/api/gesture/predict_batch', json={"items": items})
+    assert response.status_code == 200
+    results = {r["id"]: r for r in response.get_json()["results"]}
+    assert "error" in results["short"] and "error" in results["bad-image"]
+    assert results["empty"]["error"] == "item needs 'landmarks' or 'image'"
+    assert results["good"]["gesture"] == "play_right"
+
+
+def test_batch_rejects_non_object_json(client):
+    response = client.post('/api/gesture/predict_batch', json=[{"landmarks": []}])
+    assert response.status_code == 400
+
+
+def test_batch_records_cascade_counters(client, samples):
+    gesture_api.cascade_stats.reset()
+    items = [{"landmarks": samples[label]} for label in ('none', 'play_right', 'like_left')]
+    response = client.post('/api/gesture/predict_batch', json={"items": items})
+    assert response.status_code == 200
+    stats = gesture_api.cascade_stats.stats()
+    assert stats["rows"] == len(items)
+    assert stats["stage1_rejected"] + stats["stage2_rows"] == len(items)
+    # Recorded gestures are well above the rejector's cut-off, so both reach the ensemble
+    assert stats["stage2_rows"] >= 2
+
+
+def test_warm_up_rows_are_not_counted(store):
+    gesture_api.cascade_stats.reset()
+    gesture_api._warm_models(store.current)
+    assert gesture_api.cascade_stats.stats()["rows"] == 0
+
+
+# ===== Inference workers =====
+
+def test_dead_worker_is_replaced_and_gives_its_slots_back(tmp_path):
+    # Missing model files make every worker exit right after it starts
+    pool = InferenceWorkerPool(1, str(tmp_path / 'missing.pkl'), str(tmp_path / 'missing_scaler.pkl'), {},
+                               slots_per_worker=2, max_frame_bytes=64 * 64 * 3)
+    try:
+        pool._processes[0].join(60)
+        frame = np.zeros((64, 64, 3), dtype=np.uint8)
+        with pytest.raises((TimeoutError, RuntimeError)):
+            pool.predict(frame, "c", timeout=0.2)
+        assert pool.respawned == 1
+        # The replacement dies too; its unanswered job is failed and the slot freed
+        pool._processes[0].join(60)
+        pool._replace_if_dead(0)
+        assert pool.respawned == 2
+        assert pool.stats()["pending"] == 0 and pool.stats()["free_slots"] == 2
+    finally:
+        pool.close()
+
+
+# ===== Handedness routing =====
+
+def test_batch_routes_unknown_side_like_no_side(client, samples):
+    landmarks = samples['like_left']
+    items = [{"id": "none", "landmarks": landmarks},
+             {"id": "odd", "landmarks": landmarks, "hand": "up"},
+             {"id": "left", "landmarks": landmarks, "hand": "left"}]
+    results = {r["id"]: r for r in client.post('/api/gesture/predict_batch', json={"items": items})
+               .get_json()["results"]}
+    assert results["none"]["probabilities"] == results["odd"]["probabilities"]
+    assert results["left"]["gesture"] == "like_left"
+
+
+class _FixedModel:
+    def __init__(self, classes, probabilities):
+        self.classes_ = np.asarray(classes)
+        self.probabilities = np.asarray(probabilities, dtype=np.float64)
+
+    def predict_proba(self, X):
+        return np.tile(self.probabilities, (len(X), 1))
+
+
+def test_unknown_side_takes_most_confident_answer_including_none():
+    routed = HandRoutedModel({
+        "left": _FixedModel(["none", "play_left"], [0.9, 0.1]),
+        "right": _FixedModel(["none", "play_right"], [0.4, 0.6]),
+    })
+    X = np.zeros((2, 3))
+    assert routed.predict(X[:1]).tolist() == ["none"]
+    assert routed.predict(X, ["right", "left"]).tolist() == ["play_right", "none"]
+
+
+# ===== Smoothing, frame gate and pacing =====
+
+def test_smoother_commits_after_stable_frames_then_cools_down():
+    smoother = GestureSmoother(stable_frames=3, cooldown=1.0)
+    observed = [smoother.observe("c", "play_right", now=t) for t in (0.0, 0.1, 0.2, 0.3)]
+    assert observed == [("none", None), ("none", None), ("play_right", "play_right"), ("play_right", None)]
+    assert smoother.observe("c", "play_right", now=1.3) == ("play_right", "play_right")
+    assert smoother.observe("c", "none", now=1.4) == ("none", None)
+
+
+def test_smoother_forgets_every_hand_session_of_a_client():
+    smoother = GestureSmoother(stable_frames=2)
+    for key in ("c", "c:left", "c:None", "c:right:2", "cd", "cd:left"):
+        smoother.observe(key, "play_right", now=0.0)
+    smoother.forget("c")
+    # "cd" only shares the prefix text and keeps both of its sessions
+    assert smoother.stats()["clients"] == 2
+
+
+def test_frame_gate_reuses_result_until_part_of_the_frame_changes():
+    gate = FrameChangeGate(threshold=3.0, max_age=60.0)
+    frame = np.full((360, 640, 3), 120, dtype=np.uint8)
+    gate.store("c", gate.signature(frame), {"gesture": "none"})
+    assert gate.lookup("c", gate.signature(frame.copy())) == {"gesture": "none"}
+    # A finger-sized change is well under 1% of the frame but must still miss
+    moved = frame.copy()
+    moved[150:210, 300:320] = 250
+    assert gate.lookup("c", gate.signature(moved)) is None
+    assert FrameChangeGate(threshold=0).lookup("c", gate.signature(frame)) is None
+
+
+def test_pacer_hints_follow_hand_state_and_load():
+    pacer = FramePacer(active_ms=150, base_ms=400, idle_ms=2000, idle_after=2.0)
+    assert pacer.hint("c", hand_seen=True, gesturing=True, now=0.0) == 150
+    assert pacer.hint("c", hand_seen=True, gesturing=False, now=0.5) == 400
+    assert pacer.hint("c", hand_seen=False, gesturing=False, now=1.0) == 400
+    idle = [pacer.hint("c", hand_seen=False, gesturing=False, now=t) for t in (3.0, 3.5, 4.0)]
+    assert idle == [800, 1600, 2000]
+    assert pacer.hint("c", hand_seen=True, gesturing=True, load=2.0, now=5.0) == 300
@@ -7,6 +7,7 @@ Run this from the project root directory
 import os
 import sys
 import joblib
+import pytest
 import numpy as np
 
 # Add the Gesture final directory to path
@@ -90,7 +91,10 @@ def test_backend_integration():
     try:
         # Try to import the backend modules
         sys.path.append('backend')
-        from app import gesture_model, gesture_scaler
+        import gesture_api
+        if gesture_api.model_store.current is None:
+            gesture_api.load_models()
+        gesture_model, gesture_scaler = gesture_api.gesture_model, gesture_api.gesture_scaler
         
         if gesture_model is None:
             print("❌ Backend failed to load gesture model")
@@ -124,15 +128,8 @@ def test_backend_integration():
         
         dummy_hand = DummyHandLandmarks()
         
-        # Test the feature extraction (same as in your maintesting_spotify.py)
-        def to_feature_vec(hand_landmarks):
-            base_x = hand_landmarks.landmark[0].x
-            base_y = hand_landmarks.landmark[0].y
-            vec = []
-            for lm in hand_landmarks.landmark:
-                vec.append(lm.x - base_x)
-                vec.append(lm.y - base_y)
-            return np.array(vec, dtype=np.float32).reshape(1, -1)  # (1,42)
+        # Test the shared feature extraction (same module the collector and controllers use)
+        from gesture_features import to_feature_vec
         
         features = to_feature_vec(dummy_hand)
         print(f"📊 Extracted features shape: {features.shape}")
@@ -159,6 +156,155 @@ def test_backend_integration():
         traceback.print_exc()
         return False
 
+def test_fast_predictor_equivalence():
+    """Check the backend's compiled NumPy predictor against sklearn on recorded samples"""
+    
+    print("\n⚡ Testing Fast Predictor Equivalence...")
+    print("=" * 50)
+    
+    from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.svm import SVC
+    sys.path.append('backend')
+    import tempfile
+    from fast_predictor import compile_predictor
+    from gesture_routing import HandRoutedModel, as_model
+    from model_bundle import read_bundle, write_bundle
+    from gesture_dataset import load_dataset
+    
+    # testing1.gds is built from testing1.json on first load
+    data_path = "Gesture final/testing1.gds"
+    scaler_path = "Gesture final/scaler.pkl"
+    if not os.path.exists("Gesture final/testing1.json") or not os.path.exists(scaler_path):
+        pytest.skip(f"Gesture final/testing1.json or {scaler_path} not found")
+    
+    dataset = load_dataset(data_path)
+    X = np.asarray(dataset.X, dtype=np.float32)
+    y = dataset.y
+    scaler = joblib.load(scaler_path)
+    
+    # Small soft-voting ensemble of the same kinds the training script produces
+    train = np.random.RandomState(0).permutation(len(X))[:1500]
+    model = VotingClassifier([
+        ('rf', RandomForestClassifier(n_estimators=30, random_state=0)),
+        ('svm', SVC(probability=True, random_state=0)),
+        ('knn', KNeighborsClassifier(n_neighbors=5)),
+    ], voting='soft').fit(scaler.transform(X[train]), y[train])
+    
+    # Handedness-routed pair: each side's model only knows that side's classes plus none
+    sides = np.array([label.rsplit('_', 1)[-1] for label in y])
+    routed = HandRoutedModel({
+        side: RandomForestClassifier(n_estimators=30, random_state=0).fit(
+            scaler.transform(X[train][rows]), y[train][rows])
+        for side in ('left', 'right')
+        for rows in [(sides[train] == side) | (y[train] == 'none')]
+    })
+    row_sides = [side if side in ('left', 'right') else None for side in sides]
+    
+    candidates = [("ensemble", model, None), ("routed", routed, row_sides), ("routed (side unknown)", routed, None)]
+    if os.path.exists("Gesture final/gesture_model.pkl"):
+        candidates.append(("gesture_model.pkl", as_model(joblib.load("Gesture final/gesture_model.pkl")), None))
+    
+    for name, estimator, row_sides in candidates:
+        fast = compile_predictor(estimator, scaler)
+        expected_scaled = scaler.transform(X)
+        fast_scaled = fast.transform(X)
+        if row_sides is None:
+            expected = estimator.predict_proba(expected_scaled)
+            got = fast.predict_proba(fast_scaled)
+        else:
+            expected = estimator.predict_proba(expected_scaled, row_sides)
+            got = fast.predict_proba(fast_scaled, row_sides)
+        
+        np.testing.assert_array_equal(fast_scaled, expected_scaled, err_msg=f"{name}: scaled features differ")
+        np.testing.assert_allclose(got, expected, rtol=0, atol=1e-9, err_msg=f"{name}: probabilities differ")
+        np.testing.assert_array_equal(got.argmax(axis=1), expected.argmax(axis=1),
+                                      err_msg=f"{name}: predicted classes differ")
+        print(f"✅ {name}: {len(X)} samples match (max diff {np.abs(expected - got).max():.3g})")
+        
+        # Memory-mapped .gmb bundle (float32 leaf values) must keep every label
+        with tempfile.TemporaryDirectory() as tmp:
+            bundle_path = os.path.join(tmp, "model.gmb")
+            write_bundle(bundle_path, fast, {"classes": fast.classes_.tolist()})
+            mapped, meta = read_bundle(bundle_path)
+            bundled = mapped.predict_proba(mapped.transform(X), row_sides)
+            del mapped
+        assert meta["classes"] == fast.classes_.tolist(), f"{name}: bundle lost the class labels"
+        np.testing.assert_array_equal(bundled.argmax(axis=1), expected.argmax(axis=1),
+                                      err_msg=f"{name}: bundled predictor disagrees with sklearn")
+        print(f"✅ {name}: bundle round-trip matches (max diff {np.abs(expected - bundled).max():.3g})")
+
+def test_dataset_format():
+    """Test that collector JSON converts to the columnar .gds format without loss"""
+    print("\n🗂️ Testing Dataset Format")
+    print("=" * 50)
+    
+    import json
+    import tempfile
+    from gesture_dataset import convert_json, from_samples, load_dataset, read_dataset, write_dataset
+    
+    json_path = "Gesture final/testing1.json"
+    if not os.path.exists(json_path):
+        pytest.skip(f"{json_path} not found")
+    
+    with open(json_path) as f:
+        samples = json.load(f)
+    # Newer collector samples carry handedness and raw landmarks
+    samples[0] = dict(samples[0], hand="right", landmarks=[[0.5, 0.5, 0.0]] * 21)
+    samples[1] = dict(samples[1], hand="left", landmarks=None)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "samples.json")
+        with open(source, "w") as f:
+            json.dump(samples, f)
+        dataset = read_dataset(convert_json(source, collector={"mirror": True}))
+        X = np.array([s['X'] for s in samples])
+        np.testing.assert_array_equal(np.round(dataset.X.astype(np.float64), 4), X,
+                                      err_msg="Converted features differ from the JSON samples")
+        assert dataset.y.tolist() == [s['y'] for s in samples], "Converted labels differ from the JSON samples"
+        assert dataset.hands[:3].tolist() == ["right", "left", ""], "Handedness was not kept"
+        assert dataset.meta["collector"] == {"mirror": True}, "Collector metadata was not kept"
+        np.testing.assert_allclose(dataset.landmarks[0], np.broadcast_to([0.5, 0.5, 0.0], (21, 3)),
+                                   err_msg="Raw landmarks were not kept")
+        assert dataset.has_landmarks().sum() == 1, "Rows without landmarks were marked as having them"
+        assert not dataset.X.flags.writeable, "Columns are not read-only views of the mapped file"
+        # Rewriting a loaded dataset gives the same columns back
+        copy_path = os.path.join(tmp, "copy.gds")
+        write_dataset(copy_path, from_samples(samples))
+        copy = read_dataset(copy_path)
+        np.testing.assert_array_equal(copy.X, dataset.X, err_msg="Dataset round-trip changed the features")
+        np.testing.assert_array_equal(copy.codes, dataset.codes, err_msg="Dataset round-trip changed the labels")
+        # The feature version is written through, and must match the X column
+        assert copy.meta["feature_version"] == 1, "Feature version was not recorded"
+        with pytest.raises(ValueError):
+            write_dataset(copy_path, from_samples(samples), feature_version=2)
+        # A missing .gds next to its collector JSON is built on first load
+        built = load_dataset(os.path.join(tmp, "samples.gds"))
+        assert os.path.exists(os.path.join(tmp, "samples.gds")), ".gds was not built from the collector JSON"
+        np.testing.assert_array_equal(built.X, dataset.X, err_msg=".gds built from the JSON differs")
+        # An existing .gds may hold collected samples; a newer JSON must not replace it
+        with open(source, "w") as f:
+            json.dump(samples[:10], f)
+        os.utime(source, (os.path.getmtime(source) + 60,) * 2)
+        assert len(load_dataset(os.path.join(tmp, "samples.gds"))) == len(samples), ".gds was rebuilt from the JSON"
+        del dataset, copy, built
+    
+    print(f"✅ {len(samples)} samples converted; features, labels, hands and landmarks match")
+
+def _passes(test):
+    """Run an asserting test for the script summary: True when it passes or is skipped"""
+    try:
+        test()
+        return True
+    except pytest.skip.Exception as e:
+        print(f"⚠️ Skipping: {e.msg}")
+        return True
+    except Exception as e:
+        print(f"❌ {test.__name__} failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 if __name__ == "__main__":
     print("🎵 Smart Music - Gesture Model Test")
     print("=" * 50)
@@ -169,12 +315,20 @@ if __name__ == "__main__":
     # Test 2: Backend integration
     backend_ok = test_backend_integration()
     
+    # Test 3: Fast predictor matches sklearn
+    fast_ok = _passes(test_fast_predictor_equivalence)
+    
+    # Test 4: Columnar dataset format
+    dataset_ok = _passes(test_dataset_format)
+    
     print("\n" + "=" * 50)
     print("📋 Test Summary:")
     print(f"   Model Loading: {'✅ PASS' if model_ok else '❌ FAIL'}")
     print(f"   Backend Integration: {'✅ PASS' if backend_ok else '❌ FAIL'}")
+    print(f"   Fast Predictor: {'✅ PASS' if fast_ok else '❌ FAIL'}")
+    print(f"   Dataset Format: {'✅ PASS' if dataset_ok else '❌ FAIL'}")
     
-    if model_ok and backend_ok:
+    if model_ok and backend_ok and fast_ok and dataset_ok:
         print("\n🎉 All tests passed! Your gesture model is ready to use.")
         print("\n🚀 Next steps:")
         print("   1. Start the backend: cd backend && python app.py")